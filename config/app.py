@@ -24,6 +24,101 @@ PRESTART_HOOKS = {
 
 GITHUB_SCOPE = "repo,delete_repo"
 
+# Shared HTTP client used by all tools to call the GitHub API
+GITHUB_API = {
+    "max_connections": 100,  # Max concurrent connections to GitHub
+    "max_keepalive_connections": 20,  # Idle keep-alive connections kept in the pool
+    "keepalive_expiry": 30,  # Seconds an idle connection is kept open
+    "timeout": 30,  # Request timeout in seconds
+    "max_concurrency_per_user": 8,  # Concurrent GitHub calls per access token
+    "graphql_batching": True,  # Fetch file contents in batched GraphQL queries
+    "graphql_batch_size": 50,  # Files fetched per GraphQL query
+    "coalesce_requests": True,  # Concurrent identical GETs of a token share one call
+    "user_agent": "easy-mcp-github-tools",
+}
+
+# Pacing of GitHub calls per access token and rate limit resource (core, search, graphql)
+GITHUB_RATE_LIMIT = {
+    "enabled": True,
+    "pace_below": 0.1,  # Share of the budget left below which calls are spread until the reset
+    "bulk_reserve": 0.1,  # Share of the budget bulk calls (syncs, page windows) leave to interactive calls
+    "secondary_backoff": 60,  # Seconds paused after a secondary rate limit without Retry-After, doubled on repeats
+    "max_secondary_backoff": 900,
+    "max_wait": 60,  # Seconds a call may wait, past that it is answered 429 without being sent
+    "max_sleep": 1.0,  # Seconds between budget checks of a waiting call
+    "poll_interval": 0.05,  # Seconds a bulk call yields to waiting interactive calls
+}
+
+# Retries of transient GitHub failures, reads only unless a write is marked safe to repeat
+GITHUB_RETRY = {
+    "max_attempts": 4,
+    "base_delay": 0.5,  # Seconds before the first retry, doubled on each attempt and jittered
+    "max_delay": 8,  # Longest backoff between attempts
+    "attempt_timeout": 30,  # Timeout of each attempt in seconds
+    "deadline": 60,  # Seconds all the attempts of a call must fit in
+    "statuses": [500, 502, 503, 504],  # Answers retried like timeouts
+}
+
+# Caches of immutable git objects shared by the file tools
+GITHUB_CACHE = {
+    "blob_cache_max_bytes": 64 * 1024 * 1024,  # Memory budget of the blob cache
+    "tree_cache_max_entries": 32,  # Recursive trees kept in memory
+    "listing_cache_max_entries": 4096,  # Single level trees kept to walk truncated trees
+    "ref_ttl": 30,  # Seconds a branch to tree resolution is trusted
+    "ref_cache_max_entries": 1024,
+    "http_cache_max_bytes": 32 * 1024 * 1024,  # Memory budget of the ETag cache
+    "default_branch_ttl": 300,  # Seconds a repository default branch is trusted
+    "default_branch_max_entries": 1024,
+    "comments_cache_max_entries": 512,  # Issues whose comments are kept, until updated
+}
+
+# Local bare mirrors serving the read-only file tools, enabled with MIRROR_PATH
+GITHUB_MIRROR = {
+    "repos": [],  # Repositories to mirror, in the format 'owner/repo'
+    "remote_url": "https://github.com/{repo}.git",
+    "refresh_interval": 300,  # Seconds before a mirror is fetched again on access
+    "git_timeout": 300,  # Seconds a git command may run
+}
+
+# Tarball snapshots of whole refs, enabled with SNAPSHOT_PATH
+GITHUB_SNAPSHOT = {
+    "max_bytes": 1024 * 1024 * 1024,  # Disk budget of the snapshot store
+    "min_files": 20,  # Files requested at once before get_files_contents_tool uses a snapshot
+    "chunk_size": 1024 * 1024,  # Bytes streamed at a time
+}
+
+# SQLite full-text index of issues and comments, enabled with ISSUE_INDEX_PATH
+GITHUB_ISSUE_INDEX = {
+    "repos": [],  # Repositories to index, in the format 'owner/repo'
+    "sync_interval": 60,  # Seconds before updated issues and comments are listed again
+    "batch_size": 500,  # Rows written per transaction while syncing
+}
+
+# Trigram index of mirrored or snapshotted repositories backing search_files_tool
+GITHUB_CODE_INDEX = {
+    "enabled": False,
+    "max_commits": 4,  # Commits kept indexed per repository
+    "max_file_size": 1024 * 1024,  # Larger files aren't indexed
+    "batch_size": 256,  # Blobs read from the mirror at a time
+    "max_matches_per_file": 20,
+    "snippet_length": 200,  # Characters of each matching line returned
+    "max_pattern_length": 1000,  # Characters of a regular expression query
+    "search_timeout": 30,  # Seconds a search may spend scanning files
+}
+
+# SQLite credentials database
+DATABASE = {
+    "pool_size": 5,  # Idle connections kept open
+    "mmap_size": 64 * 1024 * 1024,  # Bytes of the database file memory-mapped
+    "busy_timeout": 5000,  # Milliseconds to wait on a locked database
+}
+
+# Decrypted credentials kept in memory by GithubAuthMiddleware
+AUTH_CREDENTIALS_CACHE = {
+    "ttl": 60,  # Seconds before credentials are read from the database again
+    "max_entries": 1024,
+}
+
 MIDDLEWARE = {
     "mcp": [{"middleware": "app.middleware.github.GithubAuthMiddleware", "priority": 1}]
 }
@@ -1,16 +1,92 @@
 import json
+import time
+import contextvars
+import threading
+from collections import OrderedDict
 from starlette.middleware.base import BaseHTTPMiddleware
 from fastapi import Request
 from cryptography.fernet import Fernet
 from core.utils.env import EnvConfig
 from core.utils.state import global_state
 from core.utils.logger import logger
+from core.utils.config import config
 
 
 # Load the encryption key from the environment variable
 CYPHER = EnvConfig.get("CYPHER").encode()  # Ensure it's in bytes
 fernet = Fernet(CYPHER)
 
+credentials_cache_config = config.get("AUTH_CREDENTIALS_CACHE", {})
+
+
+class CredentialsCache:
+    """Bounded TTL cache of decrypted credentials keyed by access token."""
+
+    def __init__(self, ttl: int, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, access_token: str):
+        with self.lock:
+            entry = self.entries.get(access_token)
+            if entry is None:
+                return None
+            if entry[1] < time.monotonic():
+                del self.entries[access_token]
+                return None
+            self.entries.move_to_end(access_token)
+            return entry[0]
+
+    def set(self, access_token: str, credentials: dict):
+        with self.lock:
+            self.entries[access_token] = (credentials, time.monotonic() + self.ttl)
+            self.entries.move_to_end(access_token)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def invalidate(self, access_token: str = None, user_id: str = None):
+        """Drop cached credentials by access token and/or by user ID."""
+        with self.lock:
+            if access_token is not None:
+                self.entries.pop(access_token, None)
+            if user_id is not None:
+                for token, (cred, _) in list(self.entries.items()):
+                    if str(cred.get("user_id")) == str(user_id):
+                        del self.entries[token]
+
+
+credentials_cache = CredentialsCache(
+    ttl=credentials_cache_config.get("ttl", 60),
+    max_entries=credentials_cache_config.get("max_entries", 1024),
+)
+
+
+class RequestContext:
+    """Authentication state of the request being served."""
+
+    def __init__(self, is_authenticated=False, credentials=None, error_message=None):
+        self.is_authenticated = is_authenticated
+        self.credentials = credentials
+        self.error_message = error_message
+
+
+# Set per request by GithubAuthMiddleware and inherited by the tasks serving it,
+# so concurrent requests never see each other's credentials
+request_context = contextvars.ContextVar("github_auth_request_context", default=None)
+
+
+def get_request_context() -> RequestContext:
+    """Return the context of the current request, unauthenticated if there is none."""
+    ctx = request_context.get()
+    return ctx if ctx is not None else RequestContext()
+
+
+def get_credentials():
+    """Return the GitHub credentials of the current request."""
+    return get_request_context().credentials
+
 
 class GithubAuthMiddleware(BaseHTTPMiddleware):
 
@@ -20,77 +96,65 @@ class GithubAuthMiddleware(BaseHTTPMiddleware):
 
     async def dispatch(self, request: Request, call_next):
         logger.info("GithubAuthMiddleware: Checking credentials")
+        ctx = RequestContext()
+        reset_token = request_context.set(ctx)
+        try:
+            self.authenticate(request, ctx)
+            return await call_next(request)
+        finally:
+            request_context.reset(reset_token)
+
+    def authenticate(self, request: Request, ctx: RequestContext):
+        """Fill the request context with the credentials of the access token."""
         try:
-            global_state.set(
-                "middleware.GithubAuthMiddleware.is_authenticated", False, True
-            )
             access_token = request.headers.get("x-access-token", None)
 
             if not access_token:
-                global_state.set(
-                    "middleware.GithubAuthMiddleware.error_message",
-                    f"X-ACCESS-TOKEN is a required header parameter. Please go to {EnvConfig.get('APP_HOST')}/auth/login to get the required paramaters.",
-                    True,
-                )
+                ctx.error_message = f"X-ACCESS-TOKEN is a required header parameter. Please go to {EnvConfig.get('APP_HOST')}/auth/login to get the required paramaters."
                 logger.warning("GithubAuthMiddleware: No access token found in header.")
-                return await call_next(request)
+                return
 
             try:
-                cred = self.db_handler.get_credentials(access_token)
+                # Skip the database lookup and decryption for recently seen tokens
+                cred = credentials_cache.get(access_token)
+                if cred is None:
+                    cred = self.db_handler.get_credentials(access_token)
+                    if "error" not in cred:
+                        credentials_cache.set(access_token, cred)
             except Exception as e:
-                global_state.set(
-                    "middleware.GithubAuthMiddleware.error_message",
-                    f"There has been an error with authenticating, please go to {EnvConfig.get('APP_HOST')}/auth/login and authenticate again",
-                    True,
-                )
+                ctx.error_message = f"There has been an error with authenticating, please go to {EnvConfig.get('APP_HOST')}/auth/login and authenticate again"
                 logger.warning(
                     "GithubAuthMiddleware: There has been an error with authenticating."
                 )
-                return await call_next(request)
+                return
 
             if "error" in cred:
-                global_state.set(
-                    "middleware.GithubAuthMiddleware.error_message",
-                    f"There has been an error with authenticating, please go to {EnvConfig.get('APP_HOST')}/auth/login and authenticate again",
-                    True,
-                )
+                ctx.error_message = f"There has been an error with authenticating, please go to {EnvConfig.get('APP_HOST')}/auth/login and authenticate again"
                 logger.warning(
                     "GithubAuthMiddleware: No credentials found. Redirecting to login."
                 )
-                return await call_next(request)  # Proceed without authentication
-
-            global_state.set(
-                "middleware.GithubAuthMiddleware.is_authenticated", True, True
-            )
-            global_state.set(
-                "middleware.GithubAuthMiddleware.credentials", cred["credentials"], True
-            )
+                return  # Proceed without authentication
+
+            ctx.is_authenticated = True
+            ctx.credentials = cred["credentials"]
             logger.info("GithubAuthMiddleware: User login successful.")
-            response = await call_next(request)
-            return response
 
         except Exception as e:
             logger.error(f"GithubAuthMiddleware: Authentication failed: {str(e)}")
-            global_state.set(
-                "middleware.GithubAuthMiddleware.error_message",
-                f"There has been an error with authenticating, please go to {EnvConfig.get('APP_HOST')}/auth/login to authenticate",
-                True,
-            )
-            return await call_next(request)  # Proceed without authentication
+            ctx.is_authenticated = False
+            ctx.error_message = f"There has been an error with authenticating, please go to {EnvConfig.get('APP_HOST')}/auth/login to authenticate"
 
 
 def check_access(returnJsonOnError=False):
 
-    if not global_state.get("middleware.GithubAuthMiddleware.is_authenticated"):
+    ctx = get_request_context()
+    if not ctx.is_authenticated:
         logger.error("GithubAuthMiddleware: User is not authenticated.")
 
         if returnJsonOnError:
             return {
                 "status": "error",
-                "error": global_state.get(
-                    "middleware.GithubAuthMiddleware.error_message",
-                    "User is not authenticated.",
-                ),
+                "error": ctx.error_message or "User is not authenticated.",
             }
 
         return "User is not authenticated."
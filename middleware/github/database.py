@@ -1,9 +1,15 @@
 import sqlite3
 import json
+import queue
+from contextlib import contextmanager
 from cryptography.fernet import Fernet
 from core.utils.logger import logger
 from core.utils.state import global_state
 from core.utils.env import EnvConfig
+from core.utils.config import config
+from app.middleware.github.GithubAuthMiddleware import credentials_cache
+
+database_config = config.get("DATABASE", {})
 
 
 def init_db(server_name):
@@ -15,12 +21,76 @@ def init_db(server_name):
     logger.info("Database initialized successfully.")
 
 
+class ConnectionPool:
+    """Thread-safe pool of persistent SQLite connections."""
+
+    def __init__(self, db_path, size, mmap_size, busy_timeout):
+        self.db_path = db_path
+        self.mmap_size = mmap_size
+        self.busy_timeout = busy_timeout
+        self.idle = queue.LifoQueue(maxsize=size)
+
+    def connect(self):
+        """Open a new connection with WAL journaling and tuned pragmas."""
+        conn = sqlite3.connect(
+            self.db_path,
+            check_same_thread=False,  # Connections move between worker threads
+            timeout=self.busy_timeout / 1000,
+            cached_statements=128,  # Prepared statements are reused per connection
+        )
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL;")  # Readers don't block on writers
+        conn.execute("PRAGMA synchronous=NORMAL;")  # Safe with WAL, fewer fsyncs
+        conn.execute(f"PRAGMA mmap_size={int(self.mmap_size)};")
+        conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout)};")
+        return conn
+
+    def acquire(self):
+        """Return an idle connection, or a new one if none is available."""
+        try:
+            return self.idle.get_nowait()
+        except queue.Empty:
+            return self.connect()
+
+    @contextmanager
+    def connection(self):
+        """Lend a connection for a with block, giving it back even if the block fails."""
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def release(self, conn):
+        """Give a connection back to the pool, closing it if the pool is full."""
+        if conn.in_transaction:
+            conn.rollback()
+        try:
+            self.idle.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    def close(self):
+        """Close all idle connections."""
+        while True:
+            try:
+                self.idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+
 class DatabaseHandler:
     """Class to handle database operations."""
 
     def __init__(self, db_path, cipher):
         self.db_path = db_path
         self.cipher = cipher
+        self.pool = ConnectionPool(
+            db_path,
+            size=database_config.get("pool_size", 5),
+            mmap_size=database_config.get("mmap_size", 64 * 1024 * 1024),
+            busy_timeout=database_config.get("busy_timeout", 5000),
+        )
         self.initialize_db()
 
     def initialize_db(self):
@@ -28,23 +98,30 @@ class DatabaseHandler:
         logger.info(
             f"Initializing database at: {self.db_path}"
         )  # Log database initialization
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        # Create table for user credentials with access_token column
-        cursor.execute(
-            """
-            CREATE TABLE IF NOT EXISTS user_credentials (
-                user_id TEXT PRIMARY KEY,
-                credentials_json TEXT NOT NULL,
-                access_token TEXT
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+
+            # Create table for user credentials with access_token column
+            cursor.execute(
+                """
+                CREATE TABLE IF NOT EXISTS user_credentials (
+                    user_id TEXT PRIMARY KEY,
+                    credentials_json TEXT NOT NULL,
+                    access_token TEXT
+                )
+                """
             )
-            """
-        )
 
-        conn.commit()
-        cursor.close()
-        conn.close()
+            # Every MCP request looks credentials up by access token
+            cursor.execute(
+                """
+                CREATE INDEX IF NOT EXISTS idx_user_credentials_access_token
+                ON user_credentials (access_token)
+                """
+            )
+
+            conn.commit()
+            cursor.close()
         logger.info(
             "Database initialized successfully."
         )  # Log successful initialization
@@ -56,51 +133,50 @@ class DatabaseHandler:
         )  # Log credential insertion
 
         # Connect to the database
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
 
-        # Check if the user already exists to retrieve the existing access token
-        cursor.execute(
-            "SELECT access_token, credentials_json FROM user_credentials WHERE user_id = ?",
-            (user_id,),
-        )
-        existing_credentials = cursor.fetchone()
-
-        if existing_credentials:
-            # If the user exists, retrieve the existing access token and credentials using named access
-            access_token = existing_credentials["access_token"]
-            logger.info(f"Existing credentials found for user_id: {user_id}.")
-        else:
-            # Generate a new access token
-            access_token = (
-                Fernet(EnvConfig.get("CYPHER").encode())
-                .encrypt(user_id.encode())
-                .decode()
+            # Check if the user already exists to retrieve the existing access token
+            cursor.execute(
+                "SELECT access_token, credentials_json FROM user_credentials WHERE user_id = ?",
+                (user_id,),
             )
-            logger.info(
-                f"No existing credentials found for user_id: {user_id}. Generated new access token."
+            existing_credentials = cursor.fetchone()
+
+            if existing_credentials:
+                # If the user exists, retrieve the existing access token and credentials using named access
+                access_token = existing_credentials["access_token"]
+                logger.info(f"Existing credentials found for user_id: {user_id}.")
+            else:
+                # Generate a new access token
+                access_token = (
+                    Fernet(EnvConfig.get("CYPHER").encode())
+                    .encrypt(user_id.encode())
+                    .decode()
+                )
+                logger.info(
+                    f"No existing credentials found for user_id: {user_id}. Generated new access token."
+                )
+
+            encrypted_credentials = self.cipher.encrypt(
+                json.dumps(credentials_json).encode()
             )
 
-        encrypted_credentials = self.cipher.encrypt(
-            json.dumps(credentials_json).encode()
-        )
-
-        # Insert or update the credentials in the database
-        cursor.execute(
-            """
-            INSERT INTO user_credentials (user_id, credentials_json, access_token)
-            VALUES (?, ?, ?)
-            ON CONFLICT(user_id) DO UPDATE SET 
-                credentials_json = excluded.credentials_json,
-                access_token = access_token;  -- Keep existing access token
-            """,
-            (user_id, encrypted_credentials, access_token),
-        )
+            # Insert or update the credentials in the database
+            cursor.execute(
+                """
+                INSERT INTO user_credentials (user_id, credentials_json, access_token)
+                VALUES (?, ?, ?)
+                ON CONFLICT(user_id) DO UPDATE SET 
+                    credentials_json = excluded.credentials_json,
+                    access_token = access_token;  -- Keep existing access token
+                """,
+                (user_id, encrypted_credentials, access_token),
+            )
 
-        conn.commit()
-        cursor.close()
-        conn.close()
+            conn.commit()
+            cursor.close()
+        credentials_cache.invalidate(access_token=access_token, user_id=user_id)
         logger.info(
             f"Credentials for user_id: {user_id} inserted/updated successfully."
         )  # Log success
@@ -122,13 +198,12 @@ class DatabaseHandler:
             query = "SELECT credentials_json, access_token FROM user_credentials WHERE user_id = ?;"
             params = (identifier,)
 
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
 
-        cursor.execute(query, params)
-        result = cursor.fetchone()
-        cursor.close()
-        conn.close()
+            cursor.execute(query, params)
+            result = cursor.fetchone()
+            cursor.close()
 
         if result:
             encrypted_credentials = result[0]
@@ -159,29 +234,29 @@ class DatabaseHandler:
             f"Attempting to delete credentials for access_token: {access_token} and user_id: {user_id}"
         )  # Log credential deletion attempt
 
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
 
-        # Delete the credentials using both access_token and user_id
-        cursor.execute(
-            "DELETE FROM user_credentials WHERE access_token = ? AND user_id = ?;",
-            (access_token, user_id),
-        )
+            # Delete the credentials using both access_token and user_id
+            cursor.execute(
+                "DELETE FROM user_credentials WHERE access_token = ? AND user_id = ?;",
+                (access_token, user_id),
+            )
 
-        conn.commit()
+            conn.commit()
+            credentials_cache.invalidate(access_token=access_token, user_id=user_id)
 
-        # Check if any rows were deleted
-        if cursor.rowcount > 0:
-            logger.info(
-                f"Credentials for user_id: {user_id} deleted successfully."
-            )  # Log success
-        else:
-            logger.warning(
-                f"No credentials found for access_token: {access_token} and user_id: {user_id}"
-            )  # Log warning for not found
+            # Check if any rows were deleted
+            if cursor.rowcount > 0:
+                logger.info(
+                    f"Credentials for user_id: {user_id} deleted successfully."
+                )  # Log success
+            else:
+                logger.warning(
+                    f"No credentials found for access_token: {access_token} and user_id: {user_id}"
+                )  # Log warning for not found
 
-        cursor.close()
-        conn.close()
+            cursor.close()
 
     def update_access_token(self, user_id: str, new_access_token: str):
         """Update the access token in the credentials_json for a specific user in the database."""
@@ -190,49 +265,49 @@ class DatabaseHandler:
         )  # Log the update attempt
 
         # Connect to the database
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        # Retrieve existing credentials
-        cursor.execute(
-            "SELECT credentials_json FROM user_credentials WHERE user_id = ?;",
-            (user_id,),
-        )
-        result = cursor.fetchone()
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
 
-        if result:
-            # Decrypt existing credentials
-            encrypted_credentials = result[0]
-            decrypted_credentials = json.loads(
-                self.cipher.decrypt(encrypted_credentials).decode()
-            )
-
-            # Update the access token in the credentials JSON
-            decrypted_credentials["access_token"] = new_access_token
-
-            # Encrypt the updated credentials
-            updated_encrypted_credentials = self.cipher.encrypt(
-                json.dumps(decrypted_credentials).encode()
-            )
-
-            # Update the credentials in the database
+            # Retrieve existing credentials
             cursor.execute(
-                """
-                UPDATE user_credentials
-                SET credentials_json = ?
-                WHERE user_id = ?;
-                """,
-                (updated_encrypted_credentials, user_id),
+                "SELECT credentials_json FROM user_credentials WHERE user_id = ?;",
+                (user_id,),
             )
-
-            conn.commit()
-            logger.info(
-                f"Access token updated successfully for user_id: {user_id}."
-            )  # Log success
-        else:
-            logger.warning(
-                f"No credentials found for user_id: {user_id}."
-            )  # Log warning if not found
-
-        cursor.close()
-        conn.close()
+            result = cursor.fetchone()
+
+            if result:
+                # Decrypt existing credentials
+                encrypted_credentials = result[0]
+                decrypted_credentials = json.loads(
+                    self.cipher.decrypt(encrypted_credentials).decode()
+                )
+
+                # Update the access token in the credentials JSON
+                decrypted_credentials["access_token"] = new_access_token
+
+                # Encrypt the updated credentials
+                updated_encrypted_credentials = self.cipher.encrypt(
+                    json.dumps(decrypted_credentials).encode()
+                )
+
+                # Update the credentials in the database
+                cursor.execute(
+                    """
+                    UPDATE user_credentials
+                    SET credentials_json = ?
+                    WHERE user_id = ?;
+                    """,
+                    (updated_encrypted_credentials, user_id),
+                )
+
+                conn.commit()
+                credentials_cache.invalidate(user_id=user_id)
+                logger.info(
+                    f"Access token updated successfully for user_id: {user_id}."
+                )  # Log success
+            else:
+                logger.warning(
+                    f"No credentials found for user_id: {user_id}."
+                )  # Log warning if not found
+
+            cursor.close()
@@ -7,7 +7,7 @@ from core.utils.logger import logger
 from core.utils.config import config
 from core.utils.env import EnvConfig
 from core.utils.state import global_state
-import httpx
+from app.utils.github import client as github
 
 server_info_config = config.get("INFO_SERVICE_CONFIG", {})
 main_url = server_info_config.get("service_uri", "/")
@@ -76,34 +76,32 @@ async def github_auth_callback(request: Request):
 
         client_id = credentials.get("client_id")
         client_secret = credentials.get("client_secret")
-        async with httpx.AsyncClient() as client:
-            token_response = await client.post(
-                GITHUB_OAUTH_TOKEN_URL,
-                data={
-                    "client_id": client_id,
-                    "client_secret": client_secret,
-                    "code": code,
-                    "redirect_uri": f"{EnvConfig.get('APP_HOST')}/auth/callback",
-                    "state": state_encoded,
-                },
-                headers={"Accept": "application/json"},
-            )
-
-            token_data = token_response.json()
-            access_token = token_data.get("access_token")
+        token_response = await github.post(
+            GITHUB_OAUTH_TOKEN_URL,
+            data={
+                "client_id": client_id,
+                "client_secret": client_secret,
+                "code": code,
+                "redirect_uri": f"{EnvConfig.get('APP_HOST')}/auth/callback",
+                "state": state_encoded,
+            },
+            headers={"Accept": "application/json"},
+        )
+
+        token_data = token_response.json()
+        access_token = token_data.get("access_token")
 
         if not access_token:
             logger.error("Failed to obtain access token from GitHub.")
             return RedirectResponse(url="/auth/login")
 
         # Fetch user information
-        async with httpx.AsyncClient() as client:
-            user_response = await client.get(
-                GITHUB_OAUTH_USER_URL,
-                headers={"Authorization": f"token {access_token}"},
-            )
-            user_info = user_response.json()
-            user_id = user_info.get("id")
+        user_response = await github.get(
+            GITHUB_OAUTH_USER_URL,
+            headers={"Authorization": f"token {access_token}"},
+        )
+        user_info = user_response.json()
+        user_id = user_info.get("id")
 
         db_handler = global_state.get("db_handler")
 
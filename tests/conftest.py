@@ -1,5 +1,9 @@
+import asyncio
 import os
 import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
 
@@ -7,35 +11,40 @@ import pytest
 import json
 from app.tools.create_repository import create_repository_tool
 from app.tools.delete_repository import delete_repository_tool
-from core.utils.state import global_state
+from app.middleware.github.GithubAuthMiddleware import RequestContext, request_context
+from app.utils.github import client as github
 from core.utils.env import EnvConfig
 
 
 @pytest.fixture(scope="module")
 def auth_setup():
-    # Set up global state for testing
-    global_state.set("middleware.GithubAuthMiddleware.is_authenticated", True)
-    global_state.set(
-        "middleware.GithubAuthMiddleware.credentials",
-        {"access_token": EnvConfig.get("TEST_TOKEN")},
+    # Set up the request context for testing
+    request_context.set(
+        RequestContext(
+            is_authenticated=True,
+            credentials={"access_token": EnvConfig.get("TEST_TOKEN")},
+        )
     )
 
 
 @pytest.fixture(scope="module")
 def repository_setup():
-    # Set up global state for testing
-    global_state.set("middleware.GithubAuthMiddleware.is_authenticated", True)
-    global_state.set(
-        "middleware.GithubAuthMiddleware.credentials",
-        {"access_token": EnvConfig.get("TEST_TOKEN")},
+    # Set up the request context for testing
+    request_context.set(
+        RequestContext(
+            is_authenticated=True,
+            credentials={"access_token": EnvConfig.get("TEST_TOKEN")},
+        )
     )
 
     test_username = EnvConfig.get("TEST_USERNAME")
     repo_name = f"test-repo-{os.urandom(4).hex()}"
 
     # Create the repository
-    response_data = create_repository_tool(
-        name=repo_name, description="Test repository", private=False, auto_init=True
+    response_data = asyncio.run(
+        create_repository_tool(
+            name=repo_name, description="Test repository", private=False, auto_init=True
+        )
     )
 
     assert response_data.get("name") == repo_name, "Repository creation failed"
@@ -43,17 +52,107 @@ def repository_setup():
     yield test_username, repo_name  # Provide the repository name to the tests
 
     # Teardown: Delete the repository
-    delete_response_data = delete_repository_tool(repo=f"{test_username}/{repo_name}")
+    delete_response_data = asyncio.run(
+        delete_repository_tool(repo=f"{test_username}/{repo_name}")
+    )
 
     assert "confirmation_token" in delete_response_data
 
     confirmation_token = delete_response_data["confirmation_token"]
     # Confirm the deletion
-    delete_response_data = delete_repository_tool(
-        repo=f"{test_username}/{repo_name}", confirmation_token=confirmation_token
+    delete_response_data = asyncio.run(
+        delete_repository_tool(
+            repo=f"{test_username}/{repo_name}", confirmation_token=confirmation_token
+        )
     )
 
     assert (
         delete_response_data.get("message")
         == f"Repository '{test_username}/{repo_name}' deleted successfully."
     )
+
+
+class FakeResponses(list):
+    """Queued answers of the fake GitHub server, with fixed answers per path in routes."""
+
+    def __init__(self):
+        super().__init__()
+        self.routes = {}
+        self.request_headers = []  # Headers of every call, in order
+
+
+@pytest.fixture
+def fake_github():
+    """
+    A local server standing in for the GitHub API.
+
+    Calls to a path in responses.routes (with or without its query string) get
+    its (status, body) answer, or the answer of calling it with the method,
+    path and JSON payload. Other calls pop the next queued (status, headers)
+    or (status, headers, delay) answer, 200 once the queue is empty. Every
+    call is recorded as (method, path, time), and its headers in
+    responses.request_headers.
+    """
+    responses = FakeResponses()
+    requests = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def _answer(self):
+            requests.append((self.command, self.path, time.time()))
+            responses.request_headers.append(
+                {name.lower(): value for name, value in self.headers.items()}
+            )
+            payload = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+
+            route = responses.routes.get(self.path)
+            if route is None:
+                route = responses.routes.get(self.path.split("?", 1)[0])
+            if route is not None:
+                if callable(route):
+                    route = route(
+                        self.command, self.path, json.loads(payload or "null")
+                    )
+                (status, data), headers, delay = route, {}, None
+            else:
+                status, headers, *delay = responses.pop(0) if responses else (200, {})
+                data = {"message": "ok"}
+            if delay:
+                time.sleep(delay[0])
+
+            body = json.dumps(data).encode() if status != 304 else b""
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        do_GET = do_POST = do_PATCH = do_PUT = do_DELETE = _answer
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.handle_error = lambda *args: None  # Clients time out on delayed answers
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    yield f"http://127.0.0.1:{server.server_port}", responses, requests
+
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def fake_tools(fake_github, monkeypatch):
+    """The fake GitHub server, with the tools authenticated and calling it."""
+    url, responses, requests = fake_github
+    monkeypatch.setattr(github, "GITHUB_API_URL", url)
+    request_context.set(
+        RequestContext(
+            is_authenticated=True,
+            credentials={"access_token": os.urandom(4).hex()},
+        )
+    )
+
+    yield fake_github
@@ -0,0 +1,43 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from app.utils.github.blob_cache import BlobCache
+
+
+def test_least_recently_used_blobs_are_evicted():
+    cache = BlobCache(max_bytes=10)
+    cache.put("a", b"aaaa")
+    cache.put("b", b"bbbb")
+    cache.get("a")
+    cache.put("c", b"cccc")
+
+    assert cache.get("a") == b"aaaa"
+    assert cache.get("b") is None
+    assert cache.get("c") == b"cccc"
+    assert cache.current_bytes == 8
+
+
+def test_blobs_over_the_budget_are_not_kept_in_memory():
+    cache = BlobCache(max_bytes=10)
+    cache.put("a", b"aaaa")
+    cache.put("big", b"x" * 11)
+
+    assert cache.get("big") is None
+    assert cache.get("a") == b"aaaa"
+    assert cache.current_bytes == 4
+
+
+def test_evicted_blobs_are_read_back_from_disk(tmp_path):
+    cache = BlobCache(max_bytes=4, disk_path=str(tmp_path))
+    cache.put("a", b"aaaa")
+    cache.put("b", b"bbbb")
+    cache.put("big", b"x" * 11)
+    assert "a" not in cache.blobs
+
+    assert cache.get("a") == b"aaaa"
+    assert cache.get("big") == b"x" * 11
+    # The blob read back is promoted into memory again
+    assert list(cache.blobs) == ["a"]
+    assert cache.current_bytes == 4
@@ -0,0 +1,55 @@
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+import httpx
+from app.utils.github import client as github
+
+
+def test_identical_gets_share_one_call(fake_github):
+    url, responses, requests = fake_github
+    responses.append((200, {}, 0.5))
+    tree_url = f"{url}/repos/owner/repo/git/trees/main"
+
+    async def run():
+        return await asyncio.gather(
+            *(
+                github.get(tree_url, headers={"Authorization": "token one"})
+                for _ in range(5)
+            ),
+            github.get(tree_url, headers={"Authorization": "token two"}),
+            github.get(
+                tree_url,
+                headers={"Authorization": "token one"},
+                params={"recursive": 1},
+            ),
+        )
+
+    responses_data = asyncio.run(run())
+
+    assert all(response.status_code == 200 for response in responses_data)
+    assert all(response.json() == {"message": "ok"} for response in responses_data)
+    # One call for the five identical GETs, then one per other token or URL
+    assert len(requests) == 3
+
+
+def test_coalesced_failures_are_shared(fake_github, monkeypatch):
+    url, responses, requests = fake_github
+    # A single attempt, so the shared timeout isn't followed by a retry
+    monkeypatch.setitem(github.retry_config, "max_attempts", 1)
+    monkeypatch.setitem(github.retry_config, "attempt_timeout", 0.3)
+    monkeypatch.setitem(github.retry_config, "deadline", 0.5)
+    responses.append((200, {}, 1))
+
+    async def run():
+        return await asyncio.gather(
+            *(github.get(f"{url}/repos/owner/slow") for _ in range(3)),
+            return_exceptions=True,
+        )
+
+    results = asyncio.run(run())
+
+    assert all(isinstance(result, httpx.TimeoutException) for result in results)
+    assert len(requests) == 1
@@ -0,0 +1,86 @@
+import asyncio
+import os
+import re
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+import pytest
+from app.utils.github import code_index
+from app.utils.github.git_data import blob_sha
+
+
+class MemorySource:
+    """A CodeIndex source holding the files of a single commit in memory."""
+
+    def __init__(self, files: dict):
+        self.blobs = {blob_sha(content): content for content in files.values()}
+        self.entries = {
+            path: {
+                "path": path,
+                "type": "blob",
+                "sha": blob_sha(content),
+                "size": len(content),
+            }
+            for path, content in files.items()
+        }
+
+    async def resolve(self, ref):
+        return "c" * 40
+
+    async def get_tree(self, commit):
+        return {"sha": commit, "truncated": False, "entries": self.entries}
+
+    async def read_objects(self, shas):
+        return {sha: self.blobs[sha] for sha in shas if sha in self.blobs}
+
+
+@pytest.mark.parametrize("pattern", [r"(a+)+$", r"(\w+\s*)*x", r"(?:a|b*)+c"])
+def test_nested_repeats_are_rejected(pattern):
+    with pytest.raises(re.error):
+        code_index.compile_query(pattern, regex=True, case_sensitive=False)
+
+
+def test_long_patterns_are_rejected(monkeypatch):
+    monkeypatch.setitem(code_index.code_index_config, "max_pattern_length", 10)
+
+    with pytest.raises(re.error):
+        code_index.compile_query("a" * 11, regex=True, case_sensitive=True)
+    # Literal searches are escaped, they can't backtrack
+    assert code_index.compile_query("(a+)+" * 3, regex=False, case_sensitive=True)
+
+
+def test_safe_patterns_are_compiled():
+    regex = code_index.compile_query(
+        r"def \w+_tool\(", regex=True, case_sensitive=False
+    )
+
+    assert regex.search("async DEF search_files_tool(")
+
+
+def test_search_stops_at_the_deadline(monkeypatch):
+    monkeypatch.setitem(code_index.code_index_config, "search_timeout", 0)
+    source = MemorySource({f"file{i}.py": b"needle\n" for i in range(3)})
+    regex = code_index.compile_query("needle", regex=False, case_sensitive=False)
+
+    with pytest.raises(code_index.SearchTimeout):
+        asyncio.run(code_index.CodeIndex().search(source, "c" * 40, regex))
+
+
+def test_snapshot_sources_use_the_token_of_each_caller(fake_tools, monkeypatch):
+    url, responses, requests = fake_tools
+    monkeypatch.setitem(code_index.code_index_config, "enabled", True)
+    monkeypatch.setattr(code_index, "snapshot_store", object())
+    monkeypatch.setattr(code_index, "_indexes", {})
+    responses.routes["/repos/owner/repo"] = (200, {"default_branch": "main"})
+
+    async def run():
+        first = await code_index.get_code_index("owner/repo", "token-one")
+        second = await code_index.get_code_index("owner/repo", "token-two")
+        return first, second
+
+    (first_index, first_source), (second_index, second_source) = asyncio.run(run())
+
+    # One index per repository, each caller reads it with its own token
+    assert first_index is second_index
+    assert (first_source.token, second_source.token) == ("token-one", "token-two")
@@ -1,3 +1,4 @@
+import asyncio
 import os
 import sys
 
@@ -19,17 +20,19 @@ def test_get_commits(repository_setup):
     file_content = "Initial commit for testing test_get_commits."
 
     # Step 1: Create a file to generate a commit
-    create_file_tool(
-        repo=f"{test_username}/{repo_name}",
-        file_path=file_path,
-        content=file_content,
-        commit_message=file_content,
+    asyncio.run(
+        create_file_tool(
+            repo=f"{test_username}/{repo_name}",
+            file_path=file_path,
+            content=file_content,
+            commit_message=file_content,
+        )
     )
 
     time.sleep(5)
 
     # Step 2: Fetch commits using get_commits_tool
-    response = get_commits_tool(repo=f"{test_username}/{repo_name}")
+    response = asyncio.run(get_commits_tool(repo=f"{test_username}/{repo_name}"))
 
     assert isinstance(response, dict)
     assert "commits" in response
@@ -51,23 +54,29 @@ def test_get_commits_from_branch(repository_setup):
     branch = "test_get_commits_from_branch"
 
     # Create branch and file
-    create_branch_tool(repo=f"{test_username}/{repo_name}", new_branch=branch)
+    asyncio.run(
+        create_branch_tool(repo=f"{test_username}/{repo_name}", new_branch=branch)
+    )
 
     time.sleep(5)
 
     # Step 1: Create a file to generate a commit
-    create_file_tool(
-        repo=f"{test_username}/{repo_name}",
-        file_path=file_path,
-        content=file_content,
-        commit_message=file_content,
-        branch=branch,
+    asyncio.run(
+        create_file_tool(
+            repo=f"{test_username}/{repo_name}",
+            file_path=file_path,
+            content=file_content,
+            commit_message=file_content,
+            branch=branch,
+        )
     )
 
     time.sleep(5)
 
     # Step 2: Fetch commits using get_commits_tool
-    response = get_commits_tool(repo=f"{test_username}/{repo_name}", branch=branch)
+    response = asyncio.run(
+        get_commits_tool(repo=f"{test_username}/{repo_name}", branch=branch)
+    )
 
     assert isinstance(response, dict)
     assert "commits" in response
@@ -89,17 +98,19 @@ def test_get_commit_details(repository_setup):
     file_content = "Commit for testing get_commit_details_tool."
 
     # Step 1: Create a file and commit it
-    create_file_tool(
-        repo=f"{test_username}/{repo_name}",
-        file_path=file_path,
-        content=file_content,
-        commit_message=file_content,
+    asyncio.run(
+        create_file_tool(
+            repo=f"{test_username}/{repo_name}",
+            file_path=file_path,
+            content=file_content,
+            commit_message=file_content,
+        )
     )
 
     time.sleep(5)
 
     # Step 2: Fetch commits using get_commits_tool
-    response = get_commits_tool(repo=f"{test_username}/{repo_name}")
+    response = asyncio.run(get_commits_tool(repo=f"{test_username}/{repo_name}"))
 
     commits = response.get("commits", {})
 
@@ -108,9 +119,11 @@ def test_get_commit_details(repository_setup):
     commit_sha = commits[0]["sha"]
     assert commit_sha is not None, "Failed to retrieve commit SHA"
 
-    full_details = get_commit_details_tool(
-        repo=f"{test_username}/{repo_name}",
-        sha=commit_sha,
+    full_details = asyncio.run(
+        get_commit_details_tool(
+            repo=f"{test_username}/{repo_name}",
+            sha=commit_sha,
+        )
     )
 
     assert isinstance(full_details, dict)
@@ -120,10 +133,12 @@ def test_get_commit_details(repository_setup):
     assert file_path in [f["filename"] for f in commit_info["files"]]
 
     # Step 3: Fetch file-specific diffs
-    file_diff_response = get_commit_details_tool(
-        repo=f"{test_username}/{repo_name}",
-        sha=commit_sha,
-        files=[file_path],
+    file_diff_response = asyncio.run(
+        get_commit_details_tool(
+            repo=f"{test_username}/{repo_name}",
+            sha=commit_sha,
+            files=[file_path],
+        )
     )
 
     assert isinstance(file_diff_response, dict)
@@ -144,23 +159,29 @@ def test_get_commit_details_from_branch(repository_setup):
     branch = "test_get_commits_from_branch"
 
     # Create branch and file
-    create_branch_tool(repo=f"{test_username}/{repo_name}", new_branch=branch)
+    asyncio.run(
+        create_branch_tool(repo=f"{test_username}/{repo_name}", new_branch=branch)
+    )
 
     time.sleep(5)
 
     # Step 1: Create a file and commit it
-    create_response = create_file_tool(
-        repo=f"{test_username}/{repo_name}",
-        file_path=file_path,
-        content=file_content,
-        commit_message=file_content,
-        branch=branch,
+    create_response = asyncio.run(
+        create_file_tool(
+            repo=f"{test_username}/{repo_name}",
+            file_path=file_path,
+            content=file_content,
+            commit_message=file_content,
+            branch=branch,
+        )
     )
 
     time.sleep(5)
 
     # Step 2: Fetch commits using get_commits_tool
-    response = get_commits_tool(repo=f"{test_username}/{repo_name}", branch=branch)
+    response = asyncio.run(
+        get_commits_tool(repo=f"{test_username}/{repo_name}", branch=branch)
+    )
 
     commits = response.get("commits", {})
 
@@ -170,8 +191,8 @@ def test_get_commit_details_from_branch(repository_setup):
     assert commit_sha is not None, "Failed to retrieve commit SHA"
 
     # Step 2: Fetch full commit details
-    full_details = get_commit_details_tool(
-        repo=f"{test_username}/{repo_name}", sha=commit_sha
+    full_details = asyncio.run(
+        get_commit_details_tool(repo=f"{test_username}/{repo_name}", sha=commit_sha)
     )
 
     assert isinstance(full_details, dict)
@@ -181,10 +202,12 @@ def test_get_commit_details_from_branch(repository_setup):
     assert file_path in [f["filename"] for f in commit_info["files"]]
 
     # Step 3: Fetch file-specific diffs
-    file_diff_response = get_commit_details_tool(
-        repo=f"{test_username}/{repo_name}",
-        sha=commit_sha,
-        files=[file_path],
+    file_diff_response = asyncio.run(
+        get_commit_details_tool(
+            repo=f"{test_username}/{repo_name}",
+            sha=commit_sha,
+            files=[file_path],
+        )
     )
 
     assert isinstance(file_diff_response, dict)
@@ -204,27 +227,31 @@ def test_get_files_before_commit(repository_setup):
     file_content_2 = "Updated content after change"
 
     # Step 1: Create a file with initial content and commit it
-    create_file_tool(
-        repo=f"{test_username}/{repo_name}",
-        file_path=file_path,
-        content=file_content_1,
-        commit_message="Initial commit for file",
+    asyncio.run(
+        create_file_tool(
+            repo=f"{test_username}/{repo_name}",
+            file_path=file_path,
+            content=file_content_1,
+            commit_message="Initial commit for file",
+        )
     )
 
     time.sleep(5)
 
     # Step 2: Modify the file and commit the changes
-    update_file_tool(
-        repo=f"{test_username}/{repo_name}",
-        file_path=file_path,
-        new_content=file_content_2,
-        commit_message="Updated file content for testing get_files_before_commit_tool",
+    asyncio.run(
+        update_file_tool(
+            repo=f"{test_username}/{repo_name}",
+            file_path=file_path,
+            new_content=file_content_2,
+            commit_message="Updated file content for testing get_files_before_commit_tool",
+        )
     )
 
     time.sleep(5)
 
     # Step 3: Fetch the latest commits to get the current SHA
-    response = get_commits_tool(repo=f"{test_username}/{repo_name}")
+    response = asyncio.run(get_commits_tool(repo=f"{test_username}/{repo_name}"))
     commits = response.get("commits", [])
     assert len(commits) >= 2, "Expected at least two commits"
 
@@ -232,10 +259,12 @@ def test_get_files_before_commit(repository_setup):
     previous_sha = commits[1]["sha"]
 
     # Step 4: Call the function to fetch file content from before the current commit
-    result = get_files_before_commit_tool(
-        sha=current_sha,
-        files=[file_path],
-        repo=f"{test_username}/{repo_name}",
+    result = asyncio.run(
+        get_files_before_commit_tool(
+            sha=current_sha,
+            files=[file_path],
+            repo=f"{test_username}/{repo_name}",
+        )
     )
 
     assert isinstance(result, dict)
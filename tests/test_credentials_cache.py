@@ -0,0 +1,85 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from starlette.requests import Request
+from app.middleware.github import GithubAuthMiddleware as auth
+from app.middleware.github.GithubAuthMiddleware import (
+    CredentialsCache,
+    GithubAuthMiddleware,
+    RequestContext,
+)
+
+
+class FakeClock:
+    """Stand-in for the time module, advanced by hand."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+class FakeDatabase:
+    """Credentials store counting the lookups that reach it."""
+
+    def __init__(self):
+        self.lookups = 0
+
+    def get_credentials(self, access_token):
+        self.lookups += 1
+        return {"user_id": "1", "credentials": {"access_token": access_token}}
+
+
+def test_credentials_expire_after_the_ttl(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(auth, "time", clock)
+    cache = CredentialsCache(ttl=60, max_entries=10)
+    cache.set("token", {"user_id": "1"})
+
+    clock.now += 59
+    assert cache.get("token") == {"user_id": "1"}
+    clock.now += 2
+    assert cache.get("token") is None
+    assert "token" not in cache.entries
+
+
+def test_least_recently_used_credentials_are_evicted():
+    cache = CredentialsCache(ttl=60, max_entries=2)
+    cache.set("a", {"user_id": "1"})
+    cache.set("b", {"user_id": "2"})
+    cache.get("a")
+    cache.set("c", {"user_id": "3"})
+
+    assert list(cache.entries) == ["a", "c"]
+    assert cache.get("b") is None
+
+
+def test_credentials_are_invalidated_by_user():
+    cache = CredentialsCache(ttl=60, max_entries=10)
+    cache.set("a", {"user_id": 1})
+    cache.set("b", {"user_id": "1"})
+    cache.set("c", {"user_id": "2"})
+
+    cache.invalidate(user_id="1")
+
+    assert list(cache.entries) == ["c"]
+
+
+def test_middleware_looks_each_token_up_once(monkeypatch):
+    monkeypatch.setattr(
+        auth, "credentials_cache", CredentialsCache(ttl=60, max_entries=10)
+    )
+    middleware = GithubAuthMiddleware(None)
+    middleware.db_handler = FakeDatabase()
+    request = Request({"type": "http", "headers": [(b"x-access-token", b"token")]})
+
+    contexts = [RequestContext(), RequestContext()]
+    for ctx in contexts:
+        middleware.authenticate(request, ctx)
+
+    assert middleware.db_handler.lookups == 1
+    assert all(ctx.is_authenticated for ctx in contexts)
+    assert contexts[1].credentials == {"access_token": "token"}
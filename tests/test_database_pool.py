@@ -0,0 +1,46 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+import sqlite3
+import pytest
+from app.middleware.github.database import ConnectionPool
+
+
+def make_pool(tmp_path, size=2) -> ConnectionPool:
+    pool = ConnectionPool(
+        str(tmp_path / "db.sqlite"), size=size, mmap_size=0, busy_timeout=1000
+    )
+    with pool.connection() as conn:
+        conn.execute("CREATE TABLE items (name TEXT)")
+        conn.commit()
+    return pool
+
+
+def test_connection_is_returned_when_the_block_fails(tmp_path):
+    pool = make_pool(tmp_path)
+
+    with pytest.raises(RuntimeError):
+        with pool.connection() as conn:
+            conn.execute("INSERT INTO items VALUES ('half written')")
+            raise RuntimeError("failed mid transaction")
+
+    # The same connection is lent again, with its transaction rolled back
+    with pool.connection() as again:
+        assert again is conn
+        assert not again.in_transaction
+        assert again.execute("SELECT COUNT(*) FROM items").fetchone()[0] == 0
+
+
+def test_connections_over_the_pool_size_are_closed(tmp_path):
+    pool = make_pool(tmp_path, size=1)
+
+    with pool.connection() as first:
+        with pool.connection() as second:
+            assert second is not first
+
+    assert pool.idle.qsize() == 1
+    assert pool.acquire() is second
+    with pytest.raises(sqlite3.ProgrammingError):
+        first.execute("SELECT 1")
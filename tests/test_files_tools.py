@@ -1,3 +1,4 @@
+import asyncio
 import os
 import sys
 from app.tools.create_file import create_file_tool
@@ -8,6 +9,8 @@ from app.tools.search_files import search_files_tool
 from app.tools.update_file import update_file_tool
 from app.tools.get_files_details import get_files_details_tool
 from app.tools.delete_files import delete_files_tool
+from app.tools.commit_files import commit_files_tool
+from app.utils.github import code_index, mirror, snapshots
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
 
@@ -18,10 +21,12 @@ def test_create_file(repository_setup):
     file_path = "test-folder/test_create_file.txt"
     file_content = "Hello, this is a test file."
 
-    response_data = create_file_tool(
-        repo=f"{test_username}/{repo_name}",
-        file_path=file_path,
-        content=file_content,
+    response_data = asyncio.run(
+        create_file_tool(
+            repo=f"{test_username}/{repo_name}",
+            file_path=file_path,
+            content=file_content,
+        )
     )
 
     assert isinstance(response_data, dict)
@@ -36,17 +41,21 @@ def test_create_file_from_branch(repository_setup):
     new_branch = "test_create_file_from_branch"
 
     # Create the new branch first
-    response_data = create_branch_tool(
-        repo=f"{test_username}/{repo_name}",
-        new_branch=new_branch,
+    response_data = asyncio.run(
+        create_branch_tool(
+            repo=f"{test_username}/{repo_name}",
+            new_branch=new_branch,
+        )
     )
 
     # Now create the file in the new branch
-    response_data = create_file_tool(
-        repo=f"{test_username}/{repo_name}",
-        file_path=file_path,
-        content=file_content,
-        branch=new_branch,
+    response_data = asyncio.run(
+        create_file_tool(
+            repo=f"{test_username}/{repo_name}",
+            file_path=file_path,
+            content=file_content,
+            branch=new_branch,
+        )
     )
 
     assert isinstance(response_data, dict)
@@ -62,19 +71,23 @@ def test_update_file(repository_setup):
     updated_content = "Updated content for testing."
 
     # First, create the file (if needed)
-    create_response = create_file_tool(
-        repo=f"{test_username}/{repo_name}",
-        file_path=file_path,
-        content=initial_content,
+    create_response = asyncio.run(
+        create_file_tool(
+            repo=f"{test_username}/{repo_name}",
+            file_path=file_path,
+            content=initial_content,
+        )
     )
     assert create_response.get("message") == "File created successfully."
 
     # Then, try updating it
-    update_response = update_file_tool(
-        repo=f"{test_username}/{repo_name}",
-        file_path=file_path,
-        new_content=updated_content,
-        commit_message="Test update commit",
+    update_response = asyncio.run(
+        update_file_tool(
+            repo=f"{test_username}/{repo_name}",
+            file_path=file_path,
+            new_content=updated_content,
+            commit_message="Test update commit",
+        )
     )
 
     assert isinstance(update_response, dict)
@@ -90,27 +103,33 @@ def test_update_file_from_branch(repository_setup):
     new_branch = "test_update_file_from_branch"
 
     # Step 1: Create the new branch
-    create_branch_tool(
-        repo=f"{test_username}/{repo_name}",
-        new_branch=new_branch,
+    asyncio.run(
+        create_branch_tool(
+            repo=f"{test_username}/{repo_name}",
+            new_branch=new_branch,
+        )
     )
 
     # Step 2: Create the file in the new branch
-    create_file_response = create_file_tool(
-        repo=f"{test_username}/{repo_name}",
-        file_path=file_path,
-        content=initial_content,
-        branch=new_branch,
+    create_file_response = asyncio.run(
+        create_file_tool(
+            repo=f"{test_username}/{repo_name}",
+            file_path=file_path,
+            content=initial_content,
+            branch=new_branch,
+        )
     )
     assert create_file_response.get("message") == "File created successfully."
 
     # Step 3: Update the file in the new branch
-    update_file_response = update_file_tool(
-        repo=f"{test_username}/{repo_name}",
-        file_path=file_path,
-        new_content=updated_content,
-        commit_message="Update file in new branch",
-        branch=new_branch,
+    update_file_response = asyncio.run(
+        update_file_tool(
+            repo=f"{test_username}/{repo_name}",
+            file_path=file_path,
+            new_content=updated_content,
+            commit_message="Update file in new branch",
+            branch=new_branch,
+        )
     )
 
     assert isinstance(update_file_response, dict)
@@ -124,16 +143,20 @@ def test_get_files_contents(repository_setup):
     content = "Hello from main branch!"
 
     # Create the file
-    response = create_file_tool(
-        repo=f"{test_username}/{repo_name}",
-        file_path=file_path,
-        content=content,
+    response = asyncio.run(
+        create_file_tool(
+            repo=f"{test_username}/{repo_name}",
+            file_path=file_path,
+            content=content,
+        )
     )
 
     # Fetch the content
-    response = get_files_contents_tool(
-        repo=f"{test_username}/{repo_name}",
-        file_paths=[file_path],
+    response = asyncio.run(
+        get_files_contents_tool(
+            repo=f"{test_username}/{repo_name}",
+            file_paths=[file_path],
+        )
     )
 
     assert isinstance(response, dict)
@@ -142,6 +165,42 @@ def test_get_files_contents(repository_setup):
     assert file_data["content"] == content
 
 
+def test_get_files_contents_multiple_files(repository_setup):
+    test_username, repo_name = repository_setup
+
+    file_paths = [f"test-folder/test_get_files_contents_{i}.txt" for i in range(5)]
+
+    # Create the files
+    for i, file_path in enumerate(file_paths):
+        asyncio.run(
+            create_file_tool(
+                repo=f"{test_username}/{repo_name}",
+                file_path=file_path,
+                content=f"Content of file {i}",
+            )
+        )
+
+    # Fetch the files together with one that does not exist
+    response = asyncio.run(
+        get_files_contents_tool(
+            repo=f"{test_username}/{repo_name}",
+            file_paths=file_paths + ["test-folder/missing.txt"],
+        )
+    )
+
+    assert isinstance(response, dict)
+    file_contents = response["data"]["file_contents"]
+    assert response["data"]["total_count"] == len(file_paths) + 1
+
+    # Results come back in the requested order
+    assert [f["file_path"] for f in file_contents] == file_paths + [
+        "test-folder/missing.txt"
+    ]
+    for i, file_data in enumerate(file_contents[:-1]):
+        assert file_data["content"] == f"Content of file {i}"
+    assert file_contents[-1]["content"].startswith("Error fetching content")
+
+
 def test_get_files_contents_from_branch(repository_setup):
     test_username, repo_name = repository_setup
 
@@ -150,19 +209,25 @@ def test_get_files_contents_from_branch(repository_setup):
     branch = "test_get_file_content_from_branch"
 
     # Create branch and file
-    create_branch_tool(repo=f"{test_username}/{repo_name}", new_branch=branch)
-    create_file_tool(
-        repo=f"{test_username}/{repo_name}",
-        file_path=file_path,
-        content=content,
-        branch=branch,
+    asyncio.run(
+        create_branch_tool(repo=f"{test_username}/{repo_name}", new_branch=branch)
+    )
+    asyncio.run(
+        create_file_tool(
+            repo=f"{test_username}/{repo_name}",
+            file_path=file_path,
+            content=content,
+            branch=branch,
+        )
     )
 
     # Fetch the content from that branch
-    response = get_files_contents_tool(
-        repo=f"{test_username}/{repo_name}",
-        file_paths=[file_path],
-        branch=branch,
+    response = asyncio.run(
+        get_files_contents_tool(
+            repo=f"{test_username}/{repo_name}",
+            file_paths=[file_path],
+            branch=branch,
+        )
     )
 
     assert isinstance(response, dict)
@@ -184,14 +249,16 @@ def test_list_files(repository_setup):
     ]
 
     for file_path in file_paths:
-        create_file_tool(
-            repo=f"{test_username}/{repo_name}",
-            file_path=file_path,
-            content="This is a test file.",
+        asyncio.run(
+            create_file_tool(
+                repo=f"{test_username}/{repo_name}",
+                file_path=file_path,
+                content="This is a test file.",
+            )
         )
 
     # Test case 1: List all files (shallow)
-    response = list_files_tool(repo=f"{test_username}/{repo_name}")
+    response = asyncio.run(list_files_tool(repo=f"{test_username}/{repo_name}"))
 
     assert isinstance(response, dict)
     assert "files" in response["data"]
@@ -202,7 +269,9 @@ def test_list_files(repository_setup):
 
     # Test case 2: Shallow listing inside specific folders
     folders = ["src", "docs"]
-    response = list_files_tool(repo=f"{test_username}/{repo_name}", folders=folders)
+    response = asyncio.run(
+        list_files_tool(repo=f"{test_username}/{repo_name}", folders=folders)
+    )
     assert isinstance(response, dict)
     assert "files" in response["data"]
 
@@ -226,7 +295,9 @@ def test_list_files_from_branch(repository_setup):
     branch = "test_list_files_from_branch"
 
     # Create branch and file
-    create_branch_tool(repo=f"{test_username}/{repo_name}", new_branch=branch)
+    asyncio.run(
+        create_branch_tool(repo=f"{test_username}/{repo_name}", new_branch=branch)
+    )
 
     # Step 1: Create files in the repository before listing
     file_paths = [
@@ -238,15 +309,19 @@ def test_list_files_from_branch(repository_setup):
     ]
 
     for file_path in file_paths:
-        create_file_tool(
-            repo=f"{test_username}/{repo_name}",
-            file_path=file_path,
-            content="This is a test file.",
-            branch=branch,
+        asyncio.run(
+            create_file_tool(
+                repo=f"{test_username}/{repo_name}",
+                file_path=file_path,
+                content="This is a test file.",
+                branch=branch,
+            )
         )
 
     # Test case 1: List all files (shallow)
-    response = list_files_tool(repo=f"{test_username}/{repo_name}", branch=branch)
+    response = asyncio.run(
+        list_files_tool(repo=f"{test_username}/{repo_name}", branch=branch)
+    )
     assert isinstance(response, dict)
     assert "files" in response["data"]
 
@@ -256,8 +331,10 @@ def test_list_files_from_branch(repository_setup):
 
     # Test case 2: Shallow listing inside specific folders
     folders = ["src", "docs"]
-    response = list_files_tool(
-        repo=f"{test_username}/{repo_name}", folders=folders, branch=branch
+    response = asyncio.run(
+        list_files_tool(
+            repo=f"{test_username}/{repo_name}", folders=folders, branch=branch
+        )
     )
     assert isinstance(response, dict)
     assert "files" in response["data"]
@@ -275,14 +352,32 @@ def test_list_files_from_branch(repository_setup):
 
     assert expected_shallow_contents.issubset(set(response["data"]["files"]))
 
+    # Test case 3: Glob across folders with details
+    response = asyncio.run(
+        list_files_tool(
+            repo=f"{test_username}/{repo_name}",
+            branch=branch,
+            pattern="**/*.md",
+            include_details=True,
+        )
+    )
+    assert isinstance(response, dict)
+
+    paths = {f["path"] for f in response["data"]["files"]}
+    assert {"README.md", "docs/readme.md", "docs/setup.md"}.issubset(paths)
+    assert all(f["type"] == "blob" for f in response["data"]["files"])
+    assert not any(path.endswith(".txt") for path in paths)
+
 
 def test_search_files_tool(auth_setup):
 
-    response = search_files_tool(
-        search_string="Test Repository",  # search string that should match README.md
-        repo=f"zpqrtbnk/test-repo",
-        page=1,
-        per_page=10,
+    response = asyncio.run(
+        search_files_tool(
+            search_string="Test Repository",  # search string that should match README.md
+            repo=f"zpqrtbnk/test-repo",
+            page=1,
+            per_page=10,
+        )
     )
 
     assert isinstance(response, dict)
@@ -293,12 +388,14 @@ def test_search_files_tool(auth_setup):
     # Assert that README.md is part of the matching files
     assert any(f["name"] == "README.md" for f in matching_files)
 
-    response = search_files_tool(
-        search_string="Build Branch",  # search string that should match README.md
-        repo=f"zpqrtbnk/test-repo",
-        folders=[".github/workflows"],
-        page=1,
-        per_page=10,
+    response = asyncio.run(
+        search_files_tool(
+            search_string="Build Branch",  # search string that should match README.md
+            repo=f"zpqrtbnk/test-repo",
+            folders=[".github/workflows"],
+            page=1,
+            per_page=10,
+        )
     )
 
     assert isinstance(response, dict)
@@ -309,6 +406,17 @@ def test_search_files_tool(auth_setup):
     # Assert that branch.yml is part of the matching files
     assert any(f["name"] == "branch.yml" for f in matching_files)
 
+    # GitHub code search can't match case, it needs the local code index
+    response = asyncio.run(
+        search_files_tool(
+            search_string="Build Branch",
+            repo=f"zpqrtbnk/test-repo",
+            case_sensitive=True,
+        )
+    )
+
+    assert "error" in response
+
 
 def test_get_files_details(repository_setup):
     test_username, repo_name = repository_setup
@@ -321,15 +429,17 @@ def test_get_files_details(repository_setup):
         "test_get_files_details/setup.md",
     ]
     for path in file_paths:
-        create_file_tool(
-            repo=f"{test_username}/{repo_name}",
-            file_path=path,
-            content="This is a test file.",
+        asyncio.run(
+            create_file_tool(
+                repo=f"{test_username}/{repo_name}",
+                file_path=path,
+                content="This is a test file.",
+            )
         )
 
     # Step 2: Get file details
-    response = get_files_details_tool(
-        repo=f"{test_username}/{repo_name}", files=file_paths
+    response = asyncio.run(
+        get_files_details_tool(repo=f"{test_username}/{repo_name}", files=file_paths)
     )
 
     # Step 3: Assert results
@@ -347,13 +457,28 @@ def test_get_files_details(repository_setup):
         assert "type" in file
         assert "url" in file
 
+    # Step 4: A missing file is reported on its own without failing the others
+    response = asyncio.run(
+        get_files_details_tool(
+            repo=f"{test_username}/{repo_name}",
+            files=[file_paths[0], "test_get_files_details/missing.txt"],
+        )
+    )
+
+    assert response["total_count"] == 2
+    assert response["file_details"][0]["path"] == file_paths[0]
+    assert response["file_details"][0]["type"] == "file"
+    assert "error" in response["file_details"][1]
+
 
 def test_get_files_details_from_branch(repository_setup):
     test_username, repo_name = repository_setup
     branch = "test_get_files_details_from_branch"
 
     # Create branch and file
-    create_branch_tool(repo=f"{test_username}/{repo_name}", new_branch=branch)
+    asyncio.run(
+        create_branch_tool(repo=f"{test_username}/{repo_name}", new_branch=branch)
+    )
 
     # Step 1: Create files in the repository
     file_paths = [
@@ -363,16 +488,20 @@ def test_get_files_details_from_branch(repository_setup):
         "test_get_files_details_from_branch/setup.md",
     ]
     for path in file_paths:
-        create_file_tool(
-            repo=f"{test_username}/{repo_name}",
-            file_path=path,
-            content="This is a test file.",
-            branch=branch,
+        asyncio.run(
+            create_file_tool(
+                repo=f"{test_username}/{repo_name}",
+                file_path=path,
+                content="This is a test file.",
+                branch=branch,
+            )
         )
 
     # Step 2: Get file details
-    response = get_files_details_tool(
-        repo=f"{test_username}/{repo_name}", files=file_paths, branch=branch
+    response = asyncio.run(
+        get_files_details_tool(
+            repo=f"{test_username}/{repo_name}", files=file_paths, branch=branch
+        )
     )
 
     # Step 3: Assert results
@@ -397,17 +526,21 @@ def test_delete_files(repository_setup):
     file_path = "test_delete_files.txt"
     file_content = "Hello, this is a test file."
 
-    response_data = create_file_tool(
-        repo=f"{test_username}/{repo_name}",
-        file_path=file_path,
-        content=file_content,
+    response_data = asyncio.run(
+        create_file_tool(
+            repo=f"{test_username}/{repo_name}",
+            file_path=file_path,
+            content=file_content,
+        )
     )
 
     # Test case 1: Generate confirmation token
     file_paths = [file_path]
-    response_data = delete_files_tool(
-        repo=f"{test_username}/{repo_name}",
-        file_paths=file_paths,
+    response_data = asyncio.run(
+        delete_files_tool(
+            repo=f"{test_username}/{repo_name}",
+            file_paths=file_paths,
+        )
     )
 
     assert isinstance(response_data, dict)
@@ -416,10 +549,12 @@ def test_delete_files(repository_setup):
     confirmation_token = response_data["confirmation_token"]
 
     # Confirm the deletion by sending the token
-    response_data = delete_files_tool(
-        repo=f"{test_username}/{repo_name}",
-        file_paths=file_paths,
-        confirmation_token=confirmation_token,
+    response_data = asyncio.run(
+        delete_files_tool(
+            repo=f"{test_username}/{repo_name}",
+            file_paths=file_paths,
+            confirmation_token=confirmation_token,
+        )
     )
 
     # Assert the file has been deleted
@@ -438,19 +573,25 @@ def test_delete_files_from_branch(repository_setup):
     branch = "test_delete_files_from_branch"
 
     # Create branch and file
-    create_branch_tool(repo=f"{test_username}/{repo_name}", new_branch=branch)
+    asyncio.run(
+        create_branch_tool(repo=f"{test_username}/{repo_name}", new_branch=branch)
+    )
 
-    response_data = create_file_tool(
-        repo=f"{test_username}/{repo_name}",
-        file_path=file_path,
-        content=file_content,
-        branch=branch,
+    response_data = asyncio.run(
+        create_file_tool(
+            repo=f"{test_username}/{repo_name}",
+            file_path=file_path,
+            content=file_content,
+            branch=branch,
+        )
     )
 
     # Test case 1: Generate confirmation token
     file_paths = [file_path]
-    response_data = delete_files_tool(
-        repo=f"{test_username}/{repo_name}", file_paths=file_paths, branch=branch
+    response_data = asyncio.run(
+        delete_files_tool(
+            repo=f"{test_username}/{repo_name}", file_paths=file_paths, branch=branch
+        )
     )
 
     assert isinstance(response_data, dict)
@@ -459,11 +600,13 @@ def test_delete_files_from_branch(repository_setup):
     confirmation_token = response_data["confirmation_token"]
 
     # Confirm the deletion by sending the token
-    response_data = delete_files_tool(
-        repo=f"{test_username}/{repo_name}",
-        file_paths=file_paths,
-        branch=branch,
-        confirmation_token=confirmation_token,
+    response_data = asyncio.run(
+        delete_files_tool(
+            repo=f"{test_username}/{repo_name}",
+            file_paths=file_paths,
+            branch=branch,
+            confirmation_token=confirmation_token,
+        )
     )
 
     # Assert the file has been deleted
@@ -472,3 +615,143 @@ def test_delete_files_from_branch(repository_setup):
     assert len(response_data["responses"]) > 0
     assert response_data["responses"][0]["file_path"] == file_path
     assert response_data["responses"][0]["message"] == "File deleted successfully."
+
+
+def test_delete_multiple_files(repository_setup):
+    test_username, repo_name = repository_setup
+
+    file_paths = [f"test-delete/test_delete_files_{i}.txt" for i in range(3)]
+
+    for file_path in file_paths:
+        asyncio.run(
+            create_file_tool(
+                repo=f"{test_username}/{repo_name}",
+                file_path=file_path,
+                content="Hello, this is a test file.",
+            )
+        )
+
+    # Generate confirmation token
+    response_data = asyncio.run(
+        delete_files_tool(repo=f"{test_username}/{repo_name}", file_paths=file_paths)
+    )
+    confirmation_token = response_data["confirmation_token"]
+
+    # Confirm the deletion, all files are removed in one commit
+    response_data = asyncio.run(
+        delete_files_tool(
+            repo=f"{test_username}/{repo_name}",
+            file_paths=file_paths,
+            confirmation_token=confirmation_token,
+        )
+    )
+
+    assert isinstance(response_data, dict)
+    assert response_data.get("commit_sha")
+    assert [r["file_path"] for r in response_data["responses"]] == file_paths
+    assert all(
+        r.get("message") == "File deleted successfully."
+        for r in response_data["responses"]
+    )
+
+
+def test_commit_files(repository_setup):
+    test_username, repo_name = repository_setup
+    repo = f"{test_username}/{repo_name}"
+
+    asyncio.run(
+        create_file_tool(
+            repo=repo,
+            file_path="test-commit/existing.txt",
+            content="Existing content.",
+        )
+    )
+
+    operations = [
+        {
+            "action": "create",
+            "file_path": "test-commit/new.txt",
+            "content": "New content.",
+        },
+        {
+            "action": "update",
+            "file_path": "test-commit/existing.txt",
+            "content": "Updated content.",
+        },
+    ]
+
+    # Apply both operations in one commit with concurrent blob creation
+    response_data = asyncio.run(
+        commit_files_tool(
+            repo=repo,
+            operations=operations,
+            commit_message="Commit multiple files",
+            concurrent_blobs=True,
+        )
+    )
+
+    assert isinstance(response_data, dict)
+    assert response_data.get("commit_sha")
+    assert [f["file_path"] for f in response_data["files"]] == [
+        "test-commit/new.txt",
+        "test-commit/existing.txt",
+    ]
+
+    response = asyncio.run(
+        get_files_contents_tool(
+            repo=repo, file_paths=["test-commit/new.txt", "test-commit/existing.txt"]
+        )
+    )
+    contents = [f["content"] for f in response["data"]["file_contents"]]
+    assert contents == ["New content.", "Updated content."]
+
+    # Invalid operations are rejected without committing anything
+    response_data = asyncio.run(
+        commit_files_tool(
+            repo=repo,
+            operations=[
+                {"action": "delete", "file_path": "test-commit/new.txt"},
+                {"action": "update", "file_path": "test-commit/missing.txt"},
+            ],
+        )
+    )
+
+    assert "error" in response_data
+    assert response_data["details"][0]["file_path"] == "test-commit/missing.txt"
+
+
+def test_search_files_in_code_index(repository_setup, tmp_path, monkeypatch):
+    test_username, repo_name = repository_setup
+    repo = f"{test_username}/{repo_name}"
+
+    # Index the mirror of the test repository
+    monkeypatch.setattr(mirror, "MIRROR_PATH", str(tmp_path))
+    monkeypatch.setitem(mirror.github_mirror_config, "repos", [repo])
+    monkeypatch.setitem(code_index.code_index_config, "enabled", True)
+
+    response_data = asyncio.run(
+        search_files_tool(search_string=f"^# {repo_name}$", repo=repo, regex=True)
+    )
+
+    matching_files = response_data["matching_files"]
+    assert [file["path"] for file in matching_files] == ["README.md"]
+    assert matching_files[0]["matches"][0] == {"line": 1, "text": f"# {repo_name}"}
+
+
+def test_files_from_snapshot(repository_setup, tmp_path, monkeypatch):
+    test_username, repo_name = repository_setup
+    repo = f"{test_username}/{repo_name}"
+
+    # Read the files through a snapshot stored in a temporary folder
+    store = snapshots.SnapshotStore(str(tmp_path), 1024 * 1024)
+    monkeypatch.setattr(snapshots, "snapshot_store", store)
+    monkeypatch.setitem(snapshots.snapshot_config, "min_files", 1)
+
+    response_data = asyncio.run(
+        get_files_contents_tool(repo=repo, file_paths=["README.md"])
+    )
+
+    assert len(store.manifests) == 1
+    file_contents = response_data["data"]["file_contents"]
+    assert file_contents[0]["file_path"] == "README.md"
+    assert repo_name in file_contents[0]["content"]
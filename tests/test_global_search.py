@@ -1,3 +1,4 @@
+import asyncio
 import os
 import sys
 from app.tools.global_search import global_search_tool
@@ -9,7 +10,7 @@ def test_global_search_tool_repositories(auth_setup):
     search_type = "repositories"
     query = "machine learning"
 
-    result = global_search_tool(search_type=search_type, query=query)
+    result = asyncio.run(global_search_tool(search_type=search_type, query=query))
 
     assert isinstance(result, dict)
     assert "results" in result
@@ -21,7 +22,7 @@ def test_global_search_tool_repositories(auth_setup):
 
 
 def test_global_search_tool_code(auth_setup):
-    result = global_search_tool(search_type="code", query="authentication")
+    result = asyncio.run(global_search_tool(search_type="code", query="authentication"))
 
     assert isinstance(result, dict)
     assert "results" in result
@@ -29,7 +30,7 @@ def test_global_search_tool_code(auth_setup):
 
 
 def test_global_search_tool_invalid_type(auth_setup):
-    result = global_search_tool(search_type="invalid", query="test")
+    result = asyncio.run(global_search_tool(search_type="invalid", query="test"))
 
     assert isinstance(result, dict)
     assert "error" in result
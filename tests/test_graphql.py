@@ -0,0 +1,60 @@
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from app.utils.github import graphql
+from app.utils.github.blob_cache import blob_cache
+from app.utils.github.git_data import blob_sha
+
+
+def answer_blobs(method, path, payload):
+    """Answer the aliased object() lookups of a query from the file names."""
+    blobs = {}
+    for name, expression in payload["variables"].items():
+        if not name.startswith("e"):
+            continue
+        path = expression.split(":", 1)[1]
+        text = f"content of {path}"
+        blobs[f"f{name[1:]}"] = (
+            None
+            if path == "missing.txt"
+            else {
+                "oid": blob_sha(text.encode()),
+                "byteSize": len(text),
+                "isBinary": path == "image.png",
+                "isTruncated": False,
+                "text": None if path == "image.png" else text,
+            }
+        )
+    return 200, {"data": {"repository": blobs}}
+
+
+def test_blobs_are_fetched_in_batches(fake_tools, monkeypatch):
+    url, responses, requests = fake_tools
+    monkeypatch.setattr(graphql, "GITHUB_GRAPHQL_URL", f"{url}/graphql")
+    monkeypatch.setitem(graphql.github_api_config, "graphql_batch_size", 2)
+    responses.routes["/graphql"] = answer_blobs
+    paths = ["a.py", "b.py", "image.png", "missing.txt", "a.py"]
+
+    blobs = asyncio.run(graphql.fetch_blobs("owner/repo", "main", paths, "token"))
+
+    # Four unique paths in batches of two
+    assert [(method, path) for method, path, _ in requests] == [
+        ("POST", "/graphql")
+    ] * 2
+    # Binary and missing files are left to the REST fallback
+    assert sorted(blobs) == ["a.py", "b.py"]
+    assert blobs["a.py"]["text"] == "content of a.py"
+    assert blob_cache.get(blobs["b.py"]["oid"]) == b"content of b.py"
+
+
+def test_failed_batches_fall_back_to_rest(fake_tools, monkeypatch):
+    url, responses, requests = fake_tools
+    monkeypatch.setattr(graphql, "GITHUB_GRAPHQL_URL", f"{url}/graphql")
+    responses.routes["/graphql"] = (200, {"data": None, "errors": [{"message": "x"}]})
+
+    blobs = asyncio.run(graphql.fetch_blobs("owner/repo", "main", ["a.py"], "token"))
+
+    assert blobs == {}
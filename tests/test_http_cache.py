@@ -0,0 +1,94 @@
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+import httpx
+from app.utils.github import client as github
+from app.utils.github.http_cache import HttpCache
+
+
+def cached_get(cache: HttpCache, url: str, body: bytes, etag: str) -> httpx.Request:
+    """Store a 200 answer of a GET in the cache, returning the request."""
+    request = httpx.Request("GET", url, headers={"Authorization": "token one"})
+    cache.store(
+        request,
+        httpx.Response(200, headers={"ETag": etag}, content=body, request=request),
+    )
+    return request
+
+
+def test_get_is_revalidated_with_its_etag(fake_github):
+    url, responses, requests = fake_github
+    headers = {"Authorization": f"token {os.urandom(4).hex()}"}
+    responses.extend([(200, {"ETag": '"v1"'}), (304, {"ETag": '"v1"'})])
+
+    async def run():
+        first = await github.get(f"{url}/repos/owner/repo", headers=headers)
+        second = await github.get(f"{url}/repos/owner/repo", headers=headers)
+        return first, second
+
+    first, second = asyncio.run(run())
+
+    assert "if-none-match" not in responses.request_headers[0]
+    assert responses.request_headers[1]["if-none-match"] == '"v1"'
+    # The 304 is answered with the cached body
+    assert second.status_code == 200
+    assert second.json() == first.json() == {"message": "ok"}
+
+
+def test_responses_without_validators_or_errors_are_not_cached():
+    cache = HttpCache(max_bytes=1024)
+    request = httpx.Request("GET", "https://api.github.com/repos/owner/repo")
+
+    cache.store(request, httpx.Response(200, content=b"{}", request=request))
+    cache.store(
+        request,
+        httpx.Response(404, headers={"ETag": '"v1"'}, content=b"{}", request=request),
+    )
+
+    assert cache.entries == {}
+    assert cache.add_validators(request) is None
+
+
+def test_least_recently_used_responses_are_evicted():
+    cache = HttpCache(max_bytes=10)
+    first = cached_get(cache, "https://api.github.com/a", b"aaaa", '"a"')
+    cached_get(cache, "https://api.github.com/b", b"bbbb", '"b"')
+    # Serving the first one after a 304 makes it the most recently used
+    cache.cached_response(cache.add_validators(first), first)
+    cached_get(cache, "https://api.github.com/c", b"cccc", '"c"')
+    # Larger than the whole budget, never kept
+    cached_get(cache, "https://api.github.com/d", b"d" * 11, '"d"')
+
+    kept = {
+        url
+        for url in "abcd"
+        if cache.add_validators(
+            httpx.Request(
+                "GET",
+                f"https://api.github.com/{url}",
+                headers={"Authorization": "token one"},
+            )
+        )
+    }
+    assert kept == {"a", "c"}
+    assert cache.current_bytes == 8
+
+
+def test_not_modified_is_answered_after_the_entry_is_evicted():
+    cache = HttpCache(max_bytes=4)
+    cached_get(cache, "https://api.github.com/a", b"aaaa", '"a"')
+    request = httpx.Request(
+        "GET", "https://api.github.com/a", headers={"Authorization": "token one"}
+    )
+    entry = cache.add_validators(request)
+    # Another response takes the budget while the conditional request is in flight
+    cached_get(cache, "https://api.github.com/b", b"bbbb", '"b"')
+
+    response = cache.cached_response(entry, request)
+
+    assert request.headers["if-none-match"] == '"a"'
+    assert response.status_code == 200
+    assert response.content == b"aaaa"
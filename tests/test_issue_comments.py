@@ -0,0 +1,80 @@
+import asyncio
+import os
+import sys
+from urllib.parse import parse_qs, urlsplit
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from app.utils.github import client as github
+from app.utils.github.issue_comments import PER_PAGE, get_issues_comments
+
+
+def comment_pages(total: int, failing_page: int = None):
+    """Answer the pages of an issue with total comments, failing one if asked."""
+
+    def answer(method, path, payload):
+        page = int(parse_qs(urlsplit(path).query)["page"][0])
+        if page == failing_page:
+            return 500, {"message": "Server Error"}
+        first = (page - 1) * PER_PAGE
+        return 200, [{"id": i} for i in range(first, min(first + PER_PAGE, total))]
+
+    return answer
+
+
+def make_issue(url: str, number: int, comments: int, updated_at: str) -> dict:
+    return {
+        "comments_url": f"{url}/repos/owner/repo/issues/{number}/comments",
+        "comments": comments,
+        "updated_at": updated_at,
+    }
+
+
+def comment_calls(requests) -> list:
+    return [path for _, path, _ in requests if "/comments" in path]
+
+
+def test_comments_are_cached_until_the_issue_changes(fake_github):
+    url, responses, requests = fake_github
+    responses.routes["/repos/owner/repo/issues/1/comments"] = comment_pages(150)
+    token = os.urandom(4).hex()
+    issues = [
+        make_issue(url, 1, 150, "2024-01-01T00:00:00Z"),
+        make_issue(url, 2, 0, "2024-01-01T00:00:00Z"),
+    ]
+
+    first = asyncio.run(get_issues_comments(issues, token))
+    assert len(first[issues[0]["comments_url"]]) == 150
+    assert first[issues[1]["comments_url"]] == []
+    # Both pages of the first issue, nothing for the issue without comments
+    assert len(comment_calls(requests)) == 2
+
+    second = asyncio.run(get_issues_comments(issues, token))
+    assert second == first
+    assert len(comment_calls(requests)) == 2
+
+    # A new comment moves updated_at, the cached comments are stale
+    issues[0] = make_issue(url, 1, 150, "2024-01-02T00:00:00Z")
+    asyncio.run(get_issues_comments(issues, token))
+    assert len(comment_calls(requests)) == 4
+
+    # Comments are never shared between tokens
+    asyncio.run(get_issues_comments(issues, os.urandom(4).hex()))
+    assert len(comment_calls(requests)) == 6
+
+
+def test_issues_with_a_failed_page_are_left_out_and_not_cached(
+    fake_github, monkeypatch
+):
+    url, responses, requests = fake_github
+    monkeypatch.setitem(github.retry_config, "max_attempts", 1)
+    route = "/repos/owner/repo/issues/3/comments"
+    responses.routes[route] = comment_pages(150, failing_page=2)
+    token = os.urandom(4).hex()
+    issues = [make_issue(url, 3, 150, "2024-01-01T00:00:00Z")]
+
+    assert asyncio.run(get_issues_comments(issues, token)) == {}
+
+    responses.routes[route] = comment_pages(150)
+    comments = asyncio.run(get_issues_comments(issues, token))
+    assert len(comments[issues[0]["comments_url"]]) == 150
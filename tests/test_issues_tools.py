@@ -1,3 +1,4 @@
+import asyncio
 import os
 import sys
 from app.tools.create_issue import create_issue_tool
@@ -9,6 +10,7 @@ from app.tools.update_issue_comment import update_issue_comment_tool
 from app.tools.delete_issue_comment import delete_issue_comment_tool
 from app.tools.get_issue_details import get_issue_details_tool
 from app.tools.search_issues import search_issues_tool
+from app.utils.github import issue_index
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
 
@@ -20,11 +22,13 @@ def test_create_issue(repository_setup):
     body = "This is a test issue created by an automated test."
     labels = ["bug", "test"]
 
-    response_data = create_issue_tool(
-        repo=repo,
-        title=title,
-        body=body,
-        labels=labels,
+    response_data = asyncio.run(
+        create_issue_tool(
+            repo=repo,
+            title=title,
+            body=body,
+            labels=labels,
+        )
     )
 
     assert isinstance(response_data, dict)
@@ -46,19 +50,23 @@ def test_get_issues(repository_setup):
     body = "This is a test issue created by an automated test."
     labels = ["bug", "test"]
 
-    response_data = create_issue_tool(
-        repo=repo,
-        title=title,
-        body=body,
-        labels=labels,
+    response_data = asyncio.run(
+        create_issue_tool(
+            repo=repo,
+            title=title,
+            body=body,
+            labels=labels,
+        )
     )
 
-    response_data = get_issues_tool(
-        repo=repo,
-        state=state,
-        labels=labels,
-        per_page=5,
-        page=1,
+    response_data = asyncio.run(
+        get_issues_tool(
+            repo=repo,
+            state=state,
+            labels=labels,
+            per_page=5,
+            page=1,
+        )
     )
 
     assert isinstance(response_data, dict)
@@ -75,9 +83,11 @@ def test_update_issue(repository_setup):
     repo = f"{test_username}/{repo_name}"
 
     title = "Test Issue Title"
-    response_data = create_issue_tool(
-        repo=repo,
-        title=title,
+    response_data = asyncio.run(
+        create_issue_tool(
+            repo=repo,
+            title=title,
+        )
     )
 
     assert "number" in response_data
@@ -85,13 +95,15 @@ def test_update_issue(repository_setup):
     issue_number = response_data["number"]
 
     # Attempt to update title and body
-    response_data = update_issue_tool(
-        repo=repo,
-        issue_number=issue_number,
-        title="Updated Title from Test",
-        body="Updated body content from automated test.",
-        state="closed",
-        labels=["bug", "testing"],
+    response_data = asyncio.run(
+        update_issue_tool(
+            repo=repo,
+            issue_number=issue_number,
+            title="Updated Title from Test",
+            body="Updated body content from automated test.",
+            state="closed",
+            labels=["bug", "testing"],
+        )
     )
 
     assert isinstance(response_data, dict), "Expected response to be a dictionary"
@@ -106,9 +118,11 @@ def test_create_issue_comment(repository_setup):
     repo = f"{test_username}/{repo_name}"
 
     title = "Test Issue Title"
-    response_data = create_issue_tool(
-        repo=repo,
-        title=title,
+    response_data = asyncio.run(
+        create_issue_tool(
+            repo=repo,
+            title=title,
+        )
     )
 
     assert "number" in response_data
@@ -116,10 +130,12 @@ def test_create_issue_comment(repository_setup):
     issue_number = response_data["number"]
     comment = "This is a test comment added by an automated test."
 
-    response_data = create_issue_comment_tool(
-        repo=repo,
-        issue_number=issue_number,
-        comment=comment,
+    response_data = asyncio.run(
+        create_issue_comment_tool(
+            repo=repo,
+            issue_number=issue_number,
+            comment=comment,
+        )
     )
 
     assert isinstance(response_data, dict)
@@ -136,29 +152,35 @@ def test_get_issue_comments(repository_setup):
     title = "Test Issue for Comments"
     body = "This issue is used to test comment retrieval."
     labels = ["test"]
-    issue_response = create_issue_tool(
-        repo=repo,
-        title=title,
-        body=body,
-        labels=labels,
+    issue_response = asyncio.run(
+        create_issue_tool(
+            repo=repo,
+            title=title,
+            body=body,
+            labels=labels,
+        )
     )
     issue_number = issue_response["number"]
 
     # Step 2: Add a comment to the issue
     comment_text = "This is a test comment."
-    comment_response = create_issue_comment_tool(
-        repo=repo,
-        issue_number=issue_number,
-        comment=comment_text,
+    comment_response = asyncio.run(
+        create_issue_comment_tool(
+            repo=repo,
+            issue_number=issue_number,
+            comment=comment_text,
+        )
     )
     assert comment_response["body"] == comment_text
 
     # Step 3: Retrieve the issue details and comments
-    response_data = get_issue_comments_tool(
-        issue_number=issue_number,
-        repo=repo,
-        page=1,
-        per_page=10,
+    response_data = asyncio.run(
+        get_issue_comments_tool(
+            issue_number=issue_number,
+            repo=repo,
+            page=1,
+            per_page=10,
+        )
     )
 
     assert isinstance(response_data, dict)
@@ -177,9 +199,11 @@ def test_update_issue_comment(repository_setup):
 
     # Step 1: Create a test issue
     issue_title = "Test Issue for Comment Update"
-    issue_response = create_issue_tool(
-        repo=repo,
-        title=issue_title,
+    issue_response = asyncio.run(
+        create_issue_tool(
+            repo=repo,
+            title=issue_title,
+        )
     )
 
     assert "number" in issue_response, "Issue creation failed"
@@ -187,10 +211,12 @@ def test_update_issue_comment(repository_setup):
 
     # Step 2: Add a comment to the created issue
     original_comment = "Original comment for testing update."
-    comment_response = create_issue_comment_tool(
-        repo=repo,
-        issue_number=issue_number,
-        comment=original_comment,
+    comment_response = asyncio.run(
+        create_issue_comment_tool(
+            repo=repo,
+            issue_number=issue_number,
+            comment=original_comment,
+        )
     )
 
     assert "id" in comment_response, "Comment creation failed"
@@ -198,10 +224,12 @@ def test_update_issue_comment(repository_setup):
 
     # Step 3: Update the comment
     updated_comment_text = "This comment has been updated by a test case."
-    update_response = update_issue_comment_tool(
-        comment_id=comment_id,
-        new_comment=updated_comment_text,
-        repo=repo,
+    update_response = asyncio.run(
+        update_issue_comment_tool(
+            comment_id=comment_id,
+            new_comment=updated_comment_text,
+            repo=repo,
+        )
     )
 
     assert isinstance(
@@ -221,28 +249,34 @@ def test_delete_issue_comment(repository_setup):
     repo = f"{test_username}/{repo_name}"
 
     issue_title = "Test Issue for Comment Update"
-    issue_response = create_issue_tool(
-        repo=repo,
-        title=issue_title,
+    issue_response = asyncio.run(
+        create_issue_tool(
+            repo=repo,
+            title=issue_title,
+        )
     )
 
     assert "number" in issue_response, "Issue creation failed"
     issue_number = issue_response["number"]
 
     comment_body = "This is a test comment to be deleted."
-    create_response = create_issue_comment_tool(
-        repo=repo_full_name,
-        issue_number=issue_number,
-        comment=comment_body,
+    create_response = asyncio.run(
+        create_issue_comment_tool(
+            repo=repo_full_name,
+            issue_number=issue_number,
+            comment=comment_body,
+        )
     )
 
     assert isinstance(create_response, dict)
     assert "id" in create_response, "ID not found after create_issue_comment_tool"
     comment_id = create_response["id"]
 
-    response_data = delete_issue_comment_tool(
-        repo=repo_full_name,
-        comment_id=comment_id,
+    response_data = asyncio.run(
+        delete_issue_comment_tool(
+            repo=repo_full_name,
+            comment_id=comment_id,
+        )
     )
 
     assert isinstance(response_data, dict)
@@ -251,10 +285,12 @@ def test_delete_issue_comment(repository_setup):
 
     confirmation_token = response_data["confirmation_token"]
 
-    confirm_response = delete_issue_comment_tool(
-        repo=repo_full_name,
-        comment_id=comment_id,
-        confirmation_token=confirmation_token,
+    confirm_response = asyncio.run(
+        delete_issue_comment_tool(
+            repo=repo_full_name,
+            comment_id=comment_id,
+            confirmation_token=confirmation_token,
+        )
     )
 
     assert isinstance(confirm_response, dict)
@@ -269,18 +305,22 @@ def test_get_issue_details(repository_setup):
     title = "Test Issue for Issue Details"
     body = "This issue is used to test retrieving issue details."
     labels = ["test"]
-    issue_response = create_issue_tool(
-        repo=repo,
-        title=title,
-        body=body,
-        labels=labels,
+    issue_response = asyncio.run(
+        create_issue_tool(
+            repo=repo,
+            title=title,
+            body=body,
+            labels=labels,
+        )
     )
     issue_number = issue_response["number"]
 
     # Step 2: Retrieve the issue details
-    response_data = get_issue_details_tool(
-        issue_number=issue_number,
-        repo=repo,
+    response_data = asyncio.run(
+        get_issue_details_tool(
+            issue_number=issue_number,
+            repo=repo,
+        )
     )
 
     # Assertions with failure messages for better debugging
@@ -333,22 +373,26 @@ def test_search_issues(repository_setup):
     labels = ["bug", "test"]
 
     # Creating an issue using the create_issue_tool function
-    create_issue_tool(
-        repo=repo,
-        title=title,
-        body=body,
-        labels=labels,
+    asyncio.run(
+        create_issue_tool(
+            repo=repo,
+            title=title,
+            body=body,
+            labels=labels,
+        )
     )
 
     # Now, test the search_issues_tool function
-    response_data = search_issues_tool(
-        repo=repo,
-        state=state,
-        labels=labels,
-        per_page=5,
-        page=1,
-        search_comments=search_comments,
-        query=query,
+    response_data = asyncio.run(
+        search_issues_tool(
+            repo=repo,
+            state=state,
+            labels=labels,
+            per_page=5,
+            page=1,
+            search_comments=search_comments,
+            query=query,
+        )
     )
 
     # Validate the response
@@ -382,9 +426,11 @@ def test_search_issues_with_comments(repository_setup):
 
     # Create an issue using the create_issue_tool function
     title = "Test Issue Title"
-    response_data = create_issue_tool(
-        repo=repo,
-        title=title,
+    response_data = asyncio.run(
+        create_issue_tool(
+            repo=repo,
+            title=title,
+        )
     )
 
     assert "number" in response_data  # Ensure the issue was created and has a number
@@ -393,23 +439,27 @@ def test_search_issues_with_comments(repository_setup):
     comment = "This is a test comment added by an automated test."
 
     # Create a comment on the issue using the create_issue_comment_tool function
-    response_data = create_issue_comment_tool(
-        repo=repo,
-        issue_number=issue_number,
-        comment=comment,
+    response_data = asyncio.run(
+        create_issue_comment_tool(
+            repo=repo,
+            issue_number=issue_number,
+            comment=comment,
+        )
     )
 
     assert "id" in response_data  # Ensure the comment was created and has an ID
 
     # Now, test the search_issues_tool function, searching for the comment
-    response_data = search_issues_tool(
-        repo=repo,
-        state=state,
-        labels=labels,
-        per_page=5,
-        page=1,
-        search_comments=search_comments,
-        query=query,
+    response_data = asyncio.run(
+        search_issues_tool(
+            repo=repo,
+            state=state,
+            labels=labels,
+            per_page=5,
+            page=1,
+            search_comments=search_comments,
+            query=query,
+        )
     )
 
     # Validate the response
@@ -431,3 +481,35 @@ def test_search_issues_with_comments(repository_setup):
                 assert (
                     query in message["comment"]
                 )  # Ensure the comment matches the search query
+
+
+def test_search_issues_in_issue_index(repository_setup, tmp_path, monkeypatch):
+    test_username, repo_name = repository_setup
+    repo = f"{test_username}/{repo_name}"
+
+    # Index the test repository in a temporary database
+    index = issue_index.IssueIndex(str(tmp_path / "issue_index.db"))
+    monkeypatch.setattr(issue_index, "issue_index", index)
+    monkeypatch.setitem(issue_index.issue_index_config, "repos", [repo])
+
+    response_data = asyncio.run(
+        create_issue_tool(repo=repo, title="Indexed issue", body="Searchable body")
+    )
+    issue_number = response_data["number"]
+    asyncio.run(
+        create_issue_comment_tool(
+            repo=repo, issue_number=issue_number, comment="An indexed comment"
+        )
+    )
+
+    response_data = asyncio.run(
+        search_issues_tool(repo=repo, query="INDEXED comment", search_comments=True)
+    )
+
+    issues = response_data["data"]["issues"]
+    assert [issue["title"] for issue in issues] == ["Indexed issue"]
+    assert issues[0]["messages"][0]["comment"] == "An indexed comment"
+
+    response_data = asyncio.run(get_issues_tool(repo=repo, state="open"))
+
+    assert "Indexed issue" in [issue["title"] for issue in response_data["issues"]]
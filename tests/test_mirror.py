@@ -0,0 +1,128 @@
+import asyncio
+import os
+import subprocess
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+import pytest
+from app.tools.get_commit_details import get_commit_details_tool
+from app.tools.get_files_contents import get_files_contents_tool
+from app.tools.list_files import list_files_tool
+from app.utils.github import mirror
+from app.utils.github.trees import invalidate_ref
+
+
+def git(*args: str, cwd) -> str:
+    return subprocess.run(
+        ["git", "-c", "user.name=Test", "-c", "user.email=test@example.com", *args],
+        cwd=cwd,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout.strip()
+
+
+def commit(work, files: dict, message: str) -> str:
+    """Commit files (None removes them) in the clone and push them, returning the SHA."""
+    for path, content in files.items():
+        if content is None:
+            (work / path).unlink()
+        else:
+            (work / path).parent.mkdir(parents=True, exist_ok=True)
+            (work / path).write_text(content)
+    git("add", "-A", cwd=work)
+    git("commit", "-q", "-m", message, cwd=work)
+    git("push", "-q", "origin", "main", cwd=work)
+    return git("rev-parse", "HEAD", cwd=work)
+
+
+@pytest.fixture
+def mirrored_repo(fake_tools, tmp_path, monkeypatch):
+    """A local bare repository mirrored as owner/repo, and a clone to commit to it."""
+    url, responses, requests = fake_tools
+    remote = tmp_path / "remotes" / "owner" / "repo.git"
+    git("init", "-q", "--bare", "--initial-branch=main", str(remote), cwd=tmp_path)
+    git("clone", "-q", str(remote), "work", cwd=tmp_path)
+    git("checkout", "-q", "-b", "main", cwd=tmp_path / "work")
+
+    monkeypatch.setattr(mirror, "MIRROR_PATH", str(tmp_path / "mirrors"))
+    monkeypatch.setattr(mirror, "_mirrors", {})
+    monkeypatch.setitem(mirror.github_mirror_config, "repos", ["owner/repo"])
+    monkeypatch.setitem(
+        mirror.github_mirror_config,
+        "remote_url",
+        str(tmp_path / "remotes" / "{repo}.git"),
+    )
+    # The caller's access is still checked with the default branch lookup
+    responses.routes["/repos/owner/repo"] = (200, {"default_branch": "main"})
+
+    yield tmp_path / "work"
+
+
+def test_files_from_mirror(mirrored_repo, fake_tools, tmp_path):
+    url, responses, requests = fake_tools
+    commit(mirrored_repo, {"README.md": "# repo\n"}, "Initial commit")
+
+    response_data = asyncio.run(
+        get_files_contents_tool(repo="owner/repo", file_paths=["README.md"])
+    )
+
+    assert os.path.exists(tmp_path / "mirrors" / "owner" / "repo.git" / "HEAD")
+    file_contents = response_data["data"]["file_contents"]
+    assert file_contents[0]["file_path"] == "README.md"
+    assert file_contents[0]["content"] == "# repo\n"
+
+    response_data = asyncio.run(list_files_tool(repo="owner/repo"))
+
+    assert response_data["data"]["files"] == ["README.md"]
+    # Only the access check went to the API
+    assert {path for _, path, _ in requests} == {"/repos/owner/repo"}
+
+
+def test_renamed_file_patch_from_mirror(mirrored_repo):
+    lines = [f"line {i}" for i in range(1, 6)]
+    commit(mirrored_repo, {"mirror/before_rename.txt": "\n".join(lines) + "\n"}, "Add")
+
+    # Rename the file with a one line edit
+    lines[2] = "line 3 edited"
+    commit_sha = commit(
+        mirrored_repo,
+        {
+            "mirror/before_rename.txt": None,
+            "mirror/after_rename.txt": "\n".join(lines) + "\n",
+        },
+        "Rename",
+    )
+
+    response_data = asyncio.run(
+        get_commit_details_tool(
+            repo="owner/repo", sha=commit_sha, files=["mirror/after_rename.txt"]
+        )
+    )
+
+    renamed = response_data["data"]["files"][0]
+    assert renamed["status"] == "renamed"
+    # Only the edited line, not the whole file as added
+    assert not renamed["patch"].startswith("@@ -0,0")
+    assert "-line 3\n+line 3 edited" in renamed["patch"]
+
+
+def test_mirror_is_fetched_again_after_a_write(mirrored_repo):
+    commit(mirrored_repo, {"README.md": "before\n"}, "Initial commit")
+
+    async def read():
+        response_data = await get_files_contents_tool(
+            repo="owner/repo", file_paths=["README.md"]
+        )
+        return response_data["data"]["file_contents"][0]["content"]
+
+    assert asyncio.run(read()) == "before\n"
+
+    commit(mirrored_repo, {"README.md": "after\n"}, "Update")
+    # Within the refresh interval the mirror still serves the fetched head
+    assert asyncio.run(read()) == "before\n"
+
+    # Writes through the tools invalidate the branch, the next read fetches
+    invalidate_ref("owner/repo", "main")
+    assert asyncio.run(read()) == "after\n"
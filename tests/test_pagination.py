@@ -0,0 +1,32 @@
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+import pytest
+from app.tools.get_releases import get_releases_tool
+from app.utils.github.pagination import collect_pages
+
+
+@pytest.mark.parametrize("max_items", [0, -1])
+def test_no_items_wanted_fetches_nothing(fake_github, max_items):
+    url, responses, requests = fake_github
+
+    items = asyncio.run(
+        collect_pages(f"{url}/repos/owner/repo/releases", None, max_items=max_items)
+    )
+
+    assert items == []
+    assert requests == []
+
+
+def test_tools_reject_max_items_below_one(fake_tools):
+    url, responses, requests = fake_tools
+
+    response = asyncio.run(get_releases_tool(repo="owner/repo", max_items=0))
+
+    assert response == {
+        "error": "Invalid value for max_items. It must be a positive integer."
+    }
+    assert requests == []
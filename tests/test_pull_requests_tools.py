@@ -1,3 +1,4 @@
+import asyncio
 import os
 import sys
 import time
@@ -21,9 +22,11 @@ def test_create_pull_request(repository_setup):
     body = "This is a test pull request created by an automated test."
 
     # Step 1: Create the new branch
-    create_branch_tool(
-        repo=f"{test_username}/{repo_name}",
-        new_branch=target_branch,
+    asyncio.run(
+        create_branch_tool(
+            repo=f"{test_username}/{repo_name}",
+            new_branch=target_branch,
+        )
     )
 
     time.sleep(5)
@@ -32,11 +35,13 @@ def test_create_pull_request(repository_setup):
     file_path = "test-folder/test_create_pull_request.txt"
     initial_content = "Initial content for pull request test."
 
-    create_file_response = create_file_tool(
-        repo=f"{test_username}/{repo_name}",
-        file_path=file_path,
-        content=initial_content,
-        branch=target_branch,
+    create_file_response = asyncio.run(
+        create_file_tool(
+            repo=f"{test_username}/{repo_name}",
+            file_path=file_path,
+            content=initial_content,
+            branch=target_branch,
+        )
     )
 
     # Ensure the file creation was successful
@@ -47,12 +52,14 @@ def test_create_pull_request(repository_setup):
 
     time.sleep(5)
 
-    update_file_response = update_file_tool(
-        repo=f"{test_username}/{repo_name}",
-        file_path=file_path,
-        new_content=updated_content,
-        commit_message="Update file for pull request",
-        branch=target_branch,
+    update_file_response = asyncio.run(
+        update_file_tool(
+            repo=f"{test_username}/{repo_name}",
+            file_path=file_path,
+            new_content=updated_content,
+            commit_message="Update file for pull request",
+            branch=target_branch,
+        )
     )
 
     # Ensure the file update was successful
@@ -62,12 +69,14 @@ def test_create_pull_request(repository_setup):
     time.sleep(5)
 
     # Step 4: Now that the branch has changes, attempt to create the pull request
-    response_data = create_pull_request_tool(
-        repo=repo,
-        target_branch=target_branch,
-        base_branch=base_branch,
-        title=title,
-        body=body,
+    response_data = asyncio.run(
+        create_pull_request_tool(
+            repo=repo,
+            target_branch=target_branch,
+            base_branch=base_branch,
+            title=title,
+            body=body,
+        )
     )
 
     # Check if the response is a dictionary and contains the expected fields
@@ -92,9 +101,11 @@ def test_create_get_pull_requests(repository_setup):
     title = "Test Pull Request Title"
     body = "This is a test pull request created by an automated test."
 
-    create_branch_tool(
-        repo=f"{test_username}/{repo_name}",
-        new_branch=target_branch,
+    asyncio.run(
+        create_branch_tool(
+            repo=f"{test_username}/{repo_name}",
+            new_branch=target_branch,
+        )
     )
 
     # Step 2: Make changes in the new branch (e.g., create or update a file)
@@ -103,11 +114,13 @@ def test_create_get_pull_requests(repository_setup):
 
     time.sleep(5)
 
-    create_file_response = create_file_tool(
-        repo=f"{test_username}/{repo_name}",
-        file_path=file_path,
-        content=initial_content,
-        branch=target_branch,
+    create_file_response = asyncio.run(
+        create_file_tool(
+            repo=f"{test_username}/{repo_name}",
+            file_path=file_path,
+            content=initial_content,
+            branch=target_branch,
+        )
     )
 
     # Ensure the file creation was successful
@@ -118,12 +131,14 @@ def test_create_get_pull_requests(repository_setup):
 
     time.sleep(5)
 
-    update_file_response = update_file_tool(
-        repo=f"{test_username}/{repo_name}",
-        file_path=file_path,
-        new_content=updated_content,
-        commit_message="Update file for pull request",
-        branch=target_branch,
+    update_file_response = asyncio.run(
+        update_file_tool(
+            repo=f"{test_username}/{repo_name}",
+            file_path=file_path,
+            new_content=updated_content,
+            commit_message="Update file for pull request",
+            branch=target_branch,
+        )
     )
 
     # Ensure the file update was successful
@@ -133,12 +148,14 @@ def test_create_get_pull_requests(repository_setup):
     time.sleep(5)
 
     # Step 4: Now that the branch has changes, create the pull request
-    create_pull_request_response = create_pull_request_tool(
-        repo=repo,
-        target_branch=target_branch,
-        base_branch=base_branch,
-        title=title,
-        body=body,
+    create_pull_request_response = asyncio.run(
+        create_pull_request_tool(
+            repo=repo,
+            target_branch=target_branch,
+            base_branch=base_branch,
+            title=title,
+            body=body,
+        )
     )
 
     # Check if the pull request was created successfully
@@ -159,13 +176,15 @@ def test_create_get_pull_requests(repository_setup):
 
     time.sleep(5)
 
-    response_data = get_pull_requests_tool(
-        repo=repo,
-        state=state,
-        sort=sort,
-        order=order,
-        per_page=per_page,
-        page=page,
+    response_data = asyncio.run(
+        get_pull_requests_tool(
+            repo=repo,
+            state=state,
+            sort=sort,
+            order=order,
+            per_page=per_page,
+            page=page,
+        )
     )
 
     # Ensure the response is a dictionary and contains the necessary fields
@@ -198,9 +217,11 @@ def test_create_get_pull_request_details(repository_setup):
     title = "Test Pull Request Details Title"
     body = "This is a test pull request created by an automated test for details."
 
-    create_branch_tool(
-        repo=f"{test_username}/{repo_name}",
-        new_branch=target_branch,
+    asyncio.run(
+        create_branch_tool(
+            repo=f"{test_username}/{repo_name}",
+            new_branch=target_branch,
+        )
     )
 
     # Step 2: Make changes in the new branch (e.g., create or update a file)
@@ -209,11 +230,13 @@ def test_create_get_pull_request_details(repository_setup):
 
     time.sleep(5)
 
-    create_file_response = create_file_tool(
-        repo=f"{test_username}/{repo_name}",
-        file_path=file_path,
-        content=initial_content,
-        branch=target_branch,
+    create_file_response = asyncio.run(
+        create_file_tool(
+            repo=f"{test_username}/{repo_name}",
+            file_path=file_path,
+            content=initial_content,
+            branch=target_branch,
+        )
     )
 
     # Ensure the file creation was successful
@@ -224,12 +247,14 @@ def test_create_get_pull_request_details(repository_setup):
 
     time.sleep(5)
 
-    update_file_response = update_file_tool(
-        repo=f"{test_username}/{repo_name}",
-        file_path=file_path,
-        new_content=updated_content,
-        commit_message="Update file for pull request",
-        branch=target_branch,
+    update_file_response = asyncio.run(
+        update_file_tool(
+            repo=f"{test_username}/{repo_name}",
+            file_path=file_path,
+            new_content=updated_content,
+            commit_message="Update file for pull request",
+            branch=target_branch,
+        )
     )
 
     # Ensure the file update was successful
@@ -239,12 +264,14 @@ def test_create_get_pull_request_details(repository_setup):
     time.sleep(5)
 
     # Step 4: Now that the branch has changes, create the pull request
-    create_pull_request_response = create_pull_request_tool(
-        repo=repo,
-        target_branch=target_branch,
-        base_branch=base_branch,
-        title=title,
-        body=body,
+    create_pull_request_response = asyncio.run(
+        create_pull_request_tool(
+            repo=repo,
+            target_branch=target_branch,
+            base_branch=base_branch,
+            title=title,
+            body=body,
+        )
     )
 
     # Ensure the pull request was created successfully
@@ -262,9 +289,11 @@ def test_create_get_pull_request_details(repository_setup):
     time.sleep(5)
 
     # Step 6: Fetch the details of the created pull request
-    pull_request_details = get_pull_request_details_tool(
-        pull_number=pull_number,
-        repo=repo,
+    pull_request_details = asyncio.run(
+        get_pull_request_details_tool(
+            pull_number=pull_number,
+            repo=repo,
+        )
     )
 
     # Ensure the response is a dictionary and contains the necessary fields
@@ -283,18 +312,20 @@ def test_merge_pull_request_tool(repository_setup):
     # Step 1: Create a new branch
     target_branch = "test_merge_pull_request"
     base_branch = "main"
-    create_branch_tool(repo=repo, new_branch=target_branch)
+    asyncio.run(create_branch_tool(repo=repo, new_branch=target_branch))
 
     time.sleep(5)
 
     # Step 2: Create a new file in the branch
     file_path = "test-folder/test_merge_pull_request.txt"
     content = "Content for merge test"
-    create_file_response = create_file_tool(
-        repo=repo,
-        file_path=file_path,
-        content=content,
-        branch=target_branch,
+    create_file_response = asyncio.run(
+        create_file_tool(
+            repo=repo,
+            file_path=file_path,
+            content=content,
+            branch=target_branch,
+        )
     )
     assert create_file_response.get("message") == "File created successfully."
 
@@ -302,12 +333,14 @@ def test_merge_pull_request_tool(repository_setup):
 
     # Step 3: Update the file to ensure there's a commit
     updated_content = "Updated content before merging"
-    update_file_response = update_file_tool(
-        repo=repo,
-        file_path=file_path,
-        new_content=updated_content,
-        commit_message="Update file for merge PR",
-        branch=target_branch,
+    update_file_response = asyncio.run(
+        update_file_tool(
+            repo=repo,
+            file_path=file_path,
+            new_content=updated_content,
+            commit_message="Update file for merge PR",
+            branch=target_branch,
+        )
     )
     assert update_file_response.get("message") == "File updated successfully."
 
@@ -316,12 +349,14 @@ def test_merge_pull_request_tool(repository_setup):
     # Step 4: Create a pull request
     title = "Test Merge Pull Request"
     body = "This is a test pull request for merging."
-    pr_response = create_pull_request_tool(
-        repo=repo,
-        target_branch=target_branch,
-        base_branch=base_branch,
-        title=title,
-        body=body,
+    pr_response = asyncio.run(
+        create_pull_request_tool(
+            repo=repo,
+            target_branch=target_branch,
+            base_branch=base_branch,
+            title=title,
+            body=body,
+        )
     )
     assert (
         pr_response.get("message")
@@ -332,10 +367,12 @@ def test_merge_pull_request_tool(repository_setup):
     time.sleep(5)
 
     # Step 5: Merge the pull request
-    merge_response = merge_pull_request_tool(
-        repo=repo,
-        pull_number=pull_number,
-        commit_message="Merging PR from test",
+    merge_response = asyncio.run(
+        merge_pull_request_tool(
+            repo=repo,
+            pull_number=pull_number,
+            commit_message="Merging PR from test",
+        )
     )
 
     # Ensure the merge was successful
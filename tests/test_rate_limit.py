@@ -0,0 +1,112 @@
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+import pytest
+from app.utils.github import client as github
+from app.utils.github import rate_limit
+
+
+def rate_limit_headers(remaining: int, reset_in: float, limit: int = 5000) -> dict:
+    return {
+        "X-RateLimit-Limit": str(limit),
+        "X-RateLimit-Remaining": str(remaining),
+        "X-RateLimit-Reset": str(time.time() + reset_in),
+        "X-RateLimit-Resource": "core",
+    }
+
+
+def test_rate_limit_waits_for_reset(fake_github):
+    url, responses, requests = fake_github
+    headers = {"Authorization": f"token {os.urandom(4).hex()}"}
+    responses.append((200, rate_limit_headers(remaining=0, reset_in=1.5)))
+
+    async def run():
+        await github.get(f"{url}/repos/owner/repo", headers=headers)
+        return await github.get(f"{url}/repos/owner/repo", headers=headers)
+
+    response = asyncio.run(run())
+
+    assert response.status_code == 200
+    assert len(requests) == 2
+    assert requests[1][2] - requests[0][2] >= 1
+
+
+def test_rate_limit_honors_retry_after(fake_github):
+    url, responses, requests = fake_github
+    headers = {"Authorization": f"token {os.urandom(4).hex()}"}
+    responses.append((429, {"Retry-After": "1"}))
+
+    async def run():
+        limited = await github.get(f"{url}/search/issues", headers=headers)
+        # Another resource of the same token isn't paused
+        other = await github.get(f"{url}/repos/owner/repo", headers=headers)
+        retried = await github.get(f"{url}/search/issues", headers=headers)
+        return limited, other, retried
+
+    limited, other, retried = asyncio.run(run())
+
+    assert limited.status_code == 429
+    assert other.status_code == 200
+    assert retried.status_code == 200
+    assert requests[1][2] - requests[0][2] < 1
+    assert requests[2][2] - requests[0][2] >= 1
+
+
+def test_rate_limit_answers_429_past_max_wait(fake_github, monkeypatch):
+    url, responses, requests = fake_github
+    headers = {"Authorization": f"token {os.urandom(4).hex()}"}
+    monkeypatch.setitem(rate_limit.rate_limit_config, "max_wait", 1)
+    responses.append((200, rate_limit_headers(remaining=0, reset_in=600)))
+
+    async def run():
+        await github.get(f"{url}/repos/owner/repo", headers=headers)
+        return await github.get(f"{url}/repos/owner/repo", headers=headers)
+
+    response = asyncio.run(run())
+
+    # The call is answered locally instead of spending a request on a sure 403
+    assert response.status_code == 429
+    assert "rate limit exceeded" in response.json()["message"]
+    assert len(requests) == 1
+
+
+def test_rate_limit_bulk_calls_keep_a_reserve(fake_github):
+    url, responses, requests = fake_github
+    headers = {"Authorization": f"token {os.urandom(4).hex()}"}
+    responses.append((200, rate_limit_headers(remaining=5, reset_in=600, limit=100)))
+
+    async def run():
+        await github.get(f"{url}/repos/owner/repo", headers=headers)
+        interactive = await github.get(f"{url}/repos/owner/repo", headers=headers)
+        with rate_limit.bulk_priority():
+            bulk = await github.get(f"{url}/repos/owner/repo", headers=headers)
+        return interactive, bulk
+
+    interactive, bulk = asyncio.run(run())
+
+    # 5 calls left is within the 10% reserve, only interactive calls may use it
+    assert interactive.status_code == 200
+    assert bulk.status_code == 429
+
+
+def test_rate_limit_paces_streamed_downloads(fake_github):
+    url, responses, requests = fake_github
+    headers = {"Authorization": f"token {os.urandom(4).hex()}"}
+    responses.append((429, {"Retry-After": "1"}))
+
+    async def run():
+        await github.get(f"{url}/repos/owner/repo", headers=headers)
+        async with github.stream(
+            "GET", f"{url}/repos/owner/repo/tarball/main", headers=headers
+        ) as response:
+            await response.aread()
+            return response
+
+    response = asyncio.run(run())
+
+    assert response.status_code == 200
+    assert requests[1][2] - requests[0][2] >= 1
@@ -1,3 +1,4 @@
+import asyncio
 import os
 import sys
 
@@ -14,7 +15,9 @@ from app.tools.get_tags_or_branches import get_tags_or_branches_tool
 def test_get_repository_details(repository_setup):
     test_username, repo_name = repository_setup  # Get the repo name from the fixture
     # Call the function to get details for the created repository
-    response_data = get_repository_details_tool(repo=f"{test_username}/{repo_name}")
+    response_data = asyncio.run(
+        get_repository_details_tool(repo=f"{test_username}/{repo_name}")
+    )
 
     # Access the repository details correctly
     repo_details = response_data.get("repository_details")
@@ -26,14 +29,30 @@ def test_get_repository_details(repository_setup):
     ), f"Expected {repo_name}, but got {repo_details.get('name')}"
 
 
+def test_get_repository_details_include(repository_setup):
+    test_username, repo_name = repository_setup  # Get the repo name from the fixture
+    # Fetch only the branches section, capped to one branch
+    response_data = asyncio.run(
+        get_repository_details_tool(
+            repo=f"{test_username}/{repo_name}",
+            include=["branches"],
+            max_items_per_section=1,
+        )
+    )
+
+    # Assertions to verify that only the requested section is returned
+    assert "repository_details" not in response_data
+    assert len(response_data.get("branches", [])) == 1, "Expected one branch"
+
+
 def test_find_repositories_by_name(repository_setup):
     test_username, repo_name = repository_setup  # Get the repo name from the fixture
 
     time.sleep(5)
 
     # Call the function to find repositories by name
-    response_data = find_repositories_by_name_tool(
-        query=repo_name, username=test_username
+    response_data = asyncio.run(
+        find_repositories_by_name_tool(query=repo_name, username=test_username)
     )
 
     print(f"response_data {response_data}")
@@ -47,8 +66,8 @@ def test_find_repositories_by_name(repository_setup):
 def test_get_tags_or_branches(repository_setup):
     test_username, repo_name = repository_setup  # Get the repo name from the fixture
     # Call the function to get tags or branches for the repository
-    response_data = get_tags_or_branches_tool(
-        repo=f"{test_username}/{repo_name}", type="branches"
+    response_data = asyncio.run(
+        get_tags_or_branches_tool(repo=f"{test_username}/{repo_name}", type="branches")
     )
 
     # Access the branches from the response data
@@ -63,7 +82,7 @@ def test_get_tags_or_branches(repository_setup):
 def test_get_releases(repository_setup):
     test_username, repo_name = repository_setup  # Get the repo name from the fixture
     # Call the function to get releases for the created repository
-    response_data = get_releases_tool(repo=f"{test_username}/{repo_name}")
+    response_data = asyncio.run(get_releases_tool(repo=f"{test_username}/{repo_name}"))
 
     # Access the releases from the response data
     releases = response_data.get("data", {}).get("releases", [])
@@ -76,10 +95,12 @@ def test_get_releases(repository_setup):
 def test_get_repositories(repository_setup):
     test_username, repo_name = repository_setup  # Get the repo name from the fixture
     # Call the function to get repositories for the test user, sorted by creation date in descending order
-    response_data = get_repositories_tool(
-        username=test_username,
-        sort="created",  # Sort by creation date
-        direction="desc",  # Descending order
+    response_data = asyncio.run(
+        get_repositories_tool(
+            username=test_username,
+            sort="created",  # Sort by creation date
+            direction="desc",  # Descending order
+        )
     )
 
     # Access the repositories from the response data
@@ -90,3 +111,26 @@ def test_get_repositories(repository_setup):
     assert any(
         repo["name"] == repo_name for repo in repositories
     ), "Expected the created repository to be listed"
+
+
+def test_get_repositories_max_items(repository_setup):
+    test_username, repo_name = repository_setup  # Get the repo name from the fixture
+    # Request one repository per page and let the tool follow the next pages
+    response_data = asyncio.run(
+        get_repositories_tool(
+            username=test_username,
+            sort="created",
+            direction="desc",
+            per_page=1,
+            max_items=2,
+        )
+    )
+
+    repositories = response_data.get("repositories", [])
+
+    # Assertions to verify that pages were followed up to max_items
+    assert isinstance(repositories, list), "Expected repositories to be a list"
+    assert 0 < len(repositories) <= 2, "Expected at most max_items repositories"
+    assert (
+        repositories[0]["name"] == repo_name
+    ), "Expected the created repository to be listed first"
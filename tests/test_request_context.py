@@ -0,0 +1,81 @@
+import asyncio
+import contextvars
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from starlette.requests import Request
+from app.middleware.github import GithubAuthMiddleware as auth
+from app.middleware.github.GithubAuthMiddleware import (
+    CredentialsCache,
+    GithubAuthMiddleware,
+    check_access,
+    get_credentials,
+    request_context,
+)
+
+
+class FakeDatabase:
+    def get_credentials(self, access_token):
+        return {"user_id": access_token, "credentials": {"access_token": access_token}}
+
+
+def test_concurrent_requests_keep_their_own_credentials(monkeypatch):
+    monkeypatch.setattr(
+        auth, "credentials_cache", CredentialsCache(ttl=60, max_entries=10)
+    )
+    middleware = GithubAuthMiddleware(None)
+    middleware.db_handler = FakeDatabase()
+
+    async def call_next(request):
+        # Let the other requests authenticate before reading the credentials
+        await asyncio.sleep(0.01)
+        seen = [get_credentials()["access_token"]]
+        seen.extend(await asyncio.gather(read_in_task(), read_in_task()))
+        return seen
+
+    async def read_in_task():
+        await asyncio.sleep(0)
+        return get_credentials()["access_token"]
+
+    async def serve(token):
+        headers = [(b"x-access-token", token.encode())]
+        return await middleware.dispatch(
+            Request({"type": "http", "headers": headers}), call_next
+        )
+
+    async def run():
+        return await asyncio.gather(*(serve(f"token-{i}") for i in range(5)))
+
+    seen = contextvars.Context().run(asyncio.run, run())
+
+    assert seen == [[f"token-{i}"] * 3 for i in range(5)]
+
+
+def test_context_is_reset_after_the_request():
+    middleware = GithubAuthMiddleware(None)
+
+    async def call_next(request):
+        return check_access(True)
+
+    async def run():
+        response = await middleware.dispatch(
+            Request({"type": "http", "headers": []}), call_next
+        )
+        return response, request_context.get()
+
+    response, after = contextvars.Context().run(asyncio.run, run())
+
+    assert "X-ACCESS-TOKEN is a required header" in response["error"]
+    assert after is None
+
+
+def test_no_request_is_unauthenticated():
+    def outside_a_request():
+        return get_credentials(), check_access(True)
+
+    credentials, response = contextvars.Context().run(outside_a_request)
+
+    assert credentials is None
+    assert response["error"] == "User is not authenticated."
@@ -0,0 +1,83 @@
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+import httpx
+import pytest
+from app.utils.github import client as github
+
+
+@pytest.fixture
+def fast_retries(monkeypatch):
+    monkeypatch.setitem(github.retry_config, "base_delay", 0.05)
+    monkeypatch.setitem(github.retry_config, "attempt_timeout", 0.5)
+
+
+def test_retry_get_on_server_errors(fake_github, fast_retries):
+    url, responses, requests = fake_github
+    responses.extend([(502, {}), (503, {})])
+
+    response = asyncio.run(github.get(f"{url}/repos/owner/repo"))
+
+    assert response.status_code == 200
+    assert len(requests) == 3
+
+
+def test_retry_get_on_timeout(fake_github, fast_retries):
+    url, responses, requests = fake_github
+    responses.append((200, {}, 1))
+
+    response = asyncio.run(github.get(f"{url}/repos/owner/repo"))
+
+    assert response.status_code == 200
+    assert len(requests) == 2
+
+
+def test_retry_gives_up_at_deadline(fake_github, fast_retries, monkeypatch):
+    url, responses, requests = fake_github
+    monkeypatch.setitem(github.retry_config, "deadline", 1)
+    responses.extend([(200, {}, 1)] * 4)
+
+    with pytest.raises(httpx.TimeoutException):
+        asyncio.run(github.get(f"{url}/repos/owner/repo"))
+
+    assert len(requests) <= 2
+
+
+def test_retry_never_repeats_posts_blindly(fake_github, fast_retries):
+    url, responses, requests = fake_github
+    responses.extend([(502, {}), (502, {})])
+
+    async def run():
+        post = await github.post(f"{url}/repos/owner/repo/issues", json={})
+        # Writes marked safe to repeat are retried like reads
+        safe = await github.patch(
+            f"{url}/repos/owner/repo/git/refs/heads/main", json={}, retry=True
+        )
+        return post, safe
+
+    post, safe = asyncio.run(run())
+
+    assert post.status_code == 502
+    assert safe.status_code == 200
+    assert [method for method, _, _ in requests] == ["POST", "PATCH", "PATCH"]
+
+
+def test_retry_opening_streams(fake_github, fast_retries):
+    url, responses, requests = fake_github
+    # A server error, then an answer slower than the attempt timeout
+    responses.extend([(502, {}), (200, {}, 1)])
+
+    async def run():
+        async with github.stream(
+            "GET", f"{url}/repos/owner/repo/tarball/main"
+        ) as response:
+            return response.status_code, await response.aread()
+
+    status, body = asyncio.run(run())
+
+    assert status == 200
+    assert body == b'{"message": "ok"}'
+    assert len(requests) == 3
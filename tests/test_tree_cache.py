@@ -0,0 +1,122 @@
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from app.middleware.github.GithubAuthMiddleware import get_credentials
+from app.tools.commit_files import commit_files_tool
+from app.tools.get_files_details import get_files_details_tool
+from app.tools.list_files import list_files_tool
+from app.utils.github.trees import get_tree
+
+
+def moving_branch(routes: dict, repo: str) -> dict:
+    """Answer a branch that moves to a new commit with new.txt when it is updated."""
+    old, new = (
+        {
+            "commit": os.urandom(20).hex(),
+            "tree": {
+                "sha": os.urandom(20).hex(),
+                "truncated": False,
+                "tree": [
+                    {
+                        "path": path,
+                        "type": "blob",
+                        "sha": os.urandom(20).hex(),
+                        "mode": "100644",
+                    }
+                    for path in paths
+                ],
+            },
+        }
+        for paths in (["README.md"], ["README.md", "new.txt"])
+    )
+    branch = {"head": old}
+
+    def update_ref(method, path, payload):
+        branch["head"] = new
+        return 200, {"object": {"sha": new["commit"]}}
+
+    routes[f"/repos/{repo}/git/ref/heads/main"] = lambda *args: (
+        200,
+        {"object": {"sha": branch["head"]["commit"]}},
+    )
+    routes[f"/repos/{repo}/git/trees/main"] = lambda *args: (
+        200,
+        branch["head"]["tree"],
+    )
+    for commit in (old, new):
+        routes[f"/repos/{repo}/git/trees/{commit['commit']}"] = (200, commit["tree"])
+    routes[f"/repos/{repo}/git/trees"] = (201, {"sha": new["tree"]["sha"]})
+    routes[f"/repos/{repo}/git/commits"] = (201, {"sha": new["commit"]})
+    routes[f"/repos/{repo}/git/refs/heads/main"] = update_ref
+    return branch
+
+
+def test_writes_invalidate_the_cached_branch_tree(fake_tools):
+    url, responses, requests = fake_tools
+    moving_branch(responses.routes, "owner/repo")
+    token = get_credentials()["access_token"]
+
+    async def run():
+        before = await get_tree("owner/repo", "main", token)
+        committed = await commit_files_tool(
+            repo="owner/repo",
+            branch="main",
+            operations=[{"action": "create", "file_path": "new.txt", "content": "new"}],
+        )
+        after = await get_tree("owner/repo", "main", token)
+        return before, committed, after
+
+    before, committed, after = asyncio.run(run())
+
+    assert committed["message"] == "Files committed successfully."
+    assert "new.txt" not in before["entries"]
+    # Read right after the write instead of waiting for the ref to expire
+    assert "new.txt" in after["entries"]
+
+
+def test_list_files_reads_its_own_writes(fake_tools):
+    url, responses, requests = fake_tools
+    moving_branch(responses.routes, "owner/repo")
+
+    async def run():
+        before = await list_files_tool(repo="owner/repo", branch="main")
+        await commit_files_tool(
+            repo="owner/repo",
+            branch="main",
+            operations=[{"action": "create", "file_path": "new.txt", "content": "new"}],
+        )
+        after = await list_files_tool(repo="owner/repo", branch="main")
+        return before, after
+
+    before, after = asyncio.run(run())
+
+    assert before["data"]["files"] == ["README.md"]
+    assert after["data"]["files"] == ["README.md", "new.txt"]
+
+
+def test_get_files_details_reads_its_own_writes(fake_tools):
+    url, responses, requests = fake_tools
+    moving_branch(responses.routes, "owner/repo")
+
+    async def run():
+        before = await get_files_details_tool(
+            repo="owner/repo", files=["new.txt"], branch="main"
+        )
+        await commit_files_tool(
+            repo="owner/repo",
+            branch="main",
+            operations=[{"action": "create", "file_path": "new.txt", "content": "new"}],
+        )
+        after = await get_files_details_tool(
+            repo="owner/repo", files=["new.txt"], branch="main"
+        )
+        return before, after
+
+    before, after = asyncio.run(run())
+
+    assert "error" in before["file_details"][0]
+    assert after["file_details"][0]["path"] == "new.txt"
+    assert after["file_details"][0]["type"] == "file"
@@ -0,0 +1,180 @@
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+import pytest
+from app.tools.commit_files import commit_files_tool
+from app.tools.get_files_details import get_files_details_tool
+from app.utils.github import client as github
+from app.utils.github.trees import walk_tree
+
+
+def truncated_repo(routes: dict, repo: str) -> dict:
+    """Answer a branch whose recursive tree is truncated, returning the tree SHAs."""
+    shas = {name: os.urandom(20).hex() for name in ("commit", "root", "src")}
+    routes[f"/repos/{repo}/git/ref/heads/main"] = (
+        200,
+        {"object": {"sha": shas["commit"]}},
+    )
+    for ref in (shas["commit"], "main"):
+        routes[f"/repos/{repo}/git/trees/{ref}"] = (
+            200,
+            {"sha": shas["root"], "truncated": True, "tree": []},
+        )
+    routes[f"/repos/{repo}/git/trees/{shas['root']}"] = (
+        200,
+        {
+            "sha": shas["root"],
+            "truncated": False,
+            "tree": [
+                {"path": "src", "type": "tree", "sha": shas["src"], "mode": "040000"}
+            ],
+        },
+    )
+    return shas
+
+
+@pytest.mark.parametrize("status", [404, 500])
+def test_commit_files_reports_failed_subtree_lookups(fake_tools, monkeypatch, status):
+    url, responses, requests = fake_tools
+    monkeypatch.setitem(github.retry_config, "max_attempts", 1)
+    shas = truncated_repo(responses.routes, "owner/repo")
+    responses.routes[f"/repos/owner/repo/git/trees/{shas['src']}"] = (
+        status,
+        {"message": "Not Found" if status == 404 else "Server Error"},
+    )
+
+    response = asyncio.run(
+        commit_files_tool(
+            repo="owner/repo",
+            branch="main",
+            operations=[
+                {"action": "update", "file_path": "src/app.py", "content": "pass"}
+            ],
+        )
+    )
+
+    assert response["error"] == "Invalid file operations, nothing was committed."
+    assert response["details"][0]["file_path"] == "src/app.py"
+    assert (
+        "Could not confirm whether the file exists" in response["details"][0]["error"]
+    )
+    # Nothing is written when a path can't be confirmed
+    assert all(method == "GET" for method, _, _ in requests)
+
+
+def test_get_files_details_looks_up_paths_missing_from_truncated_tree(fake_tools):
+    url, responses, requests = fake_tools
+    shas = truncated_repo(responses.routes, "owner/repo")
+    responses.routes[f"/repos/owner/repo/git/trees/{shas['src']}"] = (
+        200,
+        {
+            "sha": shas["src"],
+            "truncated": False,
+            "tree": [
+                {
+                    "path": "app.py",
+                    "type": "blob",
+                    "sha": "a" * 40,
+                    "mode": "100644",
+                    "size": 4,
+                },
+                {"path": "lib", "type": "tree", "sha": "b" * 40, "mode": "040000"},
+            ],
+        },
+    )
+
+    response = asyncio.run(
+        get_files_details_tool(
+            repo="owner/repo",
+            files=["src/app.py", "src/lib", "src/nope.py"],
+            branch="main",
+        )
+    )
+
+    app, lib, nope = response["file_details"]
+    assert app["path"] == "src/app.py" and app["size"] == 4 and app["type"] == "file"
+    assert lib["error"] == "Path is a directory: src/lib"
+    assert nope["error"] == "File not found: src/nope.py"
+    # Every path is read from tree listings, none from the contents API
+    assert not any("/contents/" in path for _, path, _ in requests)
+
+
+def truncated_src(routes: dict, repo: str, shas: dict):
+    """Make src too large for a recursive fetch, leaving src/lib small enough."""
+    lib = os.urandom(20).hex()
+    routes[f"/repos/{repo}/git/trees/{shas['src']}?recursive=1"] = (
+        200,
+        {"sha": shas["src"], "truncated": True, "tree": []},
+    )
+    routes[f"/repos/{repo}/git/trees/{shas['src']}"] = (
+        200,
+        {
+            "sha": shas["src"],
+            "truncated": False,
+            "tree": [
+                {"path": "app.py", "type": "blob", "sha": "a" * 40, "mode": "100644"},
+                {"path": "lib", "type": "tree", "sha": lib, "mode": "040000"},
+            ],
+        },
+    )
+    routes[f"/repos/{repo}/git/trees/{lib}"] = (
+        200,
+        {
+            "sha": lib,
+            "truncated": False,
+            "tree": [
+                {"path": "deep", "type": "tree", "sha": "c" * 40, "mode": "040000"},
+                {
+                    "path": "deep/x.py",
+                    "type": "blob",
+                    "sha": "d" * 40,
+                    "mode": "100644",
+                },
+            ],
+        },
+    )
+
+
+def walk(*args, **kwargs) -> list:
+    async def run():
+        return [entry["path"] async for entry in walk_tree(*args, **kwargs)]
+
+    return asyncio.run(run())
+
+
+def test_walk_tree_descends_truncated_trees(fake_tools):
+    url, responses, requests = fake_tools
+    shas = truncated_repo(responses.routes, "owner/repo")
+    truncated_src(responses.routes, "owner/repo", shas)
+
+    paths = walk("owner/repo", "main", "token")
+
+    assert paths == [
+        "src",
+        "src/app.py",
+        "src/lib",
+        "src/lib/deep",
+        "src/lib/deep/x.py",
+    ]
+    # src is listed level by level after its recursive fetch came back truncated,
+    # src/lib is small enough to be read whole
+    tree_calls = [path for _, path, _ in requests if "/git/trees/" in path]
+    assert f"/repos/owner/repo/git/trees/{shas['src']}?recursive=1" in tree_calls
+    assert f"/repos/owner/repo/git/trees/{shas['src']}" in tree_calls
+    assert not any(f"/git/trees/{'c' * 40}" in path for path in tree_calls)
+
+
+def test_walk_tree_limits_depth_and_filters_truncated_folders(fake_tools):
+    url, responses, requests = fake_tools
+    shas = truncated_repo(responses.routes, "owner/repo")
+    truncated_src(responses.routes, "owner/repo", shas)
+
+    assert walk("owner/repo", "main", "token", max_depth=1) == ["src"]
+    assert walk("owner/repo", "main", "token", path="src", pattern="**/*.py") == [
+        "src/app.py",
+        "src/lib/deep/x.py",
+    ]
+    assert walk("owner/repo", "main", "token", path="missing") == []
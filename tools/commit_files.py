@@ -0,0 +1,227 @@
+import httpx
+from typing import Dict, List, Optional
+from typing_extensions import Annotated
+from pydantic import Field
+from core.utils.logger import logger  # Importing the logger
+from app.middleware.github.GithubAuthMiddleware import check_access, get_credentials
+from app.utils.github.client import error_message
+from app.utils.github.blob_cache import blob_cache
+from app.utils.github.concurrency import gather_for_user
+from app.utils.github.git_data import (
+    blob_sha,
+    create_blob,
+    create_commit,
+    create_tree,
+    get_branch_head,
+    update_branch,
+)
+from app.utils.github.trees import TreeError, find_entry, get_tree, invalidate_ref
+from app.utils.github.branches import resolve_branch_or_error
+from core.utils.tools import doc_tag  # Importing the doc_tag
+
+ACTIONS = ("create", "update", "delete")
+
+
+@doc_tag("Files")  # Adding the doc_tag decorator
+async def commit_files_tool(
+    repo: Annotated[
+        str,
+        Field(description="The GitHub repository in the format 'owner/repo'."),
+    ],
+    operations: Annotated[
+        List[Dict[str, str]],
+        Field(
+            description="The file operations to apply, each with 'action' ('create', 'update' or 'delete'), 'file_path' and, for create and update, 'content'."
+        ),
+    ],
+    commit_message: Annotated[
+        Optional[str],
+        Field(description="The commit message for the changes."),
+    ] = "Update files",
+    branch: Annotated[
+        Optional[str],
+        Field(
+            description="The branch to commit the changes to (default is the repository's default branch)."
+        ),
+    ] = None,
+    concurrent_blobs: Annotated[
+        Optional[bool],
+        Field(
+            description="Optional, upload the file contents as blobs concurrently before creating the commit, recommended for many or large files."
+        ),
+    ] = False,
+) -> dict:
+    """
+    Create, update and delete multiple files in a GitHub repository in a single commit.
+    The repo parameter is required and must be included in the request headers.
+
+    The operations are validated against the branch first, if any of them is
+    invalid nothing is committed.
+
+    Args:
+    - repo (str): The GitHub repository in the format 'owner/repo'.
+    - operations (List[Dict[str, str]]): The file operations, each with 'action' ('create', 'update' or 'delete'), 'file_path' and, for create and update, 'content'.
+    - commit_message (Optional[str]): The commit message for the changes (default is 'Update files').
+    - branch (Optional[str]): The branch to commit the changes to (default is the repository's default branch).
+    - concurrent_blobs (Optional[bool]): Upload the file contents as blobs concurrently before creating the commit (default is False).
+
+    Returns:
+    - JSON string containing the commit SHA and the applied operations or error.
+
+    Example Requests:
+    - Adding a file and updating another in repository "owner/repo":
+      commit_files_tool(repo="owner/repo", operations=[{"action": "create", "file_path": "docs/new.md", "content": "# New"}, {"action": "update", "file_path": "README.md", "content": "Updated"}])
+    - Moving a file on the "develop" branch of repository "anotherUser/repoName":
+      commit_files_tool(repo="anotherUser/repoName", operations=[{"action": "delete", "file_path": "old.py"}, {"action": "create", "file_path": "src/new.py", "content": "pass"}], commit_message="Move old.py to src/new.py", branch="develop")
+    """
+    logger.info(
+        f"Request received to commit {len(operations)} file operations to repo: {repo}, commit_message: {commit_message}, branch: {branch}, concurrent_blobs: {concurrent_blobs}"
+    )
+
+    # Check authentication
+    auth_response = check_access(True)
+    if auth_response:
+        return auth_response
+
+    credentials = get_credentials()
+    token = credentials["access_token"]
+
+    if not operations:
+        return {"error": "No file operations provided."}
+
+    # Fall back to the repository default branch, cached per repository
+    branch, error_response = await resolve_branch_or_error(repo, branch, token)
+    if error_response:
+        return error_response
+
+    try:
+        # Read the branch head and its tree, the tree is cached per commit
+        head_sha = await get_branch_head(repo, branch, token)
+        tree = await get_tree(repo, head_sha, token)
+    except httpx.HTTPStatusError as e:
+        logger.error(f"Request failed for branch '{branch}': {e}")
+        return {
+            "error": f"Branch '{branch}' could not be read. GitHub Error: {error_message(e)}"
+        }
+    except (httpx.HTTPError, TreeError) as e:
+        logger.error(f"Request failed for branch '{branch}': {e}")
+        return {"error": f"Request failed: {str(e)}"}
+
+    # A truncated tree may not list the files, look them up level by level
+    entries = dict(tree["entries"])
+    lookup_errors = {}
+    if tree["truncated"]:
+        for operation in operations:
+            file_path = (operation.get("file_path") or "").strip("/")
+            if not file_path or file_path in entries or file_path in lookup_errors:
+                continue
+            try:
+                entry = await find_entry(repo, tree["sha"], file_path, token)
+            except (httpx.HTTPError, TreeError) as e:
+                logger.error(f"Failed to look up '{file_path}' in the tree: {e}")
+                lookup_errors[file_path] = (
+                    f"Could not confirm whether the file exists: {str(e)}"
+                )
+                continue
+            if entry is not None:
+                entries[file_path] = entry
+
+    # Validate every operation before changing anything
+    errors = []
+    seen_paths = set()
+    for operation in operations:
+        action = operation.get("action")
+        file_path = (operation.get("file_path") or "").strip("/")
+        entry = entries.get(file_path)
+
+        if action not in ACTIONS:
+            error = f"Invalid action '{action}'. Use 'create', 'update' or 'delete'."
+        elif not file_path:
+            error = "Missing file_path."
+        elif file_path in seen_paths:
+            error = "The file_path is used by more than one operation."
+        elif action != "delete" and operation.get("content") is None:
+            error = f"Missing content for {action}."
+        elif file_path in lookup_errors:
+            error = lookup_errors[file_path]
+        elif entry is not None and entry.get("type") != "blob":
+            error = "The path is not a file."
+        elif action == "create" and entry is not None:
+            error = "File already exists. Please update the file instead."
+        elif action != "create" and entry is None:
+            error = "File not found on GitHub."
+        else:
+            error = None
+
+        seen_paths.add(file_path)
+        if error:
+            errors.append({"file_path": operation.get("file_path"), "error": error})
+
+    if errors:
+        logger.error(f"Invalid file operations: {errors}")
+        return {
+            "error": "Invalid file operations, nothing was committed.",
+            "details": errors,
+        }
+
+    # Build the tree entries, keeping the mode of updated files (e.g. executables)
+    tree_entries = []
+    contents = []
+    for operation in operations:
+        file_path = operation["file_path"].strip("/")
+        entry = entries.get(file_path)
+        tree_entry = {
+            "path": file_path,
+            "mode": entry["mode"] if entry else "100644",
+            "type": "blob",
+        }
+
+        if operation["action"] == "delete":
+            tree_entry["sha"] = None  # A null SHA removes the path from the base tree
+        else:
+            contents.append((tree_entry, operation["content"].encode("utf-8")))
+
+        tree_entries.append(tree_entry)
+
+    try:
+        if concurrent_blobs and contents:
+            # Upload the contents up front so the tree request only carries SHAs
+            logger.info(f"Creating {len(contents)} blobs concurrently in {repo}")
+            shas = await gather_for_user(
+                token, (create_blob(repo, content, token) for _, content in contents)
+            )
+            for (tree_entry, _), sha in zip(contents, shas):
+                tree_entry["sha"] = sha
+        else:
+            # Small text changes are sent inline with the tree
+            for tree_entry, content in contents:
+                tree_entry["content"] = content.decode("utf-8")
+
+        new_tree_sha = await create_tree(repo, tree["sha"], tree_entries, token)
+        commit_sha = await create_commit(
+            repo, commit_message or "Update files", new_tree_sha, [head_sha], token
+        )
+        await update_branch(repo, branch, commit_sha, token)
+        invalidate_ref(repo, branch)
+    except httpx.HTTPStatusError as e:
+        logger.error(f"Failed to commit files: {e}")
+        return {"error": f"Failed to commit files: {error_message(e)}"}
+    except httpx.HTTPError as e:
+        logger.error(f"Request failed: {e}")
+        return {"error": f"Request failed: {str(e)}"}
+
+    # The new blobs are immutable, later reads can be served from cache
+    for _, content in contents:
+        blob_cache.put(blob_sha(content), content)
+
+    logger.info(
+        f"Committed {len(operations)} file operations in repository '{repo}' on branch '{branch}' as {commit_sha}."
+    )
+    return {
+        "message": "Files committed successfully.",
+        "commit_sha": commit_sha,
+        "files": [
+            {"file_path": operation["file_path"], "action": operation["action"]}
+            for operation in operations
+        ],
+    }
@@ -1,16 +1,17 @@
-import requests
+import httpx
 import json
 from typing import Optional
 from typing_extensions import Annotated
 from pydantic import Field
 from core.utils.logger import logger  # Importing the logger
-from core.utils.state import global_state
 from core.utils.tools import doc_tag
-from app.middleware.github.GithubAuthMiddleware import check_access
+from app.middleware.github.GithubAuthMiddleware import check_access, get_credentials
+from app.utils.github import client as github
+from app.utils.github.branches import resolve_branch_or_error
 
 
 @doc_tag("Branches")
-def create_branch_tool(
+async def create_branch_tool(
     repo: Annotated[
         str,
         Field(
@@ -24,9 +25,9 @@ def create_branch_tool(
     base_branch: Annotated[
         Optional[str],
         Field(
-            description="The base branch from which to create the new branch (default is 'main')."
+            description="The base branch from which to create the new branch (default is the repository's default branch)."
         ),
-    ] = "main",
+    ] = None,
 ) -> str:
     """
     Creates a new branch in a specified GitHub repository based on an existing branch.
@@ -34,7 +35,7 @@ def create_branch_tool(
     Args:
     - repo (str): The GitHub repository in the format 'owner/repo'.
     - new_branch (str): The name of the new branch to create.
-    - base_branch (Optional[str]): The base branch from which to create the new branch (default is 'main').
+    - base_branch (Optional[str]): The base branch from which to create the new branch (default is the repository's default branch).
 
     Example Requests:
     - Creating a New Branch from Main:
@@ -55,7 +56,14 @@ def create_branch_tool(
         return auth_response
 
     # Retrieve credentials and repository information
-    credentials = global_state.get("middleware.GithubAuthMiddleware.credentials")
+    credentials = get_credentials()
+
+    # Fall back to the repository default branch, cached per repository
+    base_branch, error_response = await resolve_branch_or_error(
+        repo, base_branch, credentials["access_token"]
+    )
+    if error_response:
+        return error_response
 
     # Prepare the URL to get the SHA of the base branch
     url = f"https://api.github.com/repos/{repo}/git/refs/heads/{base_branch}"
@@ -63,7 +71,7 @@ def create_branch_tool(
 
     try:
         # Get the current base branch details
-        base_branch_response = requests.get(url, headers=headers)
+        base_branch_response = await github.get(url, headers=headers)
         base_branch_response.raise_for_status()  # Raise an error for bad responses (4xx or 5xx)
         base_branch_info = base_branch_response.json()  # Parse JSON response
         base_branch_sha = base_branch_info["object"]["sha"]
@@ -76,15 +84,15 @@ def create_branch_tool(
         logger.info(f"Creating new branch in GitHub API with URL: {create_branch_url}")
 
         # Send the request to create the new branch
-        create_response = requests.post(
+        create_response = await github.post(
             create_branch_url, headers=headers, json=payload
         )
         create_response.raise_for_status()  # Raise an error for bad responses (4xx or 5xx)
 
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         # Log the error message from GitHub, if available
         logger.error(f"Request failed: {e}")
-        if e.response:
+        if hasattr(e, "response") and e.response:
             # If the exception has a response (i.e., 4xx or 5xx error), include the error message from GitHub
             logger.error(f"GitHub API Error Response: {e.response.text}")
             return {"error": f"GitHub API Error: {e.response.text}"}
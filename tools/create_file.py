@@ -1,17 +1,19 @@
-import requests
+import httpx
 import json
 from typing import Optional
 from typing_extensions import Annotated
 from pydantic import Field
 from core.utils.logger import logger  # Importing the logger
-from core.utils.state import global_state
 from core.utils.tools import doc_tag
-from app.middleware.github.GithubAuthMiddleware import check_access
+from app.middleware.github.GithubAuthMiddleware import check_access, get_credentials
+from app.utils.github import client as github
+from app.utils.github.branches import resolve_branch_or_error
+from app.utils.github.trees import invalidate_ref
 import base64
 
 
 @doc_tag("Files")
-def create_file_tool(
+async def create_file_tool(
     repo: Annotated[
         str,
         Field(
@@ -35,9 +37,9 @@ def create_file_tool(
     branch: Annotated[
         Optional[str],
         Field(
-            description="The branch where the file will be created (default is 'main')."
+            description="The branch where the file will be created (default is the repository's default branch)."
         ),
-    ] = "main",
+    ] = None,
 ) -> str:
     """
     Adds a new file to a specified GitHub repository on a specified branch.
@@ -47,7 +49,7 @@ def create_file_tool(
     - file_path (str): The path where the file will be created, including the filename.
     - content (str): The content of the file to be created.
     - commit_message (Optional[str]): The commit message for the file creation (default is 'Add new file').
-    - branch (Optional[str]): The branch where the file will be created (default is 'main').
+    - branch (Optional[str]): The branch where the file will be created (default is the repository's default branch).
 
     Returns:
     - JSON string indicating success or error.
@@ -62,16 +64,23 @@ def create_file_tool(
         return auth_response
 
     # Retrieve credentials and repository information
-    credentials = global_state.get("middleware.GithubAuthMiddleware.credentials")
+    credentials = get_credentials()
+
+    # Fall back to the repository default branch, cached per repository
+    branch, error_response = await resolve_branch_or_error(
+        repo, branch, credentials["access_token"]
+    )
+    if error_response:
+        return error_response
 
     # Check if the specified branch exists
     branch_url = f"https://api.github.com/repos/{repo}/branches/{branch}"
     headers = {"Authorization": f"token {credentials['access_token']}"}
 
     try:
-        branch_response = requests.get(branch_url, headers=headers)
+        branch_response = await github.get(branch_url, headers=headers)
         branch_response.raise_for_status()  # Raise an error for bad responses (4xx or 5xx)
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         error_message = f"Branch check failed: {e}, Response: {branch_response.text if branch_response else 'No response'}"
         logger.error(error_message)
         return {
@@ -83,10 +92,10 @@ def create_file_tool(
 
     try:
         # Check if the file already exists
-        file_response = requests.get(check_url, headers=headers)
+        file_response = await github.get(check_url, headers=headers)
         if file_response.status_code == 200:
             return {"error": "File already exists. Please update the file instead."}
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         logger.error(f"Failed to check file existence: {e}")
 
     # Prepare the URL to create the file
@@ -105,10 +114,11 @@ def create_file_tool(
 
     try:
         # Send the request to create the file
-        response = requests.put(url, headers=headers, json=payload)
+        response = await github.put(url, headers=headers, json=payload)
         response.raise_for_status()  # Raise an error for bad responses (4xx or 5xx)
         created_file = response.json()  # Parse the successful response
-    except requests.exceptions.RequestException as e:
+        invalidate_ref(repo, branch)  # Later reads must see the new commit
+    except httpx.HTTPError as e:
         # Log and return the detailed error message from GitHub
         error_message = f"Request failed: {e}, Response: {response.text if response else 'No response'}"
         logger.error(error_message)
@@ -1,16 +1,16 @@
-import requests
+import httpx
 import json
 from typing import Optional
 from typing_extensions import Annotated
 from pydantic import Field
 from core.utils.logger import logger  # Importing the logger
-from core.utils.state import global_state
-from app.middleware.github.GithubAuthMiddleware import check_access
+from app.middleware.github.GithubAuthMiddleware import check_access, get_credentials
+from app.utils.github import client as github
 from core.utils.tools import doc_tag  # Importing the doc_tag
 
 
 @doc_tag("Issues")  # Adding the doc_tag decorator
-def create_issue_tool(
+async def create_issue_tool(
     repo: Annotated[
         str,
         Field(description="The GitHub repository in the format 'owner/repo'."),
@@ -54,7 +54,7 @@ def create_issue_tool(
         return auth_response
 
     # Retrieve credentials and repository information
-    credentials = global_state.get("middleware.GithubAuthMiddleware.credentials")
+    credentials = get_credentials()
 
     # Prepare the URL to create the issue
     url = f"https://api.github.com/repos/{repo}/issues"
@@ -71,7 +71,7 @@ def create_issue_tool(
     logger.info(f"Creating issue in GitHub API with URL: {url} and data: {issue_data}")
 
     try:
-        response = requests.post(url, headers=headers, json=issue_data)
+        response = await github.post(url, headers=headers, json=issue_data)
         response.raise_for_status()  # Raise an error for bad responses (4xx or 5xx)
 
         # If the request is successful, return the issue data
@@ -79,7 +79,7 @@ def create_issue_tool(
         logger.info(f"Created issue with title '{title}'.")
         return created_issue
 
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         # Handle GitHub error responses (e.g., 400, 404, 500)
         error_message = None
         try:
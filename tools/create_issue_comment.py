@@ -1,16 +1,16 @@
-import requests
+import httpx
 import json
 from typing import Optional
 from typing_extensions import Annotated
 from pydantic import Field
 from core.utils.logger import logger  # Importing the logger
-from core.utils.state import global_state
-from app.middleware.github.GithubAuthMiddleware import check_access
+from app.middleware.github.GithubAuthMiddleware import check_access, get_credentials
+from app.utils.github import client as github
 from core.utils.tools import doc_tag  # Importing the doc_tag
 
 
 @doc_tag("Issues")  # Adding the doc_tag decorator
-def create_issue_comment_tool(
+async def create_issue_comment_tool(
     repo: Annotated[
         str,
         Field(description="The GitHub repository in the format 'owner/repo'."),
@@ -51,7 +51,7 @@ def create_issue_comment_tool(
         return auth_response
 
     # Retrieve credentials and repository information
-    credentials = global_state.get("middleware.GithubAuthMiddleware.credentials")
+    credentials = get_credentials()
 
     # Prepare the URL to add a comment
     url = f"https://api.github.com/repos/{repo}/issues/{issue_number}/comments"
@@ -69,11 +69,11 @@ def create_issue_comment_tool(
 
     try:
         # Send the request to create the comment
-        response = requests.post(url, headers=headers, json=comment_data)
+        response = await github.post(url, headers=headers, json=comment_data)
         response.raise_for_status()  # Raise an error for bad responses (4xx or 5xx)
         created_comment = response.json()  # Parse JSON response
 
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         # Log the error message and the response from GitHub API (if available)
         logger.error(
             f"Request failed: {e}, Response: {response.text if response else 'No response'}"
@@ -1,16 +1,17 @@
-import requests
+import httpx
 import json
 from typing import Optional
 from typing_extensions import Annotated
 from pydantic import Field
 from core.utils.logger import logger  # Importing the logger
-from core.utils.state import global_state
-from app.middleware.github.GithubAuthMiddleware import check_access
+from app.middleware.github.GithubAuthMiddleware import check_access, get_credentials
+from app.utils.github import client as github
+from app.utils.github.branches import resolve_branch_or_error
 from core.utils.tools import doc_tag  # Importing the doc_tag
 
 
 @doc_tag("Pull Requests")  # Adding the doc_tag decorator
-def create_pull_request_tool(
+async def create_pull_request_tool(
     repo: Annotated[
         str,
         Field(description="The GitHub repository in the format 'owner/repo'."),
@@ -22,9 +23,9 @@ def create_pull_request_tool(
     base_branch: Annotated[
         Optional[str],
         Field(
-            description="The base branch from which to merge changes (default is 'main')."
+            description="The base branch from which to merge changes (default is the repository's default branch)."
         ),
-    ] = "main",
+    ] = None,
     title: Annotated[
         Optional[str], Field(description="The title of the pull request.")
     ] = "Update branch",
@@ -38,7 +39,7 @@ def create_pull_request_tool(
     Args:
     - repo (str): The GitHub repository in the format 'owner/repo'.
     - target_branch (str): The name of the branch to update.
-    - base_branch (Optional[str]): The base branch from which to merge changes (default is 'main').
+    - base_branch (Optional[str]): The base branch from which to merge changes (default is the repository's default branch).
     - title (Optional[str]): The title of the pull request.
     - body (Optional[str]): The body of the pull request.
 
@@ -59,7 +60,14 @@ def create_pull_request_tool(
         return auth_response
 
     # Retrieve credentials and repository information
-    credentials = global_state.get("middleware.GithubAuthMiddleware.credentials")
+    credentials = get_credentials()
+
+    # Fall back to the repository default branch, cached per repository
+    base_branch, error_response = await resolve_branch_or_error(
+        repo, base_branch, credentials["access_token"]
+    )
+    if error_response:
+        return error_response
 
     # Prepare the URL to create a pull request
     create_pr_url = f"https://api.github.com/repos/{repo}/pulls"
@@ -74,10 +82,12 @@ def create_pull_request_tool(
 
     try:
         # Send the request to create the pull request
-        create_response = requests.post(create_pr_url, headers=headers, json=payload)
+        create_response = await github.post(
+            create_pr_url, headers=headers, json=payload
+        )
         create_response.raise_for_status()  # Raise an error for bad responses (4xx or 5xx)
 
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         # Log detailed information about the error
         error_message = f"Request failed: {str(e)}"
 
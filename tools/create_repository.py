@@ -1,16 +1,16 @@
-import requests
+import httpx
 import json
 from typing import Optional
 from typing_extensions import Annotated
 from pydantic import Field
 from core.utils.logger import logger  # Importing the logger
-from core.utils.state import global_state
-from app.middleware.github.GithubAuthMiddleware import check_access
+from app.middleware.github.GithubAuthMiddleware import check_access, get_credentials
+from app.utils.github import client as github
 from core.utils.tools import doc_tag  # Importing the doc_tag
 
 
 @doc_tag("Repositories")  # Adding the doc_tag decorator
-def create_repository_tool(
+async def create_repository_tool(
     name: Annotated[
         str,
         Field(description="The name of the repository to create."),
@@ -56,7 +56,7 @@ def create_repository_tool(
         return auth_response
 
     # Retrieve credentials
-    credentials = global_state.get("middleware.GithubAuthMiddleware.credentials")
+    credentials = get_credentials()
 
     # Prepare the URL to create the repository
     url = "https://api.github.com/user/repos"
@@ -75,7 +75,7 @@ def create_repository_tool(
     )
 
     try:
-        response = requests.post(url, headers=headers, json=repo_data)
+        response = await github.post(url, headers=headers, json=repo_data)
         response.raise_for_status()  # Raise an error for bad responses (4xx or 5xx)
 
         # If the request is successful, return the repository data
@@ -83,7 +83,7 @@ def create_repository_tool(
         logger.info(f"Created repository with name '{name}'.")
         return created_repo
 
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         # Handle GitHub error responses (e.g., 400, 404, 500)
         error_message = None
         try:
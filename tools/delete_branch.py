@@ -1,4 +1,4 @@
-import requests
+import httpx
 import json
 import base64  # Importing base64 for encoding and decoding
 import time  # Importing time for handling timestamps
@@ -6,8 +6,8 @@ from typing import Optional
 from typing_extensions import Annotated
 from pydantic import Field
 from core.utils.logger import logger  # Importing the logger
-from core.utils.state import global_state
-from app.middleware.github.GithubAuthMiddleware import check_access
+from app.middleware.github.GithubAuthMiddleware import check_access, get_credentials
+from app.utils.github import client as github
 from core.utils.tools import doc_tag  # Importing the doc_tag
 
 # Define the validity duration for the confirmation token (in seconds)
@@ -15,7 +15,7 @@ CONFIRMATION_TOKEN_VALIDITY_DURATION = 5 * 60  # 5 minutes
 
 
 @doc_tag("Branches")  # Adding the doc_tag decorator
-def delete_branch_tool(
+async def delete_branch_tool(
     repo: Annotated[
         str,
         Field(description="The GitHub repository in the format 'owner/repo'."),
@@ -80,7 +80,7 @@ def delete_branch_tool(
         return auth_response
 
     # Retrieve credentials and repository information
-    credentials = global_state.get("middleware.GithubAuthMiddleware.credentials")
+    credentials = get_credentials()
 
     # Generate a confirmation token if not provided
     if not confirmation_token:
@@ -137,7 +137,7 @@ def delete_branch_tool(
 
     try:
         # Send the request to delete the branch
-        response = requests.delete(url, headers=headers)
+        response = await github.delete(url, headers=headers)
         response.raise_for_status()  # Raise an error for bad responses (4xx or 5xx)
 
         # Check the response status and return the result
@@ -149,7 +149,7 @@ def delete_branch_tool(
                 "error": f"Failed to delete branch '{branch}'. GitHub error: {error_message}"
             }
 
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         logger.error(f"Request failed for branch '{branch}': {e}")
         return {"error": f"Request failed: {str(e)}"}
 
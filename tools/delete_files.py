@@ -1,4 +1,4 @@
-import requests
+import httpx
 import json
 import base64
 import time
@@ -6,8 +6,16 @@ from typing import List, Optional
 from typing_extensions import Annotated
 from pydantic import Field
 from core.utils.logger import logger
-from core.utils.state import global_state
-from app.middleware.github.GithubAuthMiddleware import check_access
+from app.middleware.github.GithubAuthMiddleware import check_access, get_credentials
+from app.utils.github.client import error_message
+from app.utils.github.git_data import (
+    create_commit,
+    create_tree,
+    get_branch_head,
+    update_branch,
+)
+from app.utils.github.trees import TreeError, find_entry, get_tree, invalidate_ref
+from app.utils.github.branches import resolve_branch_or_error
 from core.utils.tools import doc_tag
 
 # Define the validity duration for the confirmation token (in seconds)
@@ -15,7 +23,7 @@ CONFIRMATION_TOKEN_VALIDITY_DURATION = 5 * 60  # 5 minutes
 
 
 @doc_tag("Files")
-def delete_files_tool(
+async def delete_files_tool(
     repo: Annotated[
         str,
         Field(description="The GitHub repository in the format 'owner/repo'."),
@@ -35,9 +43,9 @@ def delete_files_tool(
     branch: Annotated[
         Optional[str],
         Field(
-            description="The branch from which to delete the files (default is 'main')."
+            description="The branch from which to delete the files (default is the repository's default branch)."
         ),
-    ] = "main",
+    ] = None,
 ) -> str:
     """
     Deletes specified files in a GitHub repository from a specified branch.
@@ -45,12 +53,13 @@ def delete_files_tool(
     This function first checks if a confirmation token is provided. If not, it generates a token based on the file paths and repository parameters.
     The user must then confirm the deletion using this token. If the token is provided, the function validates it against the original request parameters before proceeding with the deletion.
     The token is valid for a specified duration.
+    All the files are removed in a single commit on the branch.
 
     Args:
     - repo (str): The GitHub repository in the format 'owner/repo'.
     - file_paths (List[str]): A list of paths of the files to delete, including the filenames.
     - confirmation_token (Optional[str]): An optional token to confirm the deletion. If not provided, a token will be generated based on the file paths and repository.
-    - branch (Optional[str]): The branch from which to delete the files (default is 'main').
+    - branch (Optional[str]): The branch from which to delete the files (default is the repository's default branch).
 
     Examples Correct Request:
 
@@ -90,7 +99,14 @@ def delete_files_tool(
         return auth_response
 
     # Retrieve credentials and repository information
-    credentials = global_state.get("middleware.GithubAuthMiddleware.credentials")
+    credentials = get_credentials()
+
+    # Fall back to the repository default branch, cached per repository
+    branch, error_response = await resolve_branch_or_error(
+        repo, branch, credentials["access_token"]
+    )
+    if error_response:
+        return error_response
 
     # Generate a confirmation token if not provided
     if not confirmation_token:
@@ -144,76 +160,103 @@ def delete_files_tool(
         logger.error(f"Failed to decode confirmation token: {e}")
         return {"error": "Invalid confirmation token."}
 
-    # Prepare to delete each file
+    token = credentials["access_token"]
     responses = []
-    for file_path in file_paths:
-        # Prepare the URL to get the current file details, including the branch reference
-        url = f"https://api.github.com/repos/{repo}/contents/{file_path}?ref={branch}"
-        headers = {
-            "Authorization": f"token {credentials['access_token']}",
-            "Accept": "application/vnd.github.v3+json",
-        }
-
-        logger.info(f"Retrieving file info for deletion in GitHub API with URL: {url}")
-
-        try:
-            # Get the current file details to retrieve the SHA
-            file_response = requests.get(url, headers=headers)
-            file_response.raise_for_status()  # Raise an error for bad responses (4xx or 5xx)
-
-            # Check if the file exists (response should be a valid JSON object with file details)
-            if file_response.status_code == 404:
-                responses.append(
-                    {"file_path": file_path, "error": "File not found on GitHub."}
-                )
-                continue
-
-            file_info = file_response.json()  # Parse JSON response
-
-            # Prepare the URL to delete the file
-            delete_url = url
-            delete_payload = {
-                "message": f"Delete {file_path}",
-                "sha": file_info["sha"],  # Include the SHA of the existing file
-                "branch": branch,  # Include the branch in the payload
-            }
 
-            logger.info(f"Deleting file in GitHub API with URL: {delete_url}")
+    try:
+        # Read the branch head and its tree, the tree is cached per commit
+        head_sha = await get_branch_head(repo, branch, token)
+        tree = await get_tree(repo, head_sha, token)
+    except httpx.HTTPStatusError as e:
+        logger.error(f"Request failed for branch '{branch}': {e}")
+        return {
+            "error": f"Request failed with {e.response.status_code}: {error_message(e)}"
+        }
+    except (httpx.HTTPError, TreeError) as e:
+        logger.error(f"Request failed for branch '{branch}': {e}")
+        return {"error": f"Request failed: {str(e)}"}
 
-            # Send the request to delete the file
-            response = requests.delete(delete_url, headers=headers, json=delete_payload)
-            response.raise_for_status()  # Raise an error for bad responses (4xx or 5xx)
+    # Build one tree change removing every listed file
+    tree_entries = []
+    deleted_paths = []
+    for file_path in file_paths:
+        path = file_path.strip("/")
+        entry = tree["entries"].get(path)
 
-            if response.status_code == 403:
+        # A truncated tree may not list the file, look it up level by level
+        if entry is None and tree["truncated"]:
+            try:
+                entry = await find_entry(repo, tree["sha"], path, token)
+            except (httpx.HTTPError, TreeError) as e:
+                logger.error(f"Failed to look up '{path}' in the tree: {e}")
                 responses.append(
                     {
                         "file_path": file_path,
-                        "error": "Permission denied. Check your access rights.",
+                        "error": f"Could not confirm the file exists: {str(e)}",
                     }
                 )
                 continue
 
+        if entry is None:
             responses.append(
-                {"file_path": file_path, "message": "File deleted successfully."}
+                {"file_path": file_path, "error": "File not found on GitHub."}
             )
-
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Request failed for file '{file_path}': {e}")
-            # Capture GitHub-specific errors
-            try:
-                error_message = response.json().get("message", "Unknown error")
-                error_code = response.status_code
-            except ValueError:
-                error_message = str(e)
-                error_code = 500
+            continue
+        if entry is not None and entry.get("type") != "blob":
             responses.append(
-                {
-                    "file_path": file_path,
-                    "error": f"Request failed with {error_code}: {error_message}",
-                }
+                {"file_path": file_path, "error": "The path is not a file."}
             )
+            continue
+
+        tree_entries.append(
+            {
+                "path": path,
+                "mode": entry["mode"],
+                "type": "blob",
+                "sha": None,  # A null SHA removes the path from the base tree
+            }
+        )
+        deleted_paths.append(file_path)
+
+    if not tree_entries:
+        return {"responses": responses}
+
+    if len(deleted_paths) == 1:
+        message = f"Delete {deleted_paths[0]}"
+    else:
+        message = f"Delete {len(deleted_paths)} files\n\n" + "\n".join(
+            f"- {file_path}" for file_path in deleted_paths
+        )
+
+    logger.info(
+        f"Deleting {len(deleted_paths)} files in a single commit on branch '{branch}'"
+    )
+
+    try:
+        new_tree_sha = await create_tree(repo, tree["sha"], tree_entries, token)
+        commit_sha = await create_commit(repo, message, new_tree_sha, [head_sha], token)
+        await update_branch(repo, branch, commit_sha, token)
+        invalidate_ref(repo, branch)
+    except httpx.HTTPError as e:
+        logger.error(f"Request failed for files '{deleted_paths}': {e}")
+        if isinstance(e, httpx.HTTPStatusError):
+            error = f"Request failed with {e.response.status_code}: {error_message(e)}"
+        else:
+            error = f"Request failed: {str(e)}"
+        responses.extend(
+            {"file_path": file_path, "error": error} for file_path in deleted_paths
+        )
+        return {"responses": responses}
+
+    responses.extend(
+        {"file_path": file_path, "message": "File deleted successfully."}
+        for file_path in deleted_paths
+    )
+    # Report the files in the order they were requested
+    order = {file_path: i for i, file_path in enumerate(file_paths)}
+    responses.sort(key=lambda r: order[r["file_path"]])
 
     logger.info(
         f"Files deletion process completed in repository '{repo}' on branch '{branch}'."
     )
-    return {"responses": responses}
+    return {"responses": responses, "commit_sha": commit_sha}
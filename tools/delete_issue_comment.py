@@ -1,4 +1,4 @@
-import requests
+import httpx
 import json
 import base64
 import time
@@ -6,15 +6,15 @@ from typing import Optional
 from typing_extensions import Annotated
 from pydantic import Field
 from core.utils.logger import logger
-from core.utils.state import global_state
-from app.middleware.github.GithubAuthMiddleware import check_access
+from app.middleware.github.GithubAuthMiddleware import check_access, get_credentials
+from app.utils.github import client as github
 from core.utils.tools import doc_tag
 
 CONFIRMATION_TOKEN_VALIDITY_DURATION = 5 * 60  # 5 minutes
 
 
 @doc_tag("Issues")
-def delete_issue_comment_tool(
+async def delete_issue_comment_tool(
     repo: Annotated[
         str,
         Field(description="The GitHub repository in the format 'owner/repo'."),
@@ -79,7 +79,7 @@ def delete_issue_comment_tool(
     if auth_response:
         return auth_response
 
-    credentials = global_state.get("middleware.GithubAuthMiddleware.credentials")
+    credentials = get_credentials()
 
     # Generate a confirmation token if not provided
     if not confirmation_token:
@@ -132,7 +132,7 @@ def delete_issue_comment_tool(
     logger.info(f"Deleting comment in GitHub API with URL: {url}")
 
     try:
-        response = requests.delete(url, headers=headers)
+        response = await github.delete(url, headers=headers)
 
         # Handle GitHub API response errors
         if response.status_code == 404:
@@ -150,7 +150,7 @@ def delete_issue_comment_tool(
                 "error": f"GitHub API error: {response.status_code}",
                 "message": response.json() if response.content else "No message",
             }
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         logger.error(f"Request failed: {e}")
         return {"error": f"Request failed: {str(e)}"}
 
@@ -1,4 +1,4 @@
-import requests
+import httpx
 import json
 import base64  # Importing base64 for encoding and decoding
 import time  # Importing time for handling timestamps
@@ -6,8 +6,8 @@ from typing import Optional
 from typing_extensions import Annotated
 from pydantic import Field
 from core.utils.logger import logger  # Importing the logger
-from core.utils.state import global_state
-from app.middleware.github.GithubAuthMiddleware import check_access
+from app.middleware.github.GithubAuthMiddleware import check_access, get_credentials
+from app.utils.github import client as github
 from core.utils.tools import doc_tag  # Importing the doc_tag
 
 # Define the validity duration for the confirmation token (in seconds)
@@ -15,7 +15,7 @@ CONFIRMATION_TOKEN_VALIDITY_DURATION = 5 * 60  # 5 minutes
 
 
 @doc_tag("Repositories")  # Adding the doc_tag decorator
-def delete_repository_tool(
+async def delete_repository_tool(
     repo: Annotated[
         str,
         Field(
@@ -78,7 +78,7 @@ def delete_repository_tool(
         return auth_response
 
     # Retrieve credentials
-    credentials = global_state.get("middleware.GithubAuthMiddleware.credentials")
+    credentials = get_credentials()
 
     # Generate a confirmation token if not provided
     if not confirmation_token:
@@ -132,12 +132,12 @@ def delete_repository_tool(
     logger.info(f"Deleting repository in GitHub API with URL: {url}")
 
     try:
-        response = requests.delete(url, headers=headers)
+        response = await github.delete(url, headers=headers)
         response.raise_for_status()  # This will raise an HTTPError for 4xx/5xx responses
         return {"message": f"Repository '{repo}' deleted successfully."}
-    except requests.exceptions.HTTPError as http_err:
+    except httpx.HTTPStatusError as http_err:
         logger.error(f"HTTP error occurred: {http_err}")
         return {"error": f"HTTP error occurred: {http_err}"}
-    except requests.exceptions.RequestException as err:
+    except httpx.HTTPError as err:
         logger.error(f"Request error occurred: {err}")
         return {"error": f"Request error occurred: {err}"}
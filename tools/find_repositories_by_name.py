@@ -1,16 +1,16 @@
-import requests
+import httpx
 import json
 from typing import Optional
 from typing_extensions import Annotated
 from pydantic import Field
 from core.utils.logger import logger  # Importing the logger
-from core.utils.state import global_state
-from app.middleware.github.GithubAuthMiddleware import check_access
+from app.middleware.github.GithubAuthMiddleware import check_access, get_credentials
+from app.utils.github import client as github
 from core.utils.tools import doc_tag
 
 
 @doc_tag("Repositories")
-def find_repositories_by_name_tool(
+async def find_repositories_by_name_tool(
     query: Annotated[
         str,
         Field(description="The string to search for in repository names."),
@@ -44,12 +44,12 @@ def find_repositories_by_name_tool(
     if auth_response:
         return auth_response
 
-    credentials = global_state.get("middleware.GithubAuthMiddleware.credentials", None)
+    credentials = get_credentials()
     headers = {"Authorization": f"token {credentials['access_token']}"}
     url = f"https://api.github.com/search/repositories?q={query}+user:{username}"
 
     try:
-        response = requests.get(url, headers=headers)
+        response = await github.get(url, headers=headers)
         response.raise_for_status()  # Raise an error for bad responses (4xx or 5xx)
 
         # Decode and return the search results
@@ -62,7 +62,7 @@ def find_repositories_by_name_tool(
             "total_count": search_results["total_count"],
         }
 
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         # Capture and return the GitHub error message
         try:
             error_details = response.json()
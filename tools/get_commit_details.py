@@ -1,16 +1,18 @@
 from typing import List, Optional
 from typing_extensions import Annotated
 from pydantic import Field
-import requests
+import asyncio
+import httpx
 import json
 from core.utils.logger import logger
-from core.utils.state import global_state
-from app.middleware.github.GithubAuthMiddleware import check_access
+from app.middleware.github.GithubAuthMiddleware import check_access, get_credentials
+from app.utils.github import client as github
+from app.utils.github.mirror import MirrorError, get_mirror
 from core.utils.tools import doc_tag
 
 
 @doc_tag("Commits")
-def get_commit_details_tool(
+async def get_commit_details_tool(
     repo: Annotated[
         str,
         Field(description="The GitHub repository in the format 'owner/repo'."),
@@ -51,27 +53,30 @@ def get_commit_details_tool(
     if auth_response:
         return auth_response
 
-    credentials = global_state.get("middleware.GithubAuthMiddleware.credentials", None)
-    headers = {"Authorization": f"token {credentials['access_token']}"}
-    url = f"https://api.github.com/repos/{repo}/commits/{sha}"
+    credentials = get_credentials()
+    commit = await fetch_mirrored_commit(repo, sha, files, credentials["access_token"])
 
-    try:
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()  # Raise an error for bad responses (4xx or 5xx)
-
-        # If the request is successful, return the response data
-        commit = response.json()
+    if commit is None:
+        headers = {"Authorization": f"token {credentials['access_token']}"}
+        url = f"https://api.github.com/repos/{repo}/commits/{sha}"
 
-    except requests.exceptions.RequestException as e:
-        # Capture and return the GitHub error message
         try:
-            error_details = response.json()
-            error_message = error_details.get("message", str(e))
-        except json.JSONDecodeError:
-            error_message = str(e)
+            response = await github.get(url, headers=headers)
+            response.raise_for_status()  # Raise an error for bad responses (4xx or 5xx)
+
+            # If the request is successful, return the response data
+            commit = response.json()
 
-        logger.error(f"GitHub request failed: {error_message}")
-        return {"error": error_message}
+        except httpx.HTTPError as e:
+            # Capture and return the GitHub error message
+            try:
+                error_details = response.json()
+                error_message = error_details.get("message", str(e))
+            except json.JSONDecodeError:
+                error_message = str(e)
+
+            logger.error(f"GitHub request failed: {error_message}")
+            return {"error": error_message}
 
     if files:
         file_diffs = [
@@ -98,14 +103,19 @@ def get_commit_details_tool(
             f"[@{commit.get('author', {}).get('login', 'N/A')}]"
             f"(https://github.com/{commit.get('author', {}).get('login', 'N/A')})"
             if commit.get("author")
-            else "Unknown Author"
+            # Mirrored commits only know the git author, not the GitHub account
+            else commit.get("commit", {})
+            .get("author", {})
+            .get("name", "Unknown Author")
         ),
         "committer": (
             f"{commit.get('commit', {}).get('committer', {}).get('name', 'Unknown')} "
             f"[@{commit.get('committer', {}).get('login', 'N/A')}]"
             f"(https://github.com/{commit.get('committer', {}).get('login', 'N/A')})"
             if commit.get("committer")
-            else "Unknown Committer"
+            else commit.get("commit", {})
+            .get("committer", {})
+            .get("name", "Unknown Committer")
         ),
         "date": commit.get("commit", {}).get("committer", {}).get("date", "Unknown"),
         "url": commit.get("html_url", "#"),
@@ -123,3 +133,48 @@ def get_commit_details_tool(
 
     logger.info(f"Returning full commit details for SHA {sha}")
     return {"commit": commit_details}
+
+
+async def fetch_mirrored_commit(
+    repo: str, sha: str, files: Optional[List[str]], token: str
+) -> Optional[dict]:
+    """
+    Read a commit from the local mirror of the repository, with the patches of the filtered files.
+
+    Args:
+    - repo (str): The GitHub repository in the format 'owner/repo'.
+    - sha (str): The SHA of the commit.
+    - files (Optional[List[str]]): Filenames the patches are needed for.
+    - token (str): GitHub personal access token.
+
+    Returns:
+    - The commit in the shape of the GitHub API, or None if it isn't mirrored.
+    """
+    mirror = await get_mirror(repo, token)
+    if mirror is None:
+        return None
+
+    try:
+        commit = await mirror.get_commit(sha)
+        if commit is None or not files:
+            return commit
+
+        parent = commit["parents"][0]["sha"] if commit["parents"] else None
+        wanted = [file for file in commit["files"] if file["filename"] in files]
+        patches = await asyncio.gather(
+            *(
+                mirror.get_patch(
+                    commit["sha"],
+                    parent,
+                    file["filename"],
+                    file.get("previous_filename"),
+                )
+                for file in wanted
+            )
+        )
+        for file, patch in zip(wanted, patches):
+            file["patch"] = patch
+        return commit
+    except MirrorError as e:
+        logger.warning(f"Failed to read commit {sha} from the mirror of {repo}: {e}")
+        return None
@@ -1,26 +1,25 @@
-import requests
+import httpx
 import json
 from typing import Optional
 from typing_extensions import Annotated
 from pydantic import Field
 from core.utils.logger import logger  # Importing the logger
-from core.utils.state import global_state
-from app.middleware.github.GithubAuthMiddleware import check_access
+from app.middleware.github.GithubAuthMiddleware import check_access, get_credentials
+from app.utils.github.pagination import collect_pages
+from app.utils.github.branches import resolve_branch_or_error
 from core.utils.tools import doc_tag  # Importing the doc_tag
 
 
 @doc_tag("Commits")  # Adding the doc_tag decorator
-def get_commits_tool(
+async def get_commits_tool(
     repo: Annotated[
         str,
         Field(description="The GitHub repository in the format 'owner/repo'."),
     ],
     branch: Annotated[
         Optional[str],
-        Field(
-            default="main", description="Optional, the branch to fetch commits from."
-        ),
-    ] = "main",
+        Field(default=None, description="Optional, the branch to fetch commits from."),
+    ] = None,
     path: Annotated[
         Optional[str],
         Field(
@@ -54,6 +53,13 @@ def get_commits_tool(
             ),
         ),
     ] = None,
+    max_items: Annotated[
+        Optional[int],
+        Field(
+            default=None,
+            description="Optional, maximum number of commits to return, following the next pages until reached.",
+        ),
+    ] = None,
 ) -> str:
     """
     Fetch commit history from a GitHub repository.
@@ -61,11 +67,12 @@ def get_commits_tool(
 
     Args:
     - repo (str): The GitHub repository in the format 'owner/repo'.
-    - branch (Optional[str]): The branch to fetch commits from. Default is 'main'.
+    - branch (Optional[str]): The branch to fetch commits from. Default is the repository's default branch.
     - path (Optional[str]): Specific file or folder path.
     - per_page (Optional[int]): Number of commits to return per page. Default is 15.
     - since (Optional[str]): Fetch commits since this timestamp in ISO 8601 format (e.g., '2023-10-10T14:30:00Z').
     - until (Optional[str]): Fetch commits until this timestamp in ISO 8601 format (e.g., '2023-10-10T14:30:00Z').
+    - max_items (Optional[int]): Maximum number of commits to return, following the next pages until reached.
 
     Returns:
     - JSON string indicating the commits or error.
@@ -79,7 +86,7 @@ def get_commits_tool(
       get_commits_tool(repo="owner/repo", path="src/main.py")
     """
     logger.info(
-        f"Received request to fetch commits for repo: {repo}, branch: {branch}, path: {path}, per_page: {per_page}, since: {since}, until: {until}"
+        f"Received request to fetch commits for repo: {repo}, branch: {branch}, path: {path}, per_page: {per_page}, since: {since}, until: {until}, max_items: {max_items}"
     )
 
     # Check authentication
@@ -87,13 +94,20 @@ def get_commits_tool(
     if auth_response:
         return auth_response
 
-    credentials = global_state.get("middleware.GithubAuthMiddleware.credentials", None)
+    credentials = get_credentials()
+
+    # Fall back to the repository default branch, cached per repository
+    branch, error_response = await resolve_branch_or_error(
+        repo, branch, credentials["access_token"]
+    )
+    if error_response:
+        return error_response
 
-    # Ensure per_page is a positive integer
+    # Ensure per_page and max_items are positive integers
     if per_page <= 0:
         return {"error": "Invalid value for per_page. It must be a positive integer."}
-
-    headers = {"Authorization": f"token {credentials['access_token']}"}
+    if max_items is not None and max_items <= 0:
+        return {"error": "Invalid value for max_items. It must be a positive integer."}
 
     # Step 2: Building the commits URL using the SHA
     url = (
@@ -113,12 +127,15 @@ def get_commits_tool(
     logger.info(f"Fetching commits from GitHub API with URL: {url}")
 
     try:
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()  # Raise an error for bad responses (4xx or 5xx)
-    except requests.exceptions.RequestException as e:
+        commits = await collect_pages(
+            url, credentials["access_token"], max_items=max_items
+        )
+    except httpx.HTTPStatusError as e:
         # Capture the error message from GitHub's response, if available
         try:
-            error_details = response.json()  # Try to parse error details from response
+            error_details = (
+                e.response.json()
+            )  # Try to parse error details from response
             error_message = error_details.get(
                 "message", str(e)
             )  # Default to the request error message
@@ -129,10 +146,9 @@ def get_commits_tool(
 
         logger.error(f"GitHub request failed: {error_message}")
         return {"error": error_message}
-
-    # If successful, proceed to process the commits
-    try:
-        commits = response.json()
+    except httpx.HTTPError as e:
+        logger.error(f"GitHub request failed: {e}")
+        return {"error": str(e)}
     except json.JSONDecodeError:
         logger.error("Failed to decode JSON response")
         return {"error": "Failed to decode JSON response"}
@@ -1,4 +1,3 @@
-import requests
 import json
 import base64
 from typing import List
@@ -6,12 +5,19 @@ from typing_extensions import Annotated
 from pydantic import Field
 from core.utils.logger import logger  # Importing the logger
 from core.utils.state import global_state
-from app.middleware.github.GithubAuthMiddleware import check_access
+from app.middleware.github.GithubAuthMiddleware import check_access, get_credentials
+from app.utils.github import client as github
+from app.utils.github.blob_cache import blob_cache, get_cached_file
+from app.utils.github.graphql import fetch_blobs
+from app.utils.github.mirror import MirrorError, get_mirror
+from core.utils.config import config
 from core.utils.tools import doc_tag  # Importing the doc_tag
 
+github_api_config = config.get("GITHUB_API", {})
+
 
 @doc_tag("Commits")  # Adding the doc_tag decorator
-def get_files_before_commit_tool(
+async def get_files_before_commit_tool(
     sha: Annotated[
         str,
         Field(description="The current commit SHA."),
@@ -52,7 +58,7 @@ def get_files_before_commit_tool(
     if auth_response:
         return auth_response
 
-    credentials = global_state.get("middleware.GithubAuthMiddleware.credentials", None)
+    credentials = get_credentials()
     middleware_repo = global_state.get("middleware.GithubAuthMiddleware.repo", None)
 
     # Determine the repository to use
@@ -66,40 +72,103 @@ def get_files_before_commit_tool(
         return {"error": "file names must be a non-empty list"}
 
     headers = {"Authorization": f"token {credentials['access_token']}"}
+    token = credentials["access_token"]
 
-    # Step 1: Get commit details to find the parent SHA
-    commit_url = f"https://api.github.com/repos/{repo}/commits/{sha}"
-    logger.info(f"Fetching commit details from: {commit_url}")
-
-    commit_response = requests.get(commit_url, headers=headers)
-    if commit_response.status_code != 200:
+    # Step 1: Get commit details to find the parent SHA, from the local mirror if there is one
+    commit_data = None
+    mirror = await get_mirror(repo, token)
+    if mirror is not None:
         try:
-            error_details = (
-                commit_response.json()
-            )  # Try to parse error details from response
-            error_message = error_details.get("message", "Unknown error")
-        except json.JSONDecodeError:
-            error_message = (
-                commit_response.text
-            )  # Fallback to the raw response text if it's not JSON
-        return {"error": f"GitHub API error: {error_message}"}
-
-    commit_data = commit_response.json()
-    parent_sha = commit_data.get("parents", [{}])[0].get("sha")
+            commit_data = await mirror.get_commit(sha)
+        except MirrorError as e:
+            logger.warning(
+                f"Failed to read commit {sha} from the mirror of {repo}: {e}"
+            )
+
+    if commit_data is None:
+        commit_url = f"https://api.github.com/repos/{repo}/commits/{sha}"
+        logger.info(f"Fetching commit details from: {commit_url}")
+
+        commit_response = await github.get(commit_url, headers=headers)
+        if commit_response.status_code != 200:
+            try:
+                error_details = (
+                    commit_response.json()
+                )  # Try to parse error details from response
+                error_message = error_details.get("message", "Unknown error")
+            except json.JSONDecodeError:
+                error_message = (
+                    commit_response.text
+                )  # Fallback to the raw response text if it's not JSON
+            return {"error": f"GitHub API error: {error_message}"}
+
+        commit_data = commit_response.json()
+
+    parent_sha = (commit_data.get("parents") or [{}])[0].get("sha")
 
     if not parent_sha:
         return {"error": "No parent commit found. This might be the first commit."}
 
     files_data = []
 
-    # Step 2: Fetch each file's metadata and content from the parent commit
+    # Step 2: Read the files from the mirror, or serve those whose blob SHA is already cached
+    blobs = {}
+    if mirror is not None:
+        try:
+            local_files = await mirror.read_blobs(parent_sha, files)
+            for filename, content in local_files.items():
+                try:
+                    blobs[filename] = {
+                        "size": len(content),
+                        "text": content.decode("utf-8"),
+                    }
+                except UnicodeDecodeError:
+                    pass
+        except MirrorError as e:
+            logger.warning(f"Failed to read files from the mirror of {repo}: {e}")
+
+    for filename in files:
+        if filename in blobs:
+            continue
+        cached_content = await get_cached_file(repo, parent_sha, filename, token)
+        try:
+            if cached_content is not None:
+                blobs[filename] = {
+                    "size": len(cached_content),
+                    "text": cached_content.decode("utf-8"),
+                }
+        except UnicodeDecodeError:
+            pass
+
+    # Step 3: Fetch the other files from the parent commit in batched GraphQL queries
+    missing_files = [f for f in files if f not in blobs]
+    if missing_files and github_api_config.get("graphql_batching", True):
+        blobs.update(await fetch_blobs(repo, parent_sha, missing_files, token))
+
+    # Step 4: Fetch each remaining file's metadata and content from the parent commit
     for filename in files:
+        if filename in blobs:
+            blob = blobs[filename]
+            files_data.append(
+                {
+                    "filename": filename,
+                    "html_url": f"https://github.com/{repo}/blob/{parent_sha}/{filename}",
+                    "size": blob["size"],
+                    "content": (
+                        blob["text"]
+                        if blob["size"] < 50000
+                        else "file size exceeds 50000 bytes, use html_url to view file."
+                    ),
+                }
+            )
+            continue
+
         file_url = (
             f"https://api.github.com/repos/{repo}/contents/{filename}?ref={parent_sha}"
         )
         logger.info(f"Fetching file before commit from: {file_url}")
 
-        file_response = requests.get(file_url, headers=headers)
+        file_response = await github.get(file_url, headers=headers)
         if file_response.status_code != 200:
             try:
                 error_details = (
@@ -125,6 +194,8 @@ def get_files_before_commit_tool(
             if file_content_encoded
             else "File content not available"
         )
+        if file_content_encoded:
+            blob_cache.put(file_data.get("sha"), base64.b64decode(file_content_encoded))
 
         files_data.append(
             {
@@ -1,16 +1,25 @@
-import requests
+import httpx
 import base64
 from typing import List, Optional
 from typing_extensions import Annotated
 from pydantic import Field
 from core.utils.logger import logger  # Importing the logger
-from core.utils.state import global_state
-from app.middleware.github.GithubAuthMiddleware import check_access
+from app.middleware.github.GithubAuthMiddleware import check_access, get_credentials
+from app.utils.github import client as github
+from app.utils.github.blob_cache import blob_cache, get_cached_file
+from app.utils.github.concurrency import gather_for_user
+from app.utils.github.graphql import fetch_blobs
+from app.utils.github.mirror import MirrorError, get_mirror
+from app.utils.github.snapshots import SnapshotError, get_snapshot
+from core.utils.config import config
 from core.utils.tools import doc_tag  # Importing the doc_tag
 
+github_api_config = config.get("GITHUB_API", {})
+snapshot_config = config.get("GITHUB_SNAPSHOT", {})
+
 
 @doc_tag("Files")  # Adding the doc_tag decorator
-def get_files_contents_tool(
+async def get_files_contents_tool(
     repo: Annotated[
         str,
         Field(description="The GitHub repository in the format 'owner/repo'."),
@@ -52,20 +61,75 @@ def get_files_contents_tool(
     if auth_response:
         return auth_response
 
-    credentials = global_state.get("middleware.GithubAuthMiddleware.credentials", None)
+    credentials = get_credentials()
     token = credentials["access_token"]  # Get the access token
 
-    file_contents = []
+    # Read mirrored repositories from the local mirror, without API calls
+    cached_contents = {}
+    mirror = await get_mirror(repo, token)
+    if mirror is not None:
+        try:
+            commit = await mirror.resolve(branch)
+            if commit:
+                local_files = await mirror.read_blobs(commit, file_paths)
+                for file_path, content in local_files.items():
+                    try:
+                        cached_contents[file_path] = content.decode("utf-8")
+                    except UnicodeDecodeError:
+                        pass
+        except MirrorError as e:
+            logger.warning(f"Failed to read files from the mirror of {repo}: {e}")
+
+    # Many files are cheaper to read from a snapshot of the whole ref
+    missing_paths = [p for p in file_paths if p not in cached_contents]
+    if len(missing_paths) >= snapshot_config.get("min_files", 20):
+        try:
+            snapshot = await get_snapshot(repo, branch, token)
+            if snapshot is not None:
+                for file_path, content in snapshot.read_files(missing_paths).items():
+                    try:
+                        cached_contents[file_path] = content.decode("utf-8")
+                    except UnicodeDecodeError:
+                        pass
+        except SnapshotError as e:
+            logger.warning(f"Failed to read files from a snapshot of {repo}: {e}")
+
+    # Serve files whose blob SHA, resolved from the cached tree, is already cached
     for file_path in file_paths:
+        if file_path in cached_contents:
+            continue
+        cached_content = await get_cached_file(repo, branch, file_path, token)
+        try:
+            if cached_content is not None:
+                cached_contents[file_path] = cached_content.decode("utf-8")
+        except UnicodeDecodeError:
+            pass
+
+    # Fetch the other files in batched GraphQL queries
+    blobs = {}
+    missing_paths = [p for p in file_paths if p not in cached_contents]
+    if missing_paths and github_api_config.get("graphql_batching", True):
+        blobs = await fetch_blobs(repo, branch, missing_paths, token)
+
+    async def fetch_entry(file_path: str) -> dict:
+        if file_path in cached_contents:
+            return {"file_path": file_path, "content": cached_contents[file_path]}
+
+        if file_path in blobs:
+            return {"file_path": file_path, "content": blobs[file_path]["text"]}
+
         try:
             # Fetch content for the specified file
-            content = fetch_file_content(repo, file_path, token, branch)
-            file_contents.append({"file_path": file_path, "content": content})
+            content = await fetch_file_content(repo, file_path, token, branch)
+            return {"file_path": file_path, "content": content}
         except Exception as e:
             logger.error(f"Failed to fetch content for {file_path}: {e}")
-            file_contents.append(
-                {"file_path": file_path, "error": f"Failed to fetch content: {e}"}
-            )
+            return {"file_path": file_path, "error": f"Failed to fetch content: {e}"}
+
+    # Fetch the remaining files concurrently, results keep the order of file_paths
+    file_contents = await gather_for_user(
+        token, (fetch_entry(file_path) for file_path in file_paths)
+    )
 
     # Log successful fetching
     logger.info(f"Successfully fetched content for {len(file_paths)} files.")
@@ -74,7 +138,7 @@ def get_files_contents_tool(
     return {"data": {"file_contents": file_contents, "total_count": len(file_contents)}}
 
 
-def fetch_file_content(
+async def fetch_file_content(
     repo_url: str, file_path: str, token: str, branch: Optional[str] = None
 ) -> str:
     """
@@ -98,7 +162,7 @@ def fetch_file_content(
             content_url += f"?ref={branch}"  # Append branch reference if provided
 
         logger.info(f"Fetching content for file: {file_path} from URL: {content_url}")
-        response = requests.get(content_url, headers=headers)
+        response = await github.get(content_url, headers=headers)
 
         if response.status_code != 200:
             # Capture GitHub API error details
@@ -114,6 +178,7 @@ def fetch_file_content(
             # Decode the base64 content
             decoded_content = base64.b64decode(file_data["content"])
             file_content = decoded_content.decode("utf-8")
+            blob_cache.put(file_data.get("sha"), decoded_content)
             logger.info(f"Content fetched and decoded for: {file_path}")
         elif file_data.get("encoding") == "none":
             # Directly decode the 'none' encoding
@@ -125,7 +190,7 @@ def fetch_file_content(
 
         return file_content  # Return the file content as plain text
 
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         error_message = f"RequestException fetching content for {file_path}: {str(e)}"
         logger.error(error_message)
         return error_message  # Return the error message as plain text
@@ -1,16 +1,17 @@
-import requests
-import json
+import httpx
 from typing import List, Optional
 from typing_extensions import Annotated
 from pydantic import Field
 from core.utils.logger import logger  # Importing the logger
-from core.utils.state import global_state
-from app.middleware.github.GithubAuthMiddleware import check_access
+from app.middleware.github.GithubAuthMiddleware import check_access, get_credentials
+from app.utils.github.branches import resolve_branch_or_error
+from app.utils.github.concurrency import gather_for_user
+from app.utils.github.trees import TreeError, find_entry, get_tree
 from core.utils.tools import doc_tag  # Importing the doc_tag
 
 
 @doc_tag("Files")  # Adding the doc_tag decorator
-def get_files_details_tool(
+async def get_files_details_tool(
     repo: Annotated[
         str,
         Field(description="The GitHub repository in the format 'owner/repo'."),
@@ -32,6 +33,9 @@ def get_files_details_tool(
     Fetch details for multiple files from a GitHub repository without the content.
     The repo parameter is required and must be included in the request headers.
 
+    Files that can't be found and directories are reported with an "error"
+    in their place instead of failing the whole request.
+
     Args:
     - repo (str): The GitHub repository in the format 'owner/repo'.
     - files (List[str]): List of file names to fetch details for. Ex: ['lib/file1.txt', 'assets/file2.txt']
@@ -55,89 +59,105 @@ def get_files_details_tool(
     if auth_response:
         return auth_response
 
-    credentials = global_state.get("middleware.GithubAuthMiddleware.credentials", None)
-    headers = {"Authorization": f"token {credentials['access_token']}"}
+    credentials = get_credentials()
+
+    # If branch is not provided, use the cached default branch name
+    branch, error_response = await resolve_branch_or_error(
+        repo, branch, credentials["access_token"]
+    )
+    if error_response:
+        return error_response
+
+    # Read the metadata of all the files from one cached recursive tree
+    try:
+        tree = await get_tree(repo, branch, credentials["access_token"])
+    except TreeError as e:
+        logger.error(str(e))
+        return {"error": str(e)}
+    except httpx.HTTPError as e:
+        error_message = f"Request failed for tree of {branch}: {e}"
+        logger.error(error_message)
+        return {"error": error_message}
 
-    # If branch is not provided, fetch the default branch name
-    branch = branch or get_default_branch(repo, headers)
-    if isinstance(branch, dict):  # If the branch is an error response
-        return branch
+    # The truncated tree may not list the files, look them up level by level
+    entries = tree["entries"]
+    missing_paths = [
+        file_path.strip("/")
+        for file_path in files
+        if tree["truncated"] and file_path.strip("/") not in entries
+    ]
+    if missing_paths:
+        found = await gather_for_user(
+            credentials["access_token"],
+            (
+                find_tree_entry(repo, tree["sha"], path, credentials["access_token"])
+                for path in missing_paths
+            ),
+        )
+        entries = {**entries, **dict(zip(missing_paths, found))}
 
-    # Fetch file details
     file_details = []
     for file_path in files:
-        file_metadata = fetch_file_metadata(repo, file_path, branch, headers)
-        if "error" in file_metadata:
-            return file_metadata  # Return error immediately if encountered
-
-        file_details.append(file_metadata)
+        entry = entries.get(file_path.strip("/"))
+        if entry is None:
+            details = {"path": file_path, "error": f"File not found: {file_path}"}
+        elif "error" in entry:
+            details = {"path": file_path, "error": entry["error"]}
+        elif entry["type"] == "tree":
+            details = {"path": file_path, "error": f"Path is a directory: {file_path}"}
+        else:
+            details = tree_entry_metadata(repo, branch, entry)
+        file_details.append(details)
 
     logger.info(f"Fetched details for {len(file_details)} files.")
     return {"file_details": file_details, "total_count": len(file_details)}
 
 
-def get_default_branch(repo: str, headers: dict) -> Optional[str]:
+def tree_entry_metadata(repo: str, branch: str, entry: dict) -> dict:
     """
-    Fetch the default branch of the repository.
+    Build the metadata of a file from its git tree entry, as the contents API reports it.
 
     Args:
     - repo (str): The GitHub repository in the format 'owner/repo'.
-    - headers (dict): Headers containing authentication token.
+    - branch (str): The branch the tree belongs to.
+    - entry (dict): The git tree entry.
 
     Returns:
-    - str: The default branch name or error message.
+    - dict: File metadata.
     """
-    branch_url = f"https://api.github.com/repos/{repo}/branches"
-    try:
-        branch_response = requests.get(branch_url, headers=headers)
-        branch_response.raise_for_status()
-
-        # Return the default branch name
-        return branch_response.json()[0]["name"]
-    except requests.exceptions.RequestException as e:
-        error_message = f"Request failed for default branch: {e}"
-        logger.error(error_message)
-        return {"error": error_message}
-    except (json.JSONDecodeError, IndexError) as e:
-        error_message = f"Failed to decode or parse default branch response: {e}"
-        logger.error(error_message)
-        return {"error": error_message}
-
-
-def fetch_file_metadata(repo: str, file_path: str, branch: str, headers: dict) -> dict:
+    if entry["type"] == "commit":
+        file_type, view = "submodule", "tree"
+    else:
+        file_type = "symlink" if entry.get("mode") == "120000" else "file"
+        view = "blob"
+
+    return {
+        "name": entry["path"].rsplit("/", 1)[-1],
+        "path": entry["path"],
+        "size": entry.get("size", 0),
+        "type": file_type,
+        "url": f"https://github.com/{repo}/{view}/{branch}/{entry['path']}",
+    }
+
+
+async def find_tree_entry(
+    repo: str, tree_sha: str, path: str, token: str
+) -> Optional[dict]:
     """
-    Fetch metadata for a single file from the GitHub repository.
+    Look up a path the truncated tree doesn't list.
 
     Args:
     - repo (str): The GitHub repository in the format 'owner/repo'.
-    - file_path (str): The path to the file in the repository.
-    - branch (str): The branch to fetch the file from.
-    - headers (dict): Headers containing authentication token.
+    - tree_sha (str): SHA of the root tree.
+    - path (str): The path to the file in the repository.
+    - token (str): GitHub access token.
 
     Returns:
-    - dict: File metadata or error message.
+    - Optional[dict]: The tree entry, None if the path doesn't exist, or an "error".
     """
-    url = f"https://api.github.com/repos/{repo}/contents/{file_path}?ref={branch}"
-    logger.info(f"Fetching details for file: {file_path} from URL: {url}")
-
     try:
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()
-
-        # Create a dictionary with only the necessary metadata
-        file_info = response.json()
-        return {
-            "name": file_info.get("name"),
-            "path": file_info.get("path"),
-            "size": file_info.get("size"),
-            "type": file_info.get("type"),
-            "url": file_info.get("html_url"),
-        }
-    except requests.exceptions.RequestException as e:
-        error_message = f"Request failed for {file_path}: {e}"
-        logger.error(error_message)
-        return {"error": error_message}
-    except json.JSONDecodeError:
-        error_message = f"Failed to decode JSON response for {file_path}"
+        return await find_entry(repo, tree_sha, path, token)
+    except (httpx.HTTPError, TreeError) as e:
+        error_message = f"Request failed for {path}: {e}"
         logger.error(error_message)
         return {"error": error_message}
@@ -1,16 +1,16 @@
-import requests
+import httpx
 import json
 from typing import Optional
 from typing_extensions import Annotated
 from pydantic import Field
 from core.utils.logger import logger  # Importing the logger
-from core.utils.state import global_state
-from app.middleware.github.GithubAuthMiddleware import check_access
+from app.middleware.github.GithubAuthMiddleware import check_access, get_credentials
+from app.utils.github import client as github
 from core.utils.tools import doc_tag  # Importing the doc_tag
 
 
 @doc_tag("Issues")  # Adding the doc_tag decorator
-def get_issue_comments_tool(
+async def get_issue_comments_tool(
     issue_number: Annotated[
         int,
         Field(description="The number of the issue to retrieve."),
@@ -67,7 +67,7 @@ def get_issue_comments_tool(
         return auth_response
 
     # Retrieve credentials and repository information
-    credentials = global_state.get("middleware.GithubAuthMiddleware.credentials")
+    credentials = get_credentials()
 
     # Prepare the URL to get the issue details
     issue_url = f"https://api.github.com/repos/{repo}/issues/{issue_number}"
@@ -77,13 +77,13 @@ def get_issue_comments_tool(
 
     try:
         # Get issue details
-        issue_response = requests.get(issue_url, headers=headers)
+        issue_response = await github.get(issue_url, headers=headers)
         issue_response.raise_for_status()  # Raise an error for bad responses (4xx or 5xx)
         issue_content = issue_response.json()  # Parse JSON response
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         # Log the error details and GitHub's response content
         logger.error(f"Request failed: {e}")
-        if e.response:
+        if hasattr(e, "response") and e.response:
             # If the exception has a response (i.e., 4xx or 5xx error), include the error message from GitHub
             logger.error(f"GitHub API Error Response: {e.response.text}")
         return {"error": f"Request failed: {str(e)}"}
@@ -100,13 +100,15 @@ def get_issue_comments_tool(
 
     try:
         # Get issue comments
-        comments_response = requests.get(comments_url, headers=headers, params=params)
+        comments_response = await github.get(
+            comments_url, headers=headers, params=params
+        )
         comments_response.raise_for_status()  # Raise an error for bad responses (4xx or 5xx)
         comments_content = comments_response.json()  # Parse JSON response
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         # Log the error details and GitHub's response content
         logger.error(f"Request failed: {e}")
-        if e.response:
+        if hasattr(e, "response") and e.response:
             # If the exception has a response (i.e., 4xx or 5xx error), include the error message from GitHub
             logger.error(f"GitHub API Error Response: {e.response.text}")
         return {"error": f"Request failed: {str(e)}"}
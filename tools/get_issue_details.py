@@ -1,15 +1,15 @@
-import requests
+import httpx
 import json
 from typing_extensions import Annotated
 from pydantic import Field
 from core.utils.logger import logger  # Importing the logger
-from core.utils.state import global_state
-from app.middleware.github.GithubAuthMiddleware import check_access
+from app.middleware.github.GithubAuthMiddleware import check_access, get_credentials
+from app.utils.github import client as github
 from core.utils.tools import doc_tag  # Importing the doc_tag
 
 
 @doc_tag("Issues")  # Adding the doc_tag decorator
-def get_issue_details_tool(
+async def get_issue_details_tool(
     issue_number: Annotated[
         int,
         Field(description="The number of the issue to retrieve."),
@@ -46,7 +46,7 @@ def get_issue_details_tool(
         return auth_response
 
     # Retrieve credentials and repository information
-    credentials = global_state.get("middleware.GithubAuthMiddleware.credentials")
+    credentials = get_credentials()
 
     # Prepare the URL to get the issue content
     url = f"https://api.github.com/repos/{repo}/issues/{issue_number}"
@@ -55,10 +55,10 @@ def get_issue_details_tool(
     logger.info(f"Fetching issue details from GitHub API with URL: {url}")
 
     try:
-        response = requests.get(url, headers=headers)
+        response = await github.get(url, headers=headers)
         response.raise_for_status()  # Raise an error for bad responses (4xx or 5xx)
         issue_content = response.json()  # Parse JSON response
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         # Log the error details and GitHub's response content
         logger.error(f"Request failed: {e}")
         if hasattr(e, "response") and e.response:
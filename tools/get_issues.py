@@ -1,16 +1,18 @@
-import requests
+import httpx
 import json
+import sqlite3
 from typing import Optional
 from typing_extensions import Annotated
 from pydantic import Field
 from core.utils.logger import logger  # Importing the logger
-from core.utils.state import global_state
-from app.middleware.github.GithubAuthMiddleware import check_access
+from app.middleware.github.GithubAuthMiddleware import check_access, get_credentials
+from app.utils.github.issue_index import format_issue, get_issue_index
+from app.utils.github.pagination import collect_pages
 from core.utils.tools import doc_tag  # Importing the doc_tag
 
 
 @doc_tag("Issues")  # Adding the doc_tag decorator
-def get_issues_tool(
+async def get_issues_tool(
     repo: Annotated[
         str,
         Field(description="The GitHub repository in the format 'owner/repo'."),
@@ -49,6 +51,12 @@ def get_issues_tool(
         Optional[int],
         Field(description="Optional page number."),
     ] = None,
+    max_items: Annotated[
+        Optional[int],
+        Field(
+            description="Optional maximum number of issues to return, following the next pages until reached."
+        ),
+    ] = None,
 ) -> str:
     """
     Fetch issues from a specified GitHub repository, allowing optional filters for state, labels, assignee, and sorting.
@@ -64,6 +72,7 @@ def get_issues_tool(
     - order (Optional[str]): Optional order of results (e.g., 'asc', 'desc').
     - per_page (Optional[int]): Optional number of issues per page.
     - page (Optional[int]): Optional page number.
+    - max_items (Optional[int]): Optional maximum number of issues to return, following the next pages until reached.
 
     Returns:
     - JSON string containing the list of issues or error.
@@ -77,7 +86,7 @@ def get_issues_tool(
       get_issues_tool(repo="owner/repo", assignee="username")
     """
     logger.info(
-        f"Request received to search issues for repo: {repo}, state: {state}, labels: {labels}, assignee: {assignee}, milestone: {milestone}, sort: {sort}, order: {order}, per_page: {per_page}, page: {page}"
+        f"Request received to search issues for repo: {repo}, state: {state}, labels: {labels}, assignee: {assignee}, milestone: {milestone}, sort: {sort}, order: {order}, per_page: {per_page}, page: {page}, max_items: {max_items}"
     )
 
     # Check authentication
@@ -85,7 +94,33 @@ def get_issues_tool(
     if auth_response:
         return auth_response
 
-    credentials = global_state.get("middleware.GithubAuthMiddleware.credentials", None)
+    credentials = get_credentials()
+
+    if max_items is not None and max_items <= 0:
+        return {"error": "Invalid value for max_items. It must be a positive integer."}
+
+    # Answer from the local issue index when the repository has one
+    index = await get_issue_index(repo, credentials["access_token"])
+    if index is not None:
+        try:
+            per_page = per_page or 30
+            issues = await index.search(
+                repo,
+                state=state,
+                labels=labels,
+                assignee=assignee,
+                milestone=milestone,
+                sort=sort,
+                order=order,
+                offset=((page or 1) - 1) * per_page,
+                limit=max_items or per_page,
+            )
+        except sqlite3.Error as e:
+            logger.warning(f"Issue index listing failed for {repo}: {e}")
+        else:
+            issue_list = [format_issue(issue) for issue in issues]
+            logger.info(f"Found {len(issue_list)} issues in the issue index.")
+            return {"issues": issue_list, "total_count": len(issue_list)}
 
     # Prepare the search query
     q = f"repo:{repo}"
@@ -110,19 +145,19 @@ def get_issues_tool(
         "page": page,
     }
 
-    headers = {"Authorization": f"token {credentials['access_token']}"}
-
     logger.info(f"Searching GitHub API with URL: {url} and params: {params}")
 
     try:
-        response = requests.get(url, headers=headers, params=params)
-        response.raise_for_status()  # Raise an error for bad responses (4xx or 5xx)
-    except requests.exceptions.RequestException as e:
+        issues = await collect_pages(
+            url,
+            credentials["access_token"],
+            params=params,
+            items_key="items",
+            max_items=max_items,
+        )
+    except httpx.HTTPError as e:
         logger.error(f"Request failed: {e}")
         return {"error": f"Request failed: {str(e)}"}
-
-    try:
-        issues = response.json()
     except json.JSONDecodeError:
         logger.error("Failed to decode JSON response")
         return {"error": "Failed to decode JSON response"}
@@ -137,7 +172,7 @@ def get_issues_tool(
             "updated_at": issue["updated_at"],
             "comments": issue["comments"],
         }
-        for issue in issues.get("items", [])
+        for issue in issues
     ]
 
     logger.info(f"Found {len(issue_list)} issues in the repository.")
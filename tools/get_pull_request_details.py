@@ -1,17 +1,18 @@
-import requests
+import httpx
 import json
 from typing_extensions import Annotated
 from pydantic import Field
 from core.utils.logger import logger  # Importing the logger for logging information
-from core.utils.state import global_state  # Importing global state management
 from app.middleware.github.GithubAuthMiddleware import (
     check_access,
+    get_credentials,
 )  # Importing authentication check
+from app.utils.github import client as github
 from core.utils.tools import doc_tag  # Importing the doc_tag
 
 
 @doc_tag("Pull Requests")  # Adding the doc_tag decorator
-def get_pull_request_details_tool(
+async def get_pull_request_details_tool(
     pull_number: Annotated[
         int,
         Field(description="The number of the pull request to retrieve details for."),
@@ -47,8 +48,8 @@ def get_pull_request_details_tool(
     if auth_response:
         return auth_response  # Return the authentication error if it exists
 
-    # Retrieve credentials and repository information from global state
-    credentials = global_state.get("middleware.GithubAuthMiddleware.credentials", None)
+    # Retrieve credentials from the request context
+    credentials = get_credentials()
 
     # Prepare the URL for fetching pull request details
     url = f"https://api.github.com/repos/{repo}/pulls/{pull_number}"
@@ -58,8 +59,8 @@ def get_pull_request_details_tool(
     logger.info(f"Fetching pull request details from GitHub API with URL: {url}")
 
     try:
-        response = requests.get(url, headers=headers)
-        if not response.ok:
+        response = await github.get(url, headers=headers)
+        if not response.is_success:
             logger.error(f"GitHub API error: {response.status_code} - {response.text}")
             try:
                 return (
@@ -67,7 +68,7 @@ def get_pull_request_details_tool(
                 )  # This will return GitHub's "message" if available
             except json.JSONDecodeError:
                 return {"error": f"GitHub API returned status {response.status_code}"}
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         logger.error(f"Request failed: {e}")
         return {"error": f"Request failed: {str(e)}"}
 
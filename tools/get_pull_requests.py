@@ -1,18 +1,19 @@
-import requests
+import httpx
 import json
 from typing import Optional
 from typing_extensions import Annotated
 from pydantic import Field
 from core.utils.logger import logger  # Importing the logger for logging information
-from core.utils.state import global_state  # Importing global state management
 from app.middleware.github.GithubAuthMiddleware import (
     check_access,
+    get_credentials,
 )  # Importing authentication check
+from app.utils.github.pagination import collect_pages
 from core.utils.tools import doc_tag  # Importing the doc_tag
 
 
 @doc_tag("Pull Requests")  # Adding the doc_tag decorator
-def get_pull_requests_tool(
+async def get_pull_requests_tool(
     repo: Annotated[
         str,
         Field(description="The GitHub repository in the format 'owner/repo'."),
@@ -41,6 +42,12 @@ def get_pull_requests_tool(
         Optional[int],
         Field(description="Optional page number."),
     ] = None,
+    max_items: Annotated[
+        Optional[int],
+        Field(
+            description="Optional maximum number of pull requests to return, following the next pages until reached."
+        ),
+    ] = None,
 ) -> str:
     """
     Fetch pull requests from a specified GitHub repository.
@@ -53,6 +60,7 @@ def get_pull_requests_tool(
     - order (Optional[str]): Optional order of results (e.g., 'asc', 'desc').
     - per_page (Optional[int]): Optional number of pull requests per page.
     - page (Optional[int]): Optional page number.
+    - max_items (Optional[int]): Optional maximum number of pull requests to return, following the next pages until reached.
 
     Returns:
     - JSON string containing the list of pull requests or an error message.
@@ -67,7 +75,7 @@ def get_pull_requests_tool(
     """
     # Log the request details for debugging purposes
     logger.info(
-        f"Request received to get pull requests for repo: {repo}, state: {state}, sort: {sort}, order: {order}, per_page: {per_page}, page: {page}"
+        f"Request received to get pull requests for repo: {repo}, state: {state}, sort: {sort}, order: {order}, per_page: {per_page}, page: {page}, max_items: {max_items}"
     )
 
     # Check authentication before proceeding
@@ -75,8 +83,11 @@ def get_pull_requests_tool(
     if auth_response:
         return auth_response  # Return the authentication error if it exists
 
-    # Retrieve credentials and repository information from global state
-    credentials = global_state.get("middleware.GithubAuthMiddleware.credentials", None)
+    # Retrieve credentials from the request context
+    credentials = get_credentials()
+
+    if max_items is not None and max_items <= 0:
+        return {"error": "Invalid value for max_items. It must be a positive integer."}
 
     # Prepare the URL for fetching pull requests
     url = f"https://api.github.com/repos/{repo}/pulls"
@@ -94,25 +105,19 @@ def get_pull_requests_tool(
     if page is not None:
         params["page"] = page
 
-    # Set up the request headers with authorization
-    headers = {"Authorization": f"token {credentials['access_token']}"}
-
     # Log the API request details for debugging
     logger.info(
         f"Fetching pull requests from GitHub API with URL: {url} and params: {params}"
     )
 
     try:
-        # Make the API request to fetch pull requests
-        response = requests.get(url, headers=headers, params=params)
-        response.raise_for_status()  # Raise an error for bad responses (4xx or 5xx)
-    except requests.exceptions.RequestException as e:
+        # Make the API requests to fetch pull requests, following pages up to max_items
+        pull_requests = await collect_pages(
+            url, credentials["access_token"], params=params, max_items=max_items
+        )
+    except httpx.HTTPError as e:
         logger.error(f"Request failed: {e}")  # Log the error
         return {"error": f"Request failed: {str(e)}"}
-
-    try:
-        # Parse the JSON response
-        pull_requests = response.json()
     except json.JSONDecodeError:
         logger.error("Failed to decode JSON response")  # Log JSON decoding error
         return {"error": "Failed to decode JSON response"}
@@ -1,16 +1,16 @@
-import requests
+import httpx
 import json
 from typing import Optional
 from typing_extensions import Annotated
 from pydantic import Field
 from core.utils.logger import logger  # Importing the logger
-from core.utils.state import global_state
-from app.middleware.github.GithubAuthMiddleware import check_access
+from app.middleware.github.GithubAuthMiddleware import check_access, get_credentials
+from app.utils.github.pagination import collect_pages
 from core.utils.tools import doc_tag  # Importing the doc_tag
 
 
 @doc_tag("Repositories")  # Adding the doc_tag decorator
-def get_releases_tool(
+async def get_releases_tool(
     repo: Annotated[
         str,
         Field(description="The GitHub repository in the format 'owner/repo'."),
@@ -31,6 +31,12 @@ def get_releases_tool(
         Optional[str],
         Field(description="Optional order of results (e.g., 'asc', 'desc')."),
     ] = None,
+    max_items: Annotated[
+        Optional[int],
+        Field(
+            description="Optional maximum number of releases to return, following the next pages until reached."
+        ),
+    ] = None,
 ) -> str:
     """
     Retrieve releases within a GitHub repository.
@@ -42,6 +48,7 @@ def get_releases_tool(
     - page (Optional[int]): Optional page number.
     - sort (Optional[str]): Optional sorting criteria (e.g., 'created', 'updated').
     - order (Optional[str]): Optional order of results (e.g., 'asc', 'desc').
+    - max_items (Optional[int]): Optional maximum number of releases to return, following the next pages until reached.
 
     Returns:
     - JSON string containing the list of releases or error.
@@ -55,7 +62,7 @@ def get_releases_tool(
       get_releases_tool(repo="owner/repo", sort="created")
     """
     logger.info(
-        f"Request received to retrieve releases for repo: {repo}, per_page: {per_page}, page: {page}, sort: {sort}, order: {order}"
+        f"Request received to retrieve releases for repo: {repo}, per_page: {per_page}, page: {page}, sort: {sort}, order: {order}, max_items: {max_items}"
     )
 
     # Check authentication
@@ -63,7 +70,10 @@ def get_releases_tool(
     if auth_response:
         return auth_response
 
-    credentials = global_state.get("middleware.GithubAuthMiddleware.credentials", None)
+    credentials = get_credentials()
+
+    if max_items is not None and max_items <= 0:
+        return {"error": "Invalid value for max_items. It must be a positive integer."}
 
     # Prepare the URL
     url = f"https://api.github.com/repos/{repo}/releases"
@@ -77,21 +87,17 @@ def get_releases_tool(
     if order:
         params["order"] = order
 
-    headers = {"Authorization": f"token {credentials['access_token']}"}
-
     logger.info(
         f"Retrieving releases from GitHub API with URL: {url} and params: {params}"
     )
 
     try:
-        response = requests.get(url, headers=headers, params=params)
-        response.raise_for_status()  # Raise an error for bad responses (4xx or 5xx)
-    except requests.exceptions.RequestException as e:
+        releases = await collect_pages(
+            url, credentials["access_token"], params=params, max_items=max_items
+        )
+    except httpx.HTTPError as e:
         logger.error(f"Request failed: {e}")
         return {"error": f"Request failed: {str(e)}"}
-
-    try:
-        releases = response.json()
     except json.JSONDecodeError:
         logger.error("Failed to decode JSON response")
         return {"error": "Failed to decode JSON response"}
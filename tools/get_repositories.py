@@ -1,16 +1,16 @@
-import requests
+import httpx
 import json
 from typing import List, Optional
 from typing_extensions import Annotated
 from pydantic import Field
 from core.utils.logger import logger  # Importing the logger
-from core.utils.state import global_state
-from app.middleware.github.GithubAuthMiddleware import check_access
+from app.middleware.github.GithubAuthMiddleware import check_access, get_credentials
+from app.utils.github.pagination import collect_pages
 from core.utils.tools import doc_tag  # Importing the doc_tag
 
 
 @doc_tag("Repositories")  # Adding the doc_tag decorator
-def get_repositories_tool(
+async def get_repositories_tool(
     username: Annotated[
         str,
         Field(description="The GitHub username to fetch repositories for."),
@@ -39,6 +39,12 @@ def get_repositories_tool(
             description="Number of repositories per page (default is 30, max is 100)."
         ),
     ] = 30,
+    max_items: Annotated[
+        Optional[int],
+        Field(
+            description="Optional maximum number of repositories to return, following the next pages until reached."
+        ),
+    ] = None,
 ) -> str:
     """
     Fetch all repositories for a specific GitHub user, handling pagination.
@@ -50,6 +56,7 @@ def get_repositories_tool(
     - direction (Optional[str]): Sorting direction (default is 'asc').
     - page (Optional[int]): Page number to fetch (default is 1).
     - per_page (Optional[int]): Number of repositories per page (default is 30, max is 100).
+    - max_items (Optional[int]): Optional maximum number of repositories to return, following the next pages until reached.
 
     Returns:
     - JSON string containing the list of repositories or error.
@@ -65,7 +72,7 @@ def get_repositories_tool(
       get_repositories_tool(username="exampleUser", page=2, per_page=50)
     """
     logger.info(
-        f"Fetching repositories for user: {username}, type: {type}, sort: {sort}, direction: {direction}, page: {page}, per_page: {per_page}"
+        f"Fetching repositories for user: {username}, type: {type}, sort: {sort}, direction: {direction}, page: {page}, per_page: {per_page}, max_items: {max_items}"
     )
 
     # Check authentication
@@ -73,39 +80,37 @@ def get_repositories_tool(
     if auth_response:
         return auth_response
 
-    credentials = global_state.get("middleware.GithubAuthMiddleware.credentials", None)
+    credentials = get_credentials()
 
-    headers = (
-        {"Authorization": f"token {credentials['access_token']}"} if credentials else {}
-    )
+    if max_items is not None and max_items <= 0:
+        return {"error": "Invalid value for max_items. It must be a positive integer."}
 
     # Prepare the API request URL
     url = f"https://api.github.com/users/{username}/repos?type={type}&sort={sort}&direction={direction}&page={page}&per_page={per_page}"
 
     try:
         logger.info(f"Sending request to URL: {url}")
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()  # Raise an error for bad responses (4xx or 5xx)
-
-        repositories = response.json()
-
-        # If GitHub response contains an error message, return it directly
-        if "message" in repositories:
-            error_message = repositories["message"]
-            logger.error(f"GitHub API error: {error_message}")
-            return {"error": error_message}
+        repositories = await collect_pages(
+            url,
+            credentials["access_token"] if credentials else None,
+            max_items=max_items,
+        )
 
         logger.info(f"Fetched {len(repositories)} repositories for user: {username}.")
         return {"repositories": repositories, "total_count": len(repositories)}
 
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPStatusError as e:
         # Directly return the GitHub error response if present
-        error_message = response.json().get(
+        error_message = e.response.json().get(
             "message", str(e)
         )  # Get GitHub error message
         logger.error(f"GitHub error: {error_message}")
         return {"error": error_message}
 
+    except httpx.HTTPError as e:
+        logger.error(f"GitHub error: {e}")
+        return {"error": str(e)}
+
     except json.JSONDecodeError:
         logger.error(f"Failed to decode JSON response for user {username}")
         return {"error": f"Failed to decode JSON response for user {username}"}
@@ -1,26 +1,84 @@
-import requests
+import asyncio
+import httpx
 import json
+from typing import List, Optional, Union
 from typing_extensions import Annotated
 from pydantic import Field
 from core.utils.logger import logger  # Importing the logger
-from core.utils.state import global_state
-from app.middleware.github.GithubAuthMiddleware import check_access
+from app.middleware.github.GithubAuthMiddleware import check_access, get_credentials
+from app.utils.github import client as github
+from app.utils.github.pagination import collect_pages
 from core.utils.tools import doc_tag  # Importing the doc_tag
 
+# Response sections and the endpoints they are read from
+SECTIONS = {
+    "repository_details": "",
+    "tags": "/tags",
+    "branches": "/branches",
+    "releases": "/releases",
+}
+
+
+async def fetch_section(
+    repo: str, section: str, token: str, max_items: Optional[int]
+) -> Union[dict, list]:
+    """Fetch one section of the repository details."""
+    url = f"https://api.github.com/repos/{repo}{SECTIONS[section]}"
+    logger.info(f"Sending request to URL: {url}")
+
+    if section == "repository_details":
+        response = await github.get(url, headers={"Authorization": f"token {token}"})
+        response.raise_for_status()  # Raise an error for bad responses (4xx or 5xx)
+        return response.json()
+
+    params = {"per_page": min(max_items, 100)} if max_items else None
+    return await collect_pages(url, token, params=params, max_items=max_items)
+
+
+def section_error(e: Exception) -> str:
+    """Return the GitHub error message of a failed section."""
+    if isinstance(e, httpx.HTTPStatusError):
+        try:
+            return e.response.json().get(
+                "message", f"Unexpected error: {e.response.status_code}"
+            )
+        except json.JSONDecodeError:
+            return f"Unexpected error: {e.response.status_code}"
+    if isinstance(e, json.JSONDecodeError):
+        return "Failed to decode JSON response"
+    return str(e)
+
 
 @doc_tag("Repositories")  # Adding the doc_tag decorator
-def get_repository_details_tool(
+async def get_repository_details_tool(
     repo: Annotated[
         str,
         Field(description="The GitHub repository in the format 'owner/repo'."),
     ],
+    include: Annotated[
+        Optional[List[str]],
+        Field(
+            description="Optional sections to fetch: repository_details, tags, branches, releases (default is all)."
+        ),
+    ] = None,
+    max_items_per_section: Annotated[
+        Optional[int],
+        Field(
+            description="Optional maximum number of tags, branches and releases to return for each section."
+        ),
+    ] = None,
 ) -> str:
     """
     Fetch details for a single repository from GitHub, including tags, branches, and releases.
     The repo parameter is required and must be included in the request headers.
 
+    The sections are fetched concurrently. If some of them fail, the others
+    are still returned and the failures are listed under "errors".
+
     Args:
     - repo (str): The GitHub repository in the format 'owner/repo'.
+    - include (Optional[List[str]]): Sections to fetch: repository_details, tags, branches, releases (default is all).
+    - max_items_per_section (Optional[int]): Maximum number of tags, branches and releases to return for each section.
 
     Returns:
     - JSON string containing the details of the repository, tags, branches, and releases or error.
@@ -30,86 +88,61 @@ def get_repository_details_tool(
       get_repository_details_tool(repo="owner/repo")
     - Fetching details for repository "anotherUser/repoName":
       get_repository_details_tool(repo="anotherUser/repoName")
+    - Fetching only the first 10 branches of repository "owner/repo":
+      get_repository_details_tool(repo="owner/repo", include=["branches"], max_items_per_section=10)
     """
-    logger.info(f"Fetching details for repository: {repo}")
+    logger.info(
+        f"Fetching details for repository: {repo}, include: {include}, max_items_per_section: {max_items_per_section}"
+    )
 
     # Check authentication
     auth_response = check_access(True)
     if auth_response:
         return auth_response
 
-    credentials = global_state.get("middleware.GithubAuthMiddleware.credentials", None)
+    credentials = get_credentials()
 
-    headers = {"Authorization": f"token {credentials['access_token']}"}
-    url = f"https://api.github.com/repos/{repo}"
-    logger.info(f"Sending request to URL: {url}")
-
-    try:
-        # Fetch repository details
-        response = requests.get(url, headers=headers)
-
-        # If the response contains an error message, return that directly
-        if response.status_code != 200:
-            error_message = response.json().get(
-                "message", f"Unexpected error: {response.status_code}"
-            )
-            logger.error(f"GitHub error: {error_message}")
-            return {"error": error_message}
-
-        repository_details = response.json()
-
-        # Fetch tags
-        tags_response = requests.get(
-            f"https://api.github.com/repos/{repo}/tags", headers=headers
-        )
-        if tags_response.status_code != 200:
-            error_message = tags_response.json().get(
-                "message", f"Unexpected error: {tags_response.status_code}"
-            )
-            logger.error(f"GitHub error: {error_message}")
-            return {"error": error_message}
-        tags = tags_response.json()
-
-        # Fetch branches
-        branches_response = requests.get(
-            f"https://api.github.com/repos/{repo}/branches", headers=headers
-        )
-        if branches_response.status_code != 200:
-            error_message = branches_response.json().get(
-                "message", f"Unexpected error: {branches_response.status_code}"
-            )
-            logger.error(f"GitHub error: {error_message}")
-            return {"error": error_message}
-        branches = branches_response.json()
-
-        # Fetch releases
-        releases_response = requests.get(
-            f"https://api.github.com/repos/{repo}/releases", headers=headers
-        )
-        if releases_response.status_code != 200:
-            error_message = releases_response.json().get(
-                "message", f"Unexpected error: {releases_response.status_code}"
-            )
-            logger.error(f"GitHub error: {error_message}")
-            return {"error": error_message}
-        releases = releases_response.json()
+    if max_items_per_section is not None and max_items_per_section <= 0:
+        return {
+            "error": "Invalid value for max_items_per_section. It must be a positive integer."
+        }
 
-        logger.info(f"Fetched details for repository: {repo}")
+    sections = list(dict.fromkeys(include)) if include else list(SECTIONS)
+    invalid_sections = [section for section in sections if section not in SECTIONS]
+    if invalid_sections:
         return {
-            "repository_details": repository_details,
-            "tags": tags,
-            "branches": branches,
-            "releases": releases,
+            "error": f"Invalid sections {invalid_sections}. Use: {', '.join(SECTIONS)}."
         }
 
-    except requests.exceptions.RequestException as e:
-        # Directly return the GitHub error response if present
-        error_message = response.json().get(
-            "message", str(e)
-        )  # Get GitHub error message
-        logger.error(f"GitHub error: {error_message}")
-        return {"error": error_message}
-
-    except json.JSONDecodeError:
-        logger.error(f"Failed to decode JSON response for repository {repo}")
-        return {"error": f"Failed to decode JSON response for repository {repo}"}
+    # Fetch all the sections concurrently
+    results = await asyncio.gather(
+        *(
+            fetch_section(
+                repo, section, credentials["access_token"], max_items_per_section
+            )
+            for section in sections
+        ),
+        return_exceptions=True,
+    )
+
+    repository = {}
+    errors = {}
+    for section, result in zip(sections, results):
+        if isinstance(result, (httpx.HTTPError, json.JSONDecodeError)):
+            error_message = section_error(result)
+            logger.error(f"GitHub error for {section} of {repo}: {error_message}")
+            errors[section] = error_message
+        elif isinstance(result, BaseException):
+            raise result
+        else:
+            repository[section] = result
+
+    # Nothing could be fetched, report the error directly
+    if not repository:
+        return {"error": next(iter(errors.values()))}
+
+    if errors:
+        repository["errors"] = errors
+
+    logger.info(f"Fetched details for repository: {repo}")
+    return repository
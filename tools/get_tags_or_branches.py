@@ -1,16 +1,16 @@
-import requests
+import httpx
 import json
 from typing import Optional
 from typing_extensions import Annotated
 from pydantic import Field
 from core.utils.logger import logger  # Importing the logger
-from core.utils.state import global_state
-from app.middleware.github.GithubAuthMiddleware import check_access
+from app.middleware.github.GithubAuthMiddleware import check_access, get_credentials
+from app.utils.github.pagination import collect_pages
 from core.utils.tools import doc_tag  # Importing the doc_tag
 
 
 @doc_tag("Repositories")  # Adding the doc_tag decorator
-def get_tags_or_branches_tool(
+async def get_tags_or_branches_tool(
     type: Annotated[
         str,
         Field(
@@ -29,6 +29,12 @@ def get_tags_or_branches_tool(
         Optional[int],
         Field(description="Optional page number."),
     ] = None,
+    max_items: Annotated[
+        Optional[int],
+        Field(
+            description="Optional maximum number of items to return, following the next pages until reached."
+        ),
+    ] = None,
 ) -> str:
     """
     List either tags or branches in a GitHub repository.
@@ -39,6 +45,7 @@ def get_tags_or_branches_tool(
     - repo (str): The GitHub repository in the format 'owner/repo'.
     - per_page (Optional[int]): Optional number of items per page.
     - page (Optional[int]): Optional page number.
+    - max_items (Optional[int]): Optional maximum number of items to return, following the next pages until reached.
 
     Returns:
     - JSON string containing the list of tags or branches or error.
@@ -56,7 +63,10 @@ def get_tags_or_branches_tool(
     if auth_response:
         return auth_response
 
-    credentials = global_state.get("middleware.GithubAuthMiddleware.credentials", None)
+    credentials = get_credentials()
+
+    if max_items is not None and max_items <= 0:
+        return {"error": "Invalid value for max_items. It must be a positive integer."}
 
     # Prepare the URL based on the type
     if type == "tags":
@@ -66,8 +76,6 @@ def get_tags_or_branches_tool(
     else:
         return {"error": "Invalid type specified. Use 'tags' or 'branches'."}
 
-    headers = {"Authorization": f"token {credentials['access_token']}"}
-
     # Prepare query parameters for pagination
     params = {}
     if per_page is not None:
@@ -78,20 +86,19 @@ def get_tags_or_branches_tool(
     logger.info(f"Fetching {type} from GitHub API with URL: {url} and params: {params}")
 
     try:
-        response = requests.get(url, headers=headers, params=params)
-
-        # Check for GitHub errors directly by inspecting the response status
-        if response.status_code != 200:
-            error_message = response.json().get(
-                "message", f"Unexpected error: {response.status_code}"
-            )
-            logger.error(f"GitHub error: {error_message}")
-            return {"error": error_message}
-
-        # Proceed with parsing the response if no error
-        items = response.json()
-
-    except requests.exceptions.RequestException as e:
+        items = await collect_pages(
+            url, credentials["access_token"], params=params, max_items=max_items
+        )
+
+    except httpx.HTTPStatusError as e:
+        # Return the GitHub error message when the response carries one
+        error_message = e.response.json().get(
+            "message", f"Unexpected error: {e.response.status_code}"
+        )
+        logger.error(f"GitHub error: {error_message}")
+        return {"error": error_message}
+
+    except httpx.HTTPError as e:
         logger.error(f"Request failed: {e}")
         return {"error": f"Request failed: {str(e)}"}
 
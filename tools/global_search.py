@@ -1,14 +1,14 @@
-import requests
+import httpx
 import json
 from typing import Optional
 from typing_extensions import Annotated
 from pydantic import Field
 from core.utils.logger import logger  # Importing the logger
-from core.utils.state import global_state
-from app.middleware.github.GithubAuthMiddleware import check_access
+from app.middleware.github.GithubAuthMiddleware import check_access, get_credentials
+from app.utils.github import client as github
 
 
-def global_search_tool(
+async def global_search_tool(
     search_type: Annotated[
         str,
         Field(
@@ -59,7 +59,7 @@ def global_search_tool(
     if auth_response:
         return auth_response
 
-    credentials = global_state.get("middleware.GithubAuthMiddleware.credentials", None)
+    credentials = get_credentials()
     headers = {"Authorization": f"token {credentials['access_token']}"}
 
     # Construct the search URL based on the search type
@@ -81,7 +81,7 @@ def global_search_tool(
         }
 
     try:
-        response = requests.get(url, headers=headers)
+        response = await github.get(url, headers=headers)
 
         # Check for GitHub-specific errors
         if response.status_code != 200:
@@ -103,7 +103,7 @@ def global_search_tool(
             "per_page": per_page,
         }
 
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         logger.error(f"Search request failed for query {query}: {e}")
         return {"error": f"Search request failed for query {query}: {str(e)}"}
 
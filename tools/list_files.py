@@ -1,16 +1,16 @@
-import requests
-import json
+import httpx
 from typing import List, Optional
 from typing_extensions import Annotated
 from pydantic import Field
 from core.utils.logger import logger  # Importing the logger
-from core.utils.state import global_state
-from app.middleware.github.GithubAuthMiddleware import check_access
+from app.middleware.github.GithubAuthMiddleware import check_access, get_credentials
+from app.utils.github.branches import resolve_branch_or_error
+from app.utils.github.trees import TreeError, walk_tree
 from core.utils.tools import doc_tag  # Importing the doc_tag
 
 
 @doc_tag("Files")  # Adding the doc_tag decorator
-def list_files_tool(
+async def list_files_tool(
     repo: Annotated[
         str,
         Field(description="The GitHub repository in the format 'owner/repo'."),
@@ -25,6 +25,24 @@ def list_files_tool(
             description="Optional branch name to fetch files from. Defaults to the repository's default branch."
         ),
     ] = None,
+    pattern: Annotated[
+        Optional[str],
+        Field(
+            description="Optional glob to filter paths by, relative to each folder (e.g. '**/*.py'). '**' matches any number of folders."
+        ),
+    ] = None,
+    depth: Annotated[
+        Optional[int],
+        Field(
+            description="Optional number of levels to list below each folder. Defaults to 1 (direct children), or unlimited when a pattern is given."
+        ),
+    ] = None,
+    include_details: Annotated[
+        Optional[bool],
+        Field(
+            description="Optional, return the type ('blob' or 'tree') and size of each path instead of the path only."
+        ),
+    ] = False,
 ) -> str:
     """
     Get a list of file paths from a GitHub repository using the git tree API.
@@ -34,6 +52,9 @@ def list_files_tool(
     - repo (str): The GitHub repository in the format 'owner/repo'.
     - folders (Optional[List[str]]): Optional list of folder paths to filter by.
     - branch (Optional[str]): Optional branch name to fetch files from. Defaults to the repository's default branch.
+    - pattern (Optional[str]): Optional glob to filter paths by, relative to each folder (e.g. '**/*.py').
+    - depth (Optional[int]): Optional number of levels to list below each folder. Defaults to 1, or unlimited when a pattern is given.
+    - include_details (Optional[bool]): Optional, return the type and size of each path instead of the path only.
 
     Returns:
     - JSON string containing the list of file paths in the repository or error.
@@ -47,9 +68,11 @@ def list_files_tool(
       list_files_tool(repo="owner/repo", branch="develop")
     - Fetching files from multiple folders in repository "exampleUser/repo":
       list_files_tool(repo="exampleUser/repo", folders=["docs", "lib"])
+    - Fetching all Python files under "src" with their sizes in repository "owner/repo":
+      list_files_tool(repo="owner/repo", folders=["src"], pattern="**/*.py", include_details=True)
     """
     logger.info(
-        f"Retrieving files from repository: {repo}, folders: {folders}, branch: {branch}"
+        f"Retrieving files from repository: {repo}, folders: {folders}, branch: {branch}, pattern: {pattern}, depth: {depth}, include_details: {include_details}"
     )
 
     # Check authentication
@@ -57,61 +80,49 @@ def list_files_tool(
     if auth_response:
         return auth_response
 
-    credentials = global_state.get("middleware.GithubAuthMiddleware.credentials", None)
-
-    headers = {
-        "Authorization": f"token {credentials['access_token']}"
-    }  # Include the access token in the headers
+    credentials = get_credentials()
 
-    all_files = []
+    if depth is not None and depth <= 0:
+        return {"error": "Invalid value for depth. It must be a positive integer."}
 
-    # Step 1: Fetch the default branch's name if branch is not provided
-    if not branch:
-        branch_url = f"https://api.github.com/repos/{repo}/branches"
-        branch_response = requests.get(branch_url, headers=headers)
-
-        if branch_response.status_code != 200:
-            return {"error": f"GitHub API error: {branch_response.text}"}
-
-        branch = branch_response.json()[0]["name"]  # Get the default branch name
-
-    # Step 2: Fetch the tree from the specified branch
-    tree_url = f"https://api.github.com/repos/{repo}/git/trees/{branch}?recursive=1"
-    tree_response = requests.get(tree_url, headers=headers)
-    if tree_response.status_code != 200:
-        return {"error": f"GitHub API error: {tree_response.text}"}
-
-    # tree_data = tree_response.json()
-
-    # Step 3: Filter files
-    # for file in tree_data.get("tree", []):
-    #    if file["type"] == "blob":  # This is a file
-    #        file_path = file["path"]
-    #        if folders is None or any(
-    #            file_path.startswith(folder) for folder in folders
-    #        ):
-    #            all_files.append(file_path)
-
-    tree_data = tree_response.json()
-
-    # Step 3: Shallow filter: include only top-level entries in the folders (or repo root if no folders)
-    shallow_files = set()
-    shallow_folders = folders or [""]
-
-    for item in tree_data.get("tree", []):
-        item_path = item["path"]
-        for folder in shallow_folders:
-            if folder:
-                prefix = folder.rstrip("/") + "/"
-                if item_path.startswith(prefix):
-                    relative_path = item_path[len(prefix) :]
-                    if "/" not in relative_path:  # it's a shallow child
-                        shallow_files.add(item_path)
-            else:
-                if "/" not in item_path:
-                    shallow_files.add(item_path)
-
-    all_files = sorted(shallow_files)
+    # Step 1: Use the cached default branch's name if branch is not provided
+    branch, error_response = await resolve_branch_or_error(
+        repo, branch, credentials["access_token"]
+    )
+    if error_response:
+        return error_response
+
+    # Step 2: Walk the tree below each folder (or the repo root if no folders),
+    # served from the cached tree and descending sub-trees if it is truncated
+    max_depth = depth if depth is not None else (None if pattern else 1)
+    entries = {}
+    try:
+        for folder in folders or [""]:
+            async for entry in walk_tree(
+                repo,
+                branch,
+                credentials["access_token"],
+                path=folder,
+                max_depth=max_depth,
+                pattern=pattern,
+            ):
+                entries[entry["path"]] = entry
+    except TreeError as e:
+        return {"error": str(e)}
+    except httpx.HTTPError as e:
+        return {"error": f"GitHub API error: {e}"}
+
+    if include_details:
+        all_files = [
+            {
+                "path": path,
+                "type": entries[path]["type"],
+                "size": entries[path].get("size"),
+            }
+            for path in sorted(entries)
+        ]
+    else:
+        all_files = sorted(entries)
 
     logger.info(f"Found {len(all_files)} files in the repository.")
     return {"data": {"files": all_files}}
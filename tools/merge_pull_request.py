@@ -1,18 +1,19 @@
-import requests
+import httpx
 import json
 from typing import Optional
 from typing_extensions import Annotated
 from pydantic import Field
 from core.utils.logger import logger  # Importing the logger for logging information
-from core.utils.state import global_state  # Importing global state management
 from app.middleware.github.GithubAuthMiddleware import (
     check_access,
+    get_credentials,
 )  # Importing authentication check
+from app.utils.github import client as github
 from core.utils.tools import doc_tag  # Importing the doc_tag
 
 
 @doc_tag("Pull Requests")  # Adding the doc_tag decorator
-def merge_pull_request_tool(
+async def merge_pull_request_tool(
     repo: Annotated[
         str,
         Field(description="The GitHub repository in the format 'owner/repo'."),
@@ -52,8 +53,8 @@ def merge_pull_request_tool(
     if auth_response:
         return auth_response  # Return the authentication error if it exists
 
-    # Retrieve credentials and repository information from global state
-    credentials = global_state.get("middleware.GithubAuthMiddleware.credentials", None)
+    # Retrieve credentials from the request context
+    credentials = get_credentials()
 
     # Prepare the URL for merging the pull request
     url = f"https://api.github.com/repos/{repo}/pulls/{pull_number}/merge"
@@ -69,18 +70,18 @@ def merge_pull_request_tool(
 
     try:
         # Make the API request to merge the pull request
-        response = requests.put(url, headers=headers, json=payload)
+        response = await github.put(url, headers=headers, json=payload)
         merge_response = response.json()  # Parse the JSON response early
 
         # Raise for HTTP errors after parsing to capture body info in logs
         response.raise_for_status()
 
-    except requests.exceptions.HTTPError as http_err:
+    except httpx.HTTPStatusError as http_err:
         error_message = merge_response.get("message", str(http_err))
         logger.error(f"HTTP error during PR merge: {error_message}")
         return {"error": error_message}
 
-    except requests.exceptions.RequestException as req_err:
+    except httpx.HTTPError as req_err:
         logger.error(f"Request failed: {req_err}")
         return {"error": f"Request failed: {str(req_err)}"}
 
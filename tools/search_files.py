@@ -1,16 +1,25 @@
-import requests
+import httpx
 import json
+import re
 from typing import List, Optional
 from typing_extensions import Annotated
 from pydantic import Field
 from core.utils.logger import logger  # Importing the logger
-from core.utils.state import global_state
-from app.middleware.github.GithubAuthMiddleware import check_access
+from app.middleware.github.GithubAuthMiddleware import check_access, get_credentials
+from app.utils.github import client as github
+from app.utils.github.code_index import (
+    CodeIndex,
+    SearchTimeout,
+    compile_query,
+    get_code_index,
+)
+from app.utils.github.mirror import MirrorError
+from app.utils.github.snapshots import SnapshotError
 from core.utils.tools import doc_tag  # Importing the doc_tag
 
 
 @doc_tag("Files")  # Adding the doc_tag decorator
-def search_files_tool(
+async def search_files_tool(
     search_string: Annotated[
         str,
         Field(description="The string to search files for in the GitHub repository."),
@@ -36,10 +45,33 @@ def search_files_tool(
     per_page: Annotated[
         Optional[int], Field(description="The number of results per page.")
     ] = 30,  # Default value for results per page
+    branch: Annotated[
+        Optional[str],
+        Field(
+            description="Optional branch, tag or commit SHA to search, needs the local code index."
+        ),
+    ] = None,
+    regex: Annotated[
+        Optional[bool],
+        Field(
+            description="Optional, treat search_string as a regular expression, needs the local code index."
+        ),
+    ] = False,
+    case_sensitive: Annotated[
+        Optional[bool],
+        Field(
+            description="Optional, match the case of search_string, needs the local code index."
+        ),
+    ] = False,
 ) -> str:
     """
     Search for a specific string in the files of a GitHub repository in the main branch.
 
+    Repositories with a local code index are searched locally, on any branch,
+    with regular expressions and the matching lines of each file. Without it
+    GitHub code search is used, which only matches case-insensitively, so
+    regex, branch and case_sensitive searches are answered with an error.
+
     Args:
     - search_string (str): The string to search for in the GitHub repository.
     - repo (str): The GitHub repository in the format 'owner/repo'.
@@ -48,6 +80,9 @@ def search_files_tool(
     - order (Optional[str]): The order to sort results. Can be 'asc' or 'desc'.
     - page (Optional[int]): The page number of the results to fetch.
     - per_page (Optional[int]): The number of results per page.
+    - branch (Optional[str]): Optional branch, tag or commit SHA to search, needs the local code index.
+    - regex (Optional[bool]): Treat search_string as a regular expression, needs the local code index (default is False).
+    - case_sensitive (Optional[bool]): Match the case of search_string, needs the local code index (default is False).
 
     Returns:
     - JSON string indicating the matching files or error.
@@ -61,9 +96,11 @@ def search_files_tool(
       search_files_tool(search_string="bug", repo="exampleUser/repo", sort="stars", order="desc")
     - Searching for the term "feature" in repository "owner/repo" with pagination:
       search_files_tool(search_string="feature", repo="owner/repo", page=2, per_page=50)
+    - Searching for function definitions on the "develop" branch of repository "owner/repo":
+      search_files_tool(search_string="def \\w+_tool\\(", repo="owner/repo", branch="develop", regex=True)
     """
     logger.info(
-        f"Search request received for string: `{search_string}` in repo: {repo}, folders: {folders}, page: {page}, per_page: {per_page}, sort: {sort}, order: {order}"
+        f"Search request received for string: `{search_string}` in repo: {repo}, folders: {folders}, page: {page}, per_page: {per_page}, sort: {sort}, order: {order}, branch: {branch}, regex: {regex}, case_sensitive: {case_sensitive}"
     )
 
     # Check authentication
@@ -71,7 +108,35 @@ def search_files_tool(
     if auth_response:
         return auth_response
 
-    credentials = global_state.get("middleware.GithubAuthMiddleware.credentials", None)
+    credentials = get_credentials()
+
+    try:
+        pattern = compile_query(search_string, regex, case_sensitive)
+    except re.error as e:
+        return {"error": f"Invalid regular expression: {str(e)}"}
+
+    # Search the local code index when the repository has one
+    code_index = await get_code_index(repo, credentials["access_token"])
+    if code_index is not None:
+        index, source = code_index
+        try:
+            commit = await source.resolve(branch)
+            if commit is None:
+                return {"error": f"Branch '{branch}' not found in repository {repo}."}
+            return await search_index(
+                index, source, repo, commit, pattern, folders, page, per_page
+            )
+        except SearchTimeout as e:
+            logger.warning(f"Local code search of {repo} timed out")
+            return {"error": str(e)}
+        except (MirrorError, SnapshotError) as e:
+            logger.warning(f"Local code search failed for {repo}: {e}")
+
+    # GitHub code search ignores case, a case-sensitive search can't be honored
+    if regex or branch or case_sensitive:
+        return {
+            "error": "Regular expression, branch and case-sensitive searches need the local code index of the repository."
+        }
 
     # Prepare the search URL
     url = f"https://api.github.com/search/code?q={search_string}+in:file+repo:{repo}"
@@ -92,9 +157,9 @@ def search_files_tool(
     logger.info(f"Searching GitHub API with URL: {url}")
 
     try:
-        response = requests.get(url, headers=headers)
+        response = await github.get(url, headers=headers)
         response.raise_for_status()  # Raise an error for bad responses (4xx or 5xx)
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         logger.error(f"Request failed: {e}")
         return {"error": f"Request failed: {str(e)}"}
 
@@ -121,3 +186,54 @@ def search_files_tool(
         "matching_files": matching_files,
         "total_count": len(matching_files),
     }
+
+
+async def search_index(
+    index: CodeIndex,
+    source,
+    repo: str,
+    commit: str,
+    pattern: re.Pattern,
+    folders: Optional[List[str]],
+    page: int,
+    per_page: int,
+) -> dict:
+    """
+    Search a commit in the local code index, one page of matching files at a time.
+
+    Args:
+    - index (CodeIndex): The code index of the repository.
+    - source: The local copy of the repository the caller reads the files from.
+    - repo (str): The GitHub repository in the format 'owner/repo'.
+    - commit (str): The commit SHA to search.
+    - pattern (re.Pattern): The compiled query.
+    - folders (Optional[List[str]]): Optional list of folders to restrict the search.
+    - page (int): The page number of the results to fetch.
+    - per_page (int): The number of results per page.
+
+    Returns:
+    - The matching files of the page with their matching lines.
+    """
+    page, per_page = max(page or 1, 1), max(per_page or 30, 1)
+    results = await index.search(
+        source, commit, pattern, folders, max_files=page * per_page
+    )
+
+    matching_files = [
+        {
+            "name": result["path"].rsplit("/", 1)[-1],
+            "path": result["path"],
+            "url": f"https://github.com/{repo}/blob/{commit}/{result['path']}",
+            "matches": result["matches"],
+        }
+        for result in results[(page - 1) * per_page : page * per_page]
+    ]
+
+    logger.info(
+        f"Found {len(matching_files)} matching files for `{pattern.pattern}` in the code index of {repo}@{commit}."
+    )
+
+    return {
+        "matching_files": matching_files,
+        "total_count": len(matching_files),
+    }
@@ -1,16 +1,20 @@
-import requests
+import httpx
 import json
+import re
+import sqlite3
 from typing import Optional
 from typing_extensions import Annotated
 from pydantic import Field
 from core.utils.logger import logger  # Importing the logger
-from core.utils.state import global_state
-from app.middleware.github.GithubAuthMiddleware import check_access
+from app.middleware.github.GithubAuthMiddleware import check_access, get_credentials
+from app.utils.github import client as github
+from app.utils.github.issue_comments import get_issues_comments
+from app.utils.github.issue_index import format_issue, get_issue_index
 from core.utils.tools import doc_tag  # Importing the doc_tag
 
 
 @doc_tag("Issues")  # Adding the doc_tag decorator
-def search_issues_tool(
+async def search_issues_tool(
     repo: Annotated[
         str,
         Field(description="The GitHub repository in the format 'owner/repo'."),
@@ -98,7 +102,48 @@ def search_issues_tool(
     if auth_response:
         return auth_response
 
-    credentials = global_state.get("middleware.GithubAuthMiddleware.credentials", None)
+    credentials = get_credentials()
+
+    # Answer from the local issue index when the repository has one
+    index = await get_issue_index(repo, credentials["access_token"])
+    if index is not None:
+        try:
+            per_page = per_page or 30
+            issues = await index.search(
+                repo,
+                query=query,
+                state=state,
+                labels=labels,
+                assignee=assignee,
+                milestone=milestone,
+                with_comments=bool(search_comments and query),
+                sort=sort,
+                order=order,
+                offset=((page or 1) - 1) * per_page,
+                limit=per_page,
+            )
+        except sqlite3.Error as e:
+            logger.warning(f"Issue index search failed for {repo}: {e}")
+        else:
+            issue_list = []
+            for issue in issues:
+                issue_data = format_issue(issue)
+                matching_comments = [
+                    {
+                        "comment_id": comment["id"],
+                        "comment": comment["body"],
+                        "url": comment["html_url"],
+                        "matched_in": "message",
+                        "snippet": comment["snippet"],
+                    }
+                    for comment in issue.get("matching_comments", [])
+                ]
+                if matching_comments:
+                    issue_data["messages"] = matching_comments
+                issue_list.append(issue_data)
+
+            logger.info(f"Found {len(issue_list)} issues in the issue index.")
+            return {"data": {"issues": issue_list, "total_count": len(issue_list)}}
 
     # Prepare the search query
     q = f"repo:{repo}"
@@ -130,9 +175,9 @@ def search_issues_tool(
     logger.info(f"Searching GitHub API with URL: {url} and params: {params}")
 
     try:
-        response = requests.get(url, headers=headers, params=params)
+        response = await github.get(url, headers=headers, params=params)
         response.raise_for_status()  # Raise an error for bad responses (4xx or 5xx)
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         logger.error(f"Request failed: {e}")
         return {"error": f"Request failed: {str(e)}"}
 
@@ -142,8 +187,17 @@ def search_issues_tool(
         logger.error("Failed to decode JSON response")
         return {"error": "Failed to decode JSON response"}
 
+    items = issues.get("items", [])
+
+    # Fetch the comments of every issue at once, then match them case-insensitively
+    comments_by_url = {}
+    matcher = None
+    if search_comments and query:
+        matcher = re.compile(re.escape(query), re.IGNORECASE)
+        comments_by_url = await get_issues_comments(items, credentials["access_token"])
+
     issue_list = []
-    for issue in issues.get("items", []):
+    for issue in items:
         issue_data = {
             "id": issue["id"],
             "title": issue["title"],
@@ -155,12 +209,7 @@ def search_issues_tool(
         }
 
         # If search_comments is true, check for matching comments
-        if search_comments:
-            comments_url = issue["comments_url"]
-            comments_response = requests.get(comments_url, headers=headers)
-            comments_response.raise_for_status()
-            comments = comments_response.json()
-
+        if matcher:
             matching_comments = [
                 {
                     "comment_id": comment["id"],
@@ -168,8 +217,8 @@ def search_issues_tool(
                     "url": comment["html_url"],
                     "matched_in": "message",
                 }
-                for comment in comments
-                if query and query in comment["body"]
+                for comment in comments_by_url.get(issue["comments_url"], [])
+                if matcher.search(comment.get("body") or "")
             ]
 
             if matching_comments:
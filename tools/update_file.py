@@ -1,18 +1,19 @@
-import requests
 import base64
 from typing import Optional
 from typing_extensions import Annotated
 from pydantic import Field
 from core.utils.logger import logger  # Importing the logger
-from core.utils.state import global_state
-from app.middleware.github.GithubAuthMiddleware import check_access
+from app.middleware.github.GithubAuthMiddleware import check_access, get_credentials
+from app.utils.github import client as github
+from app.utils.github.branches import resolve_branch_or_error
+from app.utils.github.trees import invalidate_ref
 from core.utils.tools import doc_tag  # Importing the doc_tag
 
 
-def get_file_sha(repo: str, file_path: str, branch: str, headers: dict) -> str:
+async def get_file_sha(repo: str, file_path: str, branch: str, headers: dict) -> str:
     """Fetch the SHA of the specified file in the given branch."""
     url = f"https://api.github.com/repos/{repo}/contents/{file_path}?ref={branch}"
-    response = requests.get(url, headers=headers)
+    response = await github.get(url, headers=headers)
 
     if response.status_code != 200:
         error_message = response.json().get("message", "Unknown error")
@@ -23,7 +24,7 @@ def get_file_sha(repo: str, file_path: str, branch: str, headers: dict) -> str:
 
 
 @doc_tag("Files")  # Adding the doc_tag decorator
-def update_file_tool(
+async def update_file_tool(
     file_path: Annotated[
         str, Field(description="The path of the file to edit, including the filename.")
     ],
@@ -40,9 +41,9 @@ def update_file_tool(
     branch: Annotated[
         Optional[str],
         Field(
-            description="The branch where the file will be updated (default is 'main')."
+            description="The branch where the file will be updated (default is the repository's default branch)."
         ),
-    ] = "main",
+    ] = None,
 ) -> dict:
     """
     Update an existing file in a specified GitHub repository on a specified branch.
@@ -53,7 +54,7 @@ def update_file_tool(
     - new_content (str): The new content to write to the file.
     - repo (str): The GitHub repository in the format 'owner/repo'.
     - commit_message (Optional[str]): The commit message for the file update (default is 'Update file').
-    - branch (Optional[str]): The branch where the file will be updated (default is 'main').
+    - branch (Optional[str]): The branch where the file will be updated (default is the repository's default branch).
 
     Returns:
     - JSON string indicating success or error.
@@ -76,12 +77,20 @@ def update_file_tool(
         return auth_response
 
     # Retrieve credentials and repository information
-    credentials = global_state.get("middleware.GithubAuthMiddleware.credentials")
+    credentials = get_credentials()
+
+    # Fall back to the repository default branch, cached per repository
+    branch, error_response = await resolve_branch_or_error(
+        repo, branch, credentials["access_token"]
+    )
+    if error_response:
+        return error_response
+
     headers = {"Authorization": f"token {credentials['access_token']}"}
 
     try:
         # Step 2: Fetch the SHA of the file
-        file_sha = get_file_sha(repo, file_path, branch, headers)
+        file_sha = await get_file_sha(repo, file_path, branch, headers)
 
         # Step 3: Prepare the payload to update the file
         payload = {
@@ -98,9 +107,10 @@ def update_file_tool(
         logger.info(f"Updating file in GitHub API with URL: {url}")
 
         # Step 4: Send the request to update the file
-        response = requests.put(url, headers=headers, json=payload)
+        response = await github.put(url, headers=headers, json=payload)
 
         if response.status_code == 200:
+            invalidate_ref(repo, branch)  # Later reads must see the new commit
             logger.info(
                 f"File '{file_path}' updated successfully in repository '{repo}' on branch '{branch}'."
             )
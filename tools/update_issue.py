@@ -1,16 +1,17 @@
-import requests
+import httpx
 import json
 from typing import Optional
 from typing_extensions import Annotated
 from pydantic import Field
 from core.utils.logger import logger  # Importing the logger
 from core.utils.state import global_state
-from app.middleware.github.GithubAuthMiddleware import check_access
+from app.middleware.github.GithubAuthMiddleware import check_access, get_credentials
+from app.utils.github import client as github
 from core.utils.tools import doc_tag  # Importing the doc_tag
 
 
 @doc_tag("Issues")  # Adding the doc_tag decorator
-def update_issue_tool(
+async def update_issue_tool(
     repo: Annotated[
         str,
         Field(description="The GitHub repository in the format 'owner/repo'."),
@@ -69,7 +70,7 @@ def update_issue_tool(
         return auth_response
 
     # Retrieve credentials and repository information
-    credentials = global_state.get("middleware.GithubAuthMiddleware.credentials")
+    credentials = get_credentials()
     middleware_repo = global_state.get("middleware.GithubAuthMiddleware.repo")
 
     # Validate repository parameter
@@ -99,10 +100,10 @@ def update_issue_tool(
     logger.info(f"Updating issue in GitHub API with URL: {url} and data: {issue_data}")
 
     try:
-        response = requests.patch(url, headers=headers, json=issue_data)
+        response = await github.patch(url, headers=headers, json=issue_data)
         response.raise_for_status()  # Raise an error for bad responses (4xx or 5xx)
         updated_issue = response.json()  # Parse JSON response
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         if response.status_code != 200:  # Check if GitHub returned an error
             try:
                 error_message = response.json().get("message", "No message provided")
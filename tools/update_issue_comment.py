@@ -1,15 +1,15 @@
-import requests
+import httpx
 import json
 from typing_extensions import Annotated
 from pydantic import Field
 from core.utils.logger import logger  # Importing the logger
-from core.utils.state import global_state
-from app.middleware.github.GithubAuthMiddleware import check_access
+from app.middleware.github.GithubAuthMiddleware import check_access, get_credentials
+from app.utils.github import client as github
 from core.utils.tools import doc_tag  # Importing the doc_tag
 
 
 @doc_tag("Issues")  # Adding the doc_tag decorator
-def update_issue_comment_tool(
+async def update_issue_comment_tool(
     comment_id: Annotated[
         int,
         Field(description="The ID of the comment to update."),
@@ -49,7 +49,7 @@ def update_issue_comment_tool(
         return auth_response
 
     # Retrieve credentials and repository information
-    credentials = global_state.get("middleware.GithubAuthMiddleware.credentials")
+    credentials = get_credentials()
 
     # Prepare the URL to update a comment
     url = f"https://api.github.com/repos/{repo}/issues/comments/{comment_id}"
@@ -66,10 +66,10 @@ def update_issue_comment_tool(
     )
 
     try:
-        response = requests.patch(url, headers=headers, json=comment_data)
+        response = await github.patch(url, headers=headers, json=comment_data)
         response.raise_for_status()  # Raise an error for bad responses (4xx or 5xx)
         updated_comment = response.json()  # Parse JSON response
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         # If GitHub returned an error response, capture and log it
         if response.status_code != 200:
             try:
@@ -0,0 +1,118 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional
+from core.utils.config import config
+from core.utils.env import EnvConfig
+from core.utils.logger import logger
+from app.utils.github.trees import resolve_blob_sha
+
+github_cache_config = config.get("GITHUB_CACHE", {})
+
+
+class BlobCache:
+    """Content-addressed cache of git blobs keyed by their SHA."""
+
+    def __init__(self, max_bytes: int, disk_path: Optional[str] = None):
+        self.max_bytes = max_bytes
+        self.disk_path = disk_path
+        self.current_bytes = 0
+        self.blobs = OrderedDict()
+        self.lock = threading.Lock()
+
+        if self.disk_path:
+            os.makedirs(self.disk_path, exist_ok=True)
+            logger.info(f"Blob cache disk store enabled at: {self.disk_path}")
+
+    def _disk_file(self, sha: str) -> str:
+        return os.path.join(self.disk_path, sha[:2], sha)
+
+    def get(self, sha: str) -> Optional[bytes]:
+        """Return the blob content for a SHA, or None if it isn't cached."""
+        if not sha:
+            return None
+
+        with self.lock:
+            content = self.blobs.get(sha)
+            if content is not None:
+                self.blobs.move_to_end(sha)
+                return content
+
+        if self.disk_path:
+            try:
+                with open(self._disk_file(sha), "rb") as f:
+                    content = f.read()
+            except FileNotFoundError:
+                return None
+            except OSError as e:
+                logger.warning(f"Failed to read blob {sha} from disk cache: {e}")
+                return None
+
+            # Promote the blob back into memory
+            self._put_memory(sha, content)
+            return content
+
+        return None
+
+    def put(self, sha: str, content: bytes):
+        """Store the content of a blob under its SHA."""
+        if not sha or content is None:
+            return
+
+        self._put_memory(sha, content)
+
+        if self.disk_path:
+            disk_file = self._disk_file(sha)
+            if os.path.exists(disk_file):
+                return
+            try:
+                os.makedirs(os.path.dirname(disk_file), exist_ok=True)
+                # Write to a temp file first so readers never see partial blobs
+                tmp_file = f"{disk_file}.{os.getpid()}.{threading.get_ident()}.tmp"
+                with open(tmp_file, "wb") as f:
+                    f.write(content)
+                os.replace(tmp_file, disk_file)
+            except OSError as e:
+                logger.warning(f"Failed to write blob {sha} to disk cache: {e}")
+
+    def _put_memory(self, sha: str, content: bytes):
+        size = len(content)
+        if size > self.max_bytes:
+            return
+
+        with self.lock:
+            if sha in self.blobs:
+                self.blobs.move_to_end(sha)
+                return
+
+            self.blobs[sha] = content
+            self.current_bytes += size
+
+            # Evict least recently used blobs until we are within budget
+            while self.current_bytes > self.max_bytes:
+                _, evicted = self.blobs.popitem(last=False)
+                self.current_bytes -= len(evicted)
+
+
+blob_cache = BlobCache(
+    max_bytes=github_cache_config.get("blob_cache_max_bytes", 64 * 1024 * 1024),
+    disk_path=EnvConfig.get("BLOB_CACHE_PATH"),
+)
+
+
+async def get_cached_file(
+    repo: str, ref: Optional[str], path: str, token: str
+) -> Optional[bytes]:
+    """
+    Return the content of a file from the blob cache, resolving its SHA from the cached tree.
+
+    Args:
+    - repo (str): The GitHub repository in the format 'owner/repo'.
+    - ref (Optional[str]): Branch, tag or commit SHA. Defaults to HEAD.
+    - path (str): The file path.
+    - token (str): GitHub access token.
+
+    Returns:
+    - Optional[bytes]: The file content, or None if it isn't cached.
+    """
+    return blob_cache.get(await resolve_blob_sha(repo, ref, path, token))
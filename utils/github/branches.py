@@ -0,0 +1,78 @@
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+import httpx
+from core.utils.config import config
+from core.utils.logger import logger
+from app.utils.github import client as github
+
+github_cache_config = config.get("GITHUB_CACHE", {})
+
+# (token, repo) -> (default_branch, expires_at), scoped by token like the ref cache
+_default_branches = OrderedDict()
+
+
+async def get_default_branch(repo: str, token: str) -> str:
+    """
+    Return the default branch of a repository, cached for default_branch_ttl seconds.
+
+    Once expired the repository is read again with its ETag, so an unchanged
+    repository is answered with a 304 that doesn't count against the rate limit.
+
+    Args:
+    - repo (str): The GitHub repository in the format 'owner/repo'.
+    - token (str): GitHub access token.
+
+    Returns:
+    - str: The default branch name.
+
+    Raises:
+    - httpx.HTTPError: If the repository can't be read.
+    """
+    key = (token, repo)
+    cached = _default_branches.get(key)
+    if cached and cached[1] > time.monotonic():
+        return cached[0]
+
+    url = f"{github.GITHUB_API_URL}/repos/{repo}"
+    logger.info(f"Retrieving default branch from GitHub API with URL: {url}")
+
+    response = await github.get(url, headers={"Authorization": f"token {token}"})
+    response.raise_for_status()  # Raise an error for bad responses (4xx or 5xx)
+    default_branch = response.json()["default_branch"]
+
+    _default_branches[key] = (
+        default_branch,
+        time.monotonic() + github_cache_config.get("default_branch_ttl", 300),
+    )
+    _default_branches.move_to_end(key)
+    while len(_default_branches) > github_cache_config.get(
+        "default_branch_max_entries", 1024
+    ):
+        _default_branches.popitem(last=False)
+
+    return default_branch
+
+
+async def resolve_branch(repo: str, branch: Optional[str], token: str) -> str:
+    """Return the given branch, or the repository default branch if none is given."""
+    return branch or await get_default_branch(repo, token)
+
+
+async def resolve_branch_or_error(
+    repo: str, branch: Optional[str], token: str
+) -> Tuple[Optional[str], Optional[dict]]:
+    """
+    Return the given branch, or the repository default branch if none is given.
+
+    Returns:
+    - Tuple[Optional[str], Optional[dict]]: The branch and None, or None and the
+      error response to return if the default branch can't be read.
+    """
+    try:
+        return await resolve_branch(repo, branch, token), None
+    except httpx.HTTPError as e:
+        logger.error(f"Failed to resolve the default branch of {repo}: {e}")
+        return None, {
+            "error": f"Failed to resolve the default branch of {repo}: {str(e)}"
+        }
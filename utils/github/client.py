@@ -0,0 +1,298 @@
+import asyncio
+import random
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, Optional
+import httpx
+from core.utils.config import config
+from core.utils.logger import logger
+from app.utils.github.http_cache import http_cache
+from app.utils.github.rate_limit import rate_limiter
+
+GITHUB_API_URL = "https://api.github.com"
+
+github_api_config = config.get("GITHUB_API", {})
+retry_config = config.get("GITHUB_RETRY", {})
+
+# Methods retried by default, writes are only retried when the caller says they are safe
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+# Failures where the request never reached GitHub, any method can be sent again
+UNSENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+# (authorization, accept, URL) -> future of the GET in flight, shared by identical calls
+_in_flight: Dict[tuple, asyncio.Future] = {}
+
+# Headers sent with every GitHub API call, tools only add the authorization
+DEFAULT_HEADERS = {
+    "Accept": "application/vnd.github+json",
+    "X-GitHub-Api-Version": "2022-11-28",
+    "User-Agent": github_api_config.get("user_agent", "easy-mcp-github-tools"),
+}
+
+_client = None
+_client_loop = None
+
+
+def get_client() -> httpx.AsyncClient:
+    """
+    Return the process-wide async client, creating it on first use.
+
+    Pooled connections belong to the event loop that opened them, so a new
+    client is created if the running loop changes (e.g. between test runs).
+    """
+    global _client, _client_loop
+
+    loop = asyncio.get_running_loop()
+    if _client is None or _client.is_closed or _client_loop is not loop:
+        max_connections = github_api_config.get("max_connections", 100)
+        max_keepalive_connections = github_api_config.get(
+            "max_keepalive_connections", 20
+        )
+        logger.info(
+            f"Creating GitHub HTTP client with max_connections: {max_connections}, max_keepalive_connections: {max_keepalive_connections}"
+        )
+        _client = httpx.AsyncClient(
+            headers=DEFAULT_HEADERS,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=github_api_config.get("keepalive_expiry", 30),
+            ),
+            timeout=github_api_config.get("timeout", 30),
+            follow_redirects=True,  # GitHub redirects renamed repositories
+        )
+        _client_loop = loop
+
+    return _client
+
+
+async def close_client():
+    """Close the shared client and release pooled connections."""
+    global _client, _client_loop
+
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+        _client_loop = None
+
+
+def error_message(e: httpx.HTTPStatusError) -> str:
+    """Return the message of a GitHub error response, or the error itself."""
+    try:
+        return e.response.json().get("message", "Unknown error")
+    except ValueError:
+        return str(e)
+
+
+def _backoff(attempt: int, response: Optional[httpx.Response] = None) -> float:
+    # Full jitter, so concurrent callers don't retry in lockstep
+    if response is not None and "retry-after" in response.headers:
+        try:
+            return float(response.headers["retry-after"])
+        except ValueError:
+            pass
+    delay = retry_config.get("base_delay", 0.5) * 2 ** (attempt - 1)
+    return random.uniform(0, min(delay, retry_config.get("max_delay", 8)))
+
+
+async def _send(
+    client: httpx.AsyncClient, github_request: httpx.Request, stream: bool = False
+):
+    # Wait for the token's rate limit budget, answering 429 if it won't come back soon
+    limited_response = await rate_limiter.acquire(github_request)
+    if limited_response is not None:
+        return limited_response
+
+    response = None
+    try:
+        response = await client.send(github_request, stream=stream)
+        if stream and response.status_code >= 400:
+            # Error bodies are small, the rate limiter and the caller read them
+            await response.aread()
+    except BaseException:
+        rate_limiter.release(github_request, None)
+        if response is not None:
+            await response.aclose()
+        raise
+    rate_limiter.release(github_request, response)
+    return response
+
+
+async def request(
+    method: str, url: str, retry: Optional[bool] = None, **kwargs
+) -> httpx.Response:
+    """
+    Send a request to the GitHub API through the shared async client.
+
+    Concurrent identical GETs (same token, Accept header and URL) are
+    coalesced: the first one is sent and the others share its response.
+    Transient failures (timeouts, dropped connections, 5xx answers) are retried
+    with jittered exponential backoff, each attempt with its own timeout and
+    all of them within an overall deadline. Only idempotent reads are retried
+    by default. Other methods are retried only when the request never reached
+    GitHub, unless the caller passes retry=True for a write that is safe to
+    repeat (e.g. moving a ref to a given SHA).
+
+    Args:
+    - method (str): The HTTP method.
+    - url (str): The full request URL.
+    - retry (Optional[bool]): Whether the request is safe to send again. Defaults to True for GET, HEAD and OPTIONS.
+    - kwargs: Any argument accepted by httpx.AsyncClient.build_request.
+
+    Returns:
+    - httpx.Response: The GitHub response.
+
+    Raises:
+    - httpx.HTTPError: If the last attempt failed without a response.
+    """
+    params = kwargs.get("params")
+    if isinstance(params, dict):
+        # Unset optional filters are left out of the query string
+        kwargs["params"] = {k: v for k, v in params.items() if v is not None}
+
+    client = get_client()
+    github_request = client.build_request(method, url, **kwargs)
+    if retry is None:
+        retry = github_request.method in IDEMPOTENT_METHODS
+
+    if github_request.method != "GET" or not github_api_config.get(
+        "coalesce_requests", True
+    ):
+        return await _send_with_retries(client, github_request, retry)
+
+    # Identical GETs of the same token share the call already in flight
+    key = (
+        github_request.headers.get("authorization", ""),
+        github_request.headers.get("accept", ""),
+        str(github_request.url),
+    )
+    loop = asyncio.get_running_loop()
+    leader = _in_flight.get(key)
+    if leader is not None and leader.get_loop() is loop:
+        logger.info(f"Sharing in-flight GitHub call to: {github_request.url}")
+        try:
+            return await asyncio.shield(leader)
+        except asyncio.CancelledError:
+            if not leader.cancelled():
+                raise
+            # The leading caller was cancelled, this one sends its own call
+
+    future = _in_flight[key] = loop.create_future()
+    try:
+        response = await _send_with_retries(client, github_request, retry)
+    except BaseException as e:
+        if isinstance(e, asyncio.CancelledError):
+            future.cancel()
+        else:
+            future.set_exception(e)
+            future.exception()  # Retrieved, even when no other caller waits
+        raise
+    else:
+        future.set_result(response)
+        return response
+    finally:
+        if _in_flight.get(key) is future:
+            del _in_flight[key]
+
+
+async def _send_with_retries(
+    client: httpx.AsyncClient,
+    github_request: httpx.Request,
+    retry: bool,
+    stream: bool = False,
+) -> httpx.Response:
+    # Revalidate cached GET responses, 304 answers don't count against the rate limit
+    cached_entry = None if stream else http_cache.add_validators(github_request)
+
+    max_attempts = retry_config.get("max_attempts", 4)
+    attempt_timeout = retry_config.get(
+        "attempt_timeout", github_api_config.get("timeout", 30)
+    )
+    deadline = time.monotonic() + retry_config.get("deadline", 60)
+    attempt = 0
+
+    while True:
+        attempt += 1
+        # The deadline check before each retry leaves some time to the attempt
+        time_left = deadline - time.monotonic()
+        github_request.extensions["timeout"] = httpx.Timeout(
+            min(attempt_timeout, time_left)
+        ).as_dict()
+
+        try:
+            response = await _send(client, github_request, stream)
+        except httpx.TransportError as e:
+            if not (retry or isinstance(e, UNSENT_ERRORS)):
+                raise
+            delay = _backoff(attempt)
+            if attempt >= max_attempts or time.monotonic() + delay >= deadline:
+                raise
+            logger.warning(
+                f"GitHub call to {github_request.url} failed ({type(e).__name__}), retrying in {delay:.2f}s"
+            )
+        else:
+            if not retry or response.status_code not in retry_config.get(
+                "statuses", [500, 502, 503, 504]
+            ):
+                break
+            delay = _backoff(attempt, response)
+            if attempt >= max_attempts or time.monotonic() + delay >= deadline:
+                break
+            logger.warning(
+                f"GitHub call to {github_request.url} answered {response.status_code}, retrying in {delay:.2f}s"
+            )
+            await response.aclose()
+
+        await asyncio.sleep(delay)
+
+    if stream:
+        return response
+
+    if cached_entry and response.status_code == 304:
+        logger.info(f"Serving cached response for: {github_request.url}")
+        return http_cache.cached_response(cached_entry, github_request)
+
+    http_cache.store(github_request, response)
+    return response
+
+
+@asynccontextmanager
+async def stream(method: str, url: str, retry: Optional[bool] = None, **kwargs):
+    """
+    Stream a response through the shared async client, for large downloads.
+
+    The call waits for the rate limit and opening it is retried like request(),
+    but streamed responses bypass the ETag cache and aren't coalesced. Use as
+    an async context manager: async with github.stream("GET", url) as response: ...
+    """
+    client = get_client()
+    github_request = client.build_request(method, url, **kwargs)
+    if retry is None:
+        retry = github_request.method in IDEMPOTENT_METHODS
+
+    response = await _send_with_retries(client, github_request, retry, stream=True)
+    try:
+        yield response
+    finally:
+        await response.aclose()
+
+
+async def get(url: str, **kwargs) -> httpx.Response:
+    return await request("GET", url, **kwargs)
+
+
+async def post(url: str, **kwargs) -> httpx.Response:
+    return await request("POST", url, **kwargs)
+
+
+async def put(url: str, **kwargs) -> httpx.Response:
+    return await request("PUT", url, **kwargs)
+
+
+async def patch(url: str, **kwargs) -> httpx.Response:
+    return await request("PATCH", url, **kwargs)
+
+
+async def delete(url: str, **kwargs) -> httpx.Response:
+    return await request("DELETE", url, **kwargs)
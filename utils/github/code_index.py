@@ -0,0 +1,363 @@
+import asyncio
+import re
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Set, Tuple
+import httpx
+from core.utils.config import config
+from core.utils.logger import logger
+from app.utils.github.branches import get_default_branch
+from app.utils.github.mirror import get_mirror
+from app.utils.github.snapshots import SnapshotSource, snapshot_store
+
+try:  # Python 3.11+
+    from re import _constants as sre_constants, _parser as sre_parse
+except ImportError:
+    import sre_constants, sre_parse
+
+code_index_config = config.get("GITHUB_CODE_INDEX", {})
+
+REPEATS = (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT)
+
+
+class SearchTimeout(Exception):
+    """Raised when a search of the code index runs past search_timeout."""
+
+
+def _trigrams(text: str) -> Set[str]:
+    # Lowercased so case insensitive queries can use the index too
+    text = text.lower()
+    return {text[i : i + 3] for i in range(len(text) - 2)}
+
+
+def _index_contents(contents: Dict[str, bytes]) -> Dict[str, Optional[frozenset]]:
+    # Binary and non UTF-8 files are left out of the index, marked with None
+    indexed = {}
+    for sha, content in contents.items():
+        indexed[sha] = None
+        if b"\0" in content[:8000]:  # Same heuristic as git
+            continue
+        try:
+            indexed[sha] = frozenset(_trigrams(content.decode("utf-8")))
+        except UnicodeDecodeError:
+            pass
+    return indexed
+
+
+def _literal_runs(parsed) -> List[str]:
+    """Return the literal strings every match of a parsed regex must contain."""
+    runs, current = [], []
+
+    def flush():
+        if current:
+            runs.append("".join(current))
+            current.clear()
+
+    for op, av in parsed:
+        if op is sre_constants.LITERAL:
+            current.append(chr(av))
+            continue
+
+        flush()
+        if op is sre_constants.SUBPATTERN:
+            runs.extend(_literal_runs(av[-1]))
+        elif op in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT) and av[0] >= 1:
+            # The repeated part appears at least once
+            runs.extend(_literal_runs(av[2]))
+    flush()
+    return runs
+
+
+def required_trigrams(pattern: str) -> Set[str]:
+    """
+    Return the trigrams any text matching a regex must contain.
+
+    Alternations, classes and optional parts don't contribute, an empty set
+    means the index can't narrow the search down.
+    """
+    try:
+        parsed = sre_parse.parse(pattern)
+    except re.error:
+        return set()
+
+    trigrams = set()
+    for run in _literal_runs(parsed):
+        trigrams |= _trigrams(run)
+    return trigrams
+
+
+def _has_nested_repeat(parsed, in_repeat: bool = False) -> bool:
+    """Return whether a parsed regex repeats an unbounded repeat, like (a+)+."""
+    for op, av in parsed:
+        if op in REPEATS:
+            unbounded = av[1] == sre_constants.MAXREPEAT
+            if unbounded and in_repeat:
+                return True
+            if _has_nested_repeat(av[2], in_repeat or unbounded):
+                return True
+        elif op is sre_constants.SUBPATTERN:
+            if _has_nested_repeat(av[-1], in_repeat):
+                return True
+        elif op is sre_constants.BRANCH:
+            if any(_has_nested_repeat(branch, in_repeat) for branch in av[1]):
+                return True
+    return False
+
+
+def compile_query(query: str, regex: bool, case_sensitive: bool) -> re.Pattern:
+    """
+    Compile a search query, literal queries are escaped first.
+
+    Regular expressions run on every candidate file, so they are limited to
+    max_pattern_length characters and can't repeat an unbounded repeat, like
+    (a+)+, which can backtrack for exponential time.
+
+    Raises:
+    - re.error: If the query isn't a valid or allowed regular expression.
+    """
+    flags = re.MULTILINE if case_sensitive else re.MULTILINE | re.IGNORECASE
+    if not regex:
+        return re.compile(re.escape(query), flags)
+
+    max_length = code_index_config.get("max_pattern_length", 1000)
+    if len(query) > max_length:
+        raise re.error(f"the pattern is longer than {max_length} characters")
+    if _has_nested_repeat(sre_parse.parse(query, flags)):
+        raise re.error("nested unbounded repeats like (a+)+ aren't supported")
+    return re.compile(query, flags)
+
+
+def _find_matches(
+    text: str, regex: re.Pattern, max_matches: int, snippet_length: int
+) -> List[dict]:
+    matches = []
+    line_number, line_start = 1, 0
+    for match in regex.finditer(text):
+        # Count lines incrementally, matches come in order
+        line_number += text.count("\n", line_start, match.start())
+        line_start = text.rfind("\n", 0, match.start()) + 1
+        line_end = text.find("\n", match.start())
+        line = text[line_start : line_end if line_end != -1 else len(text)]
+
+        if not matches or matches[-1]["line"] != line_number:
+            matches.append({"line": line_number, "text": line[:snippet_length]})
+            if len(matches) >= max_matches:
+                break
+    return matches
+
+
+class CodeIndex:
+    """
+    Trigram index of the files of recently searched commits of a repository.
+
+    Files are indexed by blob SHA, so indexing a new commit only reads the
+    blobs that changed since the commits already indexed. A query reads only
+    the files holding every trigram of its literal parts, then confirms and
+    locates the matches with the regex.
+
+    Blobs and commits are the same whichever copy they are read from, so the
+    files are read from the source given to each call: a local copy of the
+    repository with resolve(ref), get_tree(commit) and read_objects(shas),
+    a GitMirror or a SnapshotSource of the caller.
+    """
+
+    def __init__(self):
+        self.postings: Dict[str, Set[str]] = {}
+        self.blob_trigrams: Dict[str, Optional[frozenset]] = {}
+        self.blob_refs: Dict[str, int] = {}
+        self.commits = OrderedDict()  # commit -> {path: blob_sha}
+        self.lock = asyncio.Lock()
+
+    def _add_blob(self, sha: str, trigrams: Optional[frozenset]):
+        self.blob_trigrams[sha] = trigrams
+        for trigram in trigrams or ():
+            self.postings.setdefault(trigram, set()).add(sha)
+
+    def _remove_blob(self, sha: str):
+        for trigram in self.blob_trigrams.pop(sha) or ():
+            shas = self.postings[trigram]
+            shas.discard(sha)
+            if not shas:
+                del self.postings[trigram]
+
+    async def index_commit(self, source, commit: str) -> Dict[str, str]:
+        """Index the files of a commit, returning them as {path: blob_sha}."""
+        async with self.lock:
+            if commit in self.commits:
+                self.commits.move_to_end(commit)
+                return self.commits[commit]
+
+            max_file_size = code_index_config.get("max_file_size", 1024 * 1024)
+            tree = await source.get_tree(commit)
+            files = {
+                path: entry["sha"]
+                for path, entry in tree["entries"].items()
+                if entry["type"] == "blob" and entry.get("size", 0) <= max_file_size
+            }
+
+            new_shas = sorted(set(files.values()) - self.blob_trigrams.keys())
+            logger.info(
+                f"Indexing {len(new_shas)} new blobs of {len(files)} files for commit {commit}"
+            )
+            batch_size = code_index_config.get("batch_size", 256)
+            for i in range(0, len(new_shas), batch_size):
+                contents = await source.read_objects(new_shas[i : i + batch_size])
+                # Trigram extraction is CPU bound, keep the event loop responsive
+                indexed = await asyncio.to_thread(_index_contents, contents)
+                for sha, trigrams in indexed.items():
+                    self._add_blob(sha, trigrams)
+
+            for sha in set(files.values()):
+                self.blob_refs[sha] = self.blob_refs.get(sha, 0) + 1
+            self.commits[commit] = files
+
+            # Drop the blobs only the evicted commits referenced
+            while len(self.commits) > code_index_config.get("max_commits", 4):
+                _, evicted = self.commits.popitem(last=False)
+                for sha in set(evicted.values()):
+                    self.blob_refs[sha] -= 1
+                    if not self.blob_refs[sha]:
+                        del self.blob_refs[sha]
+                        if sha in self.blob_trigrams:
+                            self._remove_blob(sha)
+
+            return files
+
+    def _candidates(self, trigrams: Set[str]) -> Optional[Set[str]]:
+        if not trigrams:
+            return None  # Every file has to be scanned
+
+        # Intersect from the rarest trigram up
+        candidates = None
+        for trigram in sorted(trigrams, key=lambda t: len(self.postings.get(t, ()))):
+            shas = self.postings.get(trigram)
+            if not shas:
+                return set()
+            candidates = set(shas) if candidates is None else candidates & shas
+            if not candidates:
+                break
+        return candidates
+
+    async def search(
+        self,
+        source,
+        commit: str,
+        regex: re.Pattern,
+        folders: Optional[List[str]] = None,
+        max_files: Optional[int] = None,
+    ) -> List[dict]:
+        """
+        Return the files of a commit matching a regex, in path order.
+
+        Files are scanned for at most search_timeout seconds, a file already
+        being scanned at the deadline is left to finish in its worker thread.
+
+        Args:
+        - source: The local copy of the repository the files are read from.
+        - commit (str): The commit SHA to search.
+        - regex (re.Pattern): The compiled query, literal searches are escaped first.
+        - folders (Optional[List[str]]): Optional folders to restrict the search to.
+        - max_files (Optional[int]): Stop after this many matching files.
+
+        Returns:
+        - List[dict]: The "path" and "matches" (line number and text) of each matching file.
+
+        Raises:
+        - SearchTimeout: If the search runs past search_timeout.
+        """
+        files = await self.index_commit(source, commit)
+        candidates = self._candidates(required_trigrams(regex.pattern))
+
+        prefixes = [f"{folder.strip('/')}/" for folder in folders or [] if folder]
+        paths = sorted(
+            path
+            for path, sha in files.items()
+            if self.blob_trigrams.get(sha) is not None
+            and (candidates is None or sha in candidates)
+            and (not prefixes or path.startswith(tuple(prefixes)))
+        )
+
+        max_matches = code_index_config.get("max_matches_per_file", 20)
+        snippet_length = code_index_config.get("snippet_length", 200)
+        batch_size = code_index_config.get("batch_size", 256)
+        timeout = code_index_config.get("search_timeout", 30)
+        deadline = time.monotonic() + timeout
+        timeout_error = SearchTimeout(
+            f"The search took longer than {timeout} seconds, narrow it down with folders or a more specific pattern."
+        )
+
+        def scan(batch: List[str], contents: Dict[str, bytes]) -> List[dict]:
+            results = []
+            for path in batch:
+                if time.monotonic() > deadline:
+                    raise timeout_error
+                content = contents.get(files[path])
+                if content is None:
+                    continue
+                matches = _find_matches(
+                    content.decode("utf-8"), regex, max_matches, snippet_length
+                )
+                if matches:
+                    results.append({"path": path, "matches": matches})
+            return results
+
+        results = []
+        for i in range(0, len(paths), batch_size):
+            batch = paths[i : i + batch_size]
+            contents = await source.read_objects(
+                sorted({files[path] for path in batch})
+            )
+            try:
+                results.extend(
+                    await asyncio.wait_for(
+                        asyncio.to_thread(scan, batch, contents),
+                        max(deadline - time.monotonic(), 0),
+                    )
+                )
+            except asyncio.TimeoutError:
+                raise timeout_error
+            if max_files is not None and len(results) >= max_files:
+                return results[:max_files]
+        return results
+
+
+_indexes: Dict[str, CodeIndex] = {}
+
+
+async def get_code_index(repo: str, token: str) -> Optional[Tuple[CodeIndex, object]]:
+    """
+    Return the code index of a repository and the source to read it with, or None to search with the GitHub API.
+
+    The index is opt-in with GITHUB_CODE_INDEX["enabled"] and is built from
+    the local mirror of the repository, see GITHUB_MIRROR, or else from
+    tarball snapshots when SNAPSHOT_PATH is set, downloaded with the caller's
+    own token.
+
+    Args:
+    - repo (str): The GitHub repository in the format 'owner/repo'.
+    - token (str): GitHub access token.
+
+    Returns:
+    - Optional[Tuple[CodeIndex, object]]: The index and the source of this caller, or None if the repository can't be indexed locally.
+    """
+    if not code_index_config.get("enabled", False):
+        return None
+
+    source = await get_mirror(repo, token)
+    if source is None:
+        if snapshot_store is None:
+            return None
+
+        try:
+            await get_default_branch(repo, token)  # Cached per token
+        except httpx.HTTPError as e:
+            logger.warning(
+                f"Not using the code index of {repo}, repository not readable: {e}"
+            )
+            return None
+        source = SnapshotSource(repo, token)
+
+    index = _indexes.get(repo)
+    if index is None:
+        index = _indexes[repo] = CodeIndex()
+    return index, source
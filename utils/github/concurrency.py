@@ -0,0 +1,43 @@
+import asyncio
+import weakref
+from typing import Awaitable, Iterable, List
+from core.utils.config import config
+
+github_api_config = config.get("GITHUB_API", {})
+
+# One semaphore per access token, dropped once no call is holding it
+_user_semaphores = weakref.WeakValueDictionary()
+
+
+def user_semaphore(token: str) -> asyncio.Semaphore:
+    """Return the semaphore bounding concurrent GitHub calls for a user."""
+    semaphore = _user_semaphores.get(token)
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(
+            github_api_config.get("max_concurrency_per_user", 8)
+        )
+        _user_semaphores[token] = semaphore
+    return semaphore
+
+
+async def gather_for_user(token: str, aws: Iterable[Awaitable]) -> List:
+    """
+    Run awaitables concurrently, at most max_concurrency_per_user at a time.
+
+    Only pass leaf calls here: an awaitable that itself calls gather_for_user
+    for the same token could wait forever on the semaphore it holds.
+
+    Args:
+    - token (str): The GitHub access token the calls are made with.
+    - aws (Iterable[Awaitable]): The calls to run.
+
+    Returns:
+    - List: The results, in the same order as the awaitables.
+    """
+    semaphore = user_semaphore(token)
+
+    async def run(aw):
+        async with semaphore:
+            return await aw
+
+    return await asyncio.gather(*(run(aw) for aw in aws))
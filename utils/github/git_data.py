@@ -0,0 +1,124 @@
+import base64
+import hashlib
+from typing import List
+from core.utils.logger import logger
+from app.utils.github import client as github
+
+
+def _headers(token: str) -> dict:
+    return {"Authorization": f"token {token}"}
+
+
+def blob_sha(content: bytes) -> str:
+    """Return the git object SHA GitHub assigns to a blob with this content."""
+    header = f"blob {len(content)}\0".encode()
+    return hashlib.sha1(header + content).hexdigest()
+
+
+async def get_branch_head(repo: str, branch: str, token: str) -> str:
+    """
+    Return the SHA of the commit a branch points at.
+
+    Raises:
+    - httpx.HTTPError: If the branch can't be read.
+    """
+    url = f"{github.GITHUB_API_URL}/repos/{repo}/git/ref/heads/{branch}"
+    logger.info(f"Retrieving branch head from GitHub API with URL: {url}")
+
+    response = await github.get(url, headers=_headers(token))
+    response.raise_for_status()  # Raise an error for bad responses (4xx or 5xx)
+    return response.json()["object"]["sha"]
+
+
+async def create_tree(
+    repo: str, base_tree: str, entries: List[dict], token: str
+) -> str:
+    """
+    Create a tree from a base tree and a list of changed entries.
+
+    Entries with a "sha" of None remove the path from the base tree.
+
+    Args:
+    - repo (str): The GitHub repository in the format 'owner/repo'.
+    - base_tree (str): SHA of the tree the entries are applied to.
+    - entries (List[dict]): Tree entries with "path", "mode", "type" and "sha" or "content".
+    - token (str): GitHub access token.
+
+    Returns:
+    - str: The SHA of the new tree.
+    """
+    url = f"{github.GITHUB_API_URL}/repos/{repo}/git/trees"
+    logger.info(f"Creating tree with {len(entries)} changed entries in {repo}")
+
+    # Trees are content-addressed, creating the same one twice is harmless
+    response = await github.post(
+        url,
+        headers=_headers(token),
+        json={"base_tree": base_tree, "tree": entries},
+        retry=True,
+    )
+    response.raise_for_status()
+    return response.json()["sha"]
+
+
+async def create_commit(
+    repo: str, message: str, tree: str, parents: List[str], token: str
+) -> str:
+    """
+    Create a commit object pointing at a tree.
+
+    Returns:
+    - str: The SHA of the new commit.
+    """
+    url = f"{github.GITHUB_API_URL}/repos/{repo}/git/commits"
+    logger.info(f"Creating commit for tree {tree} in {repo}")
+
+    response = await github.post(
+        url,
+        headers=_headers(token),
+        json={"message": message, "tree": tree, "parents": parents},
+    )
+    response.raise_for_status()
+    return response.json()["sha"]
+
+
+async def update_branch(repo: str, branch: str, sha: str, token: str) -> dict:
+    """
+    Move a branch to a new commit.
+
+    The update is never forced, GitHub rejects it with 422 if the branch moved
+    since its head was read, so concurrent changes are never overwritten.
+
+    Returns:
+    - dict: The updated reference.
+    """
+    url = f"{github.GITHUB_API_URL}/repos/{repo}/git/refs/heads/{branch}"
+    logger.info(f"Updating branch {branch} in {repo} to commit {sha}")
+
+    # Moving the branch to the same SHA again is a no-op, so the update is retried
+    response = await github.patch(
+        url, headers=_headers(token), json={"sha": sha, "force": False}, retry=True
+    )
+    response.raise_for_status()
+    return response.json()
+
+
+async def create_blob(repo: str, content: bytes, token: str) -> str:
+    """
+    Upload file content as a blob.
+
+    Returns:
+    - str: The SHA of the blob.
+    """
+    url = f"{github.GITHUB_API_URL}/repos/{repo}/git/blobs"
+    logger.info(f"Creating blob of {len(content)} bytes in {repo}")
+
+    # Blobs are content-addressed, uploading the same one twice is harmless
+    response = await github.post(
+        url,
+        headers=_headers(token),
+        json={"content": base64.b64encode(content).decode(), "encoding": "base64"},
+        retry=True,
+    )
+    response.raise_for_status()
+    return response.json()["sha"]
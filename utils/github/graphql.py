@@ -0,0 +1,120 @@
+from typing import Dict, List, Optional
+from core.utils.config import config
+from core.utils.logger import logger
+from app.utils.github import client as github
+from app.utils.github.blob_cache import blob_cache
+from app.utils.github.concurrency import gather_for_user
+
+GITHUB_GRAPHQL_URL = f"{github.GITHUB_API_URL}/graphql"
+
+github_api_config = config.get("GITHUB_API", {})
+
+
+class GraphQLError(Exception):
+    """Raised when GitHub answers a GraphQL query with errors only."""
+
+
+async def graphql_query(query: str, variables: dict, token: str) -> dict:
+    """
+    Run a GraphQL query against the GitHub API.
+
+    Args:
+    - query (str): The GraphQL query.
+    - variables (dict): The query variables.
+    - token (str): GitHub access token.
+
+    Returns:
+    - dict: The "data" member of the response.
+    """
+    # Queries only read, they are retried like GETs
+    response = await github.post(
+        GITHUB_GRAPHQL_URL,
+        headers={"Authorization": f"token {token}"},
+        json={"query": query, "variables": variables},
+        retry=True,
+    )
+    response.raise_for_status()
+    payload = response.json()
+
+    # Missing objects are reported as errors next to partial data
+    if payload.get("data") is None:
+        messages = [e.get("message") for e in payload.get("errors", [])]
+        raise GraphQLError(f"GraphQL query failed: {messages}")
+
+    return payload["data"]
+
+
+async def fetch_blobs(
+    repo: str, ref: Optional[str], paths: List[str], token: str
+) -> Dict[str, dict]:
+    """
+    Fetch many file blobs at a given ref with aliased object() lookups.
+
+    Paths are grouped graphql_batch_size per query and the queries run
+    concurrently. Files GraphQL can't return in full (missing, not a file,
+    binary or truncated) are left out of the result so callers can fall back
+    to the REST contents API for them.
+
+    Args:
+    - repo (str): The GitHub repository in the format 'owner/repo'.
+    - ref (Optional[str]): Branch, tag or commit SHA. Defaults to HEAD.
+    - paths (List[str]): The file paths to fetch.
+    - token (str): GitHub access token.
+
+    Returns:
+    - Dict[str, dict]: Blob "oid", "size" and "text" keyed by path.
+    """
+    owner, name = repo.split("/", 1)
+    batch_size = github_api_config.get("graphql_batch_size", 50)
+    unique_paths = list(dict.fromkeys(paths))
+    batches = [
+        unique_paths[i : i + batch_size]
+        for i in range(0, len(unique_paths), batch_size)
+    ]
+
+    async def fetch_batch(batch: List[str]) -> Dict[str, dict]:
+        variables = {"owner": owner, "name": name}
+        fields = []
+        for i, path in enumerate(batch):
+            variables[f"e{i}"] = f"{ref or 'HEAD'}:{path}"
+            fields.append(
+                f"f{i}: object(expression: $e{i}) {{ ... on Blob {{ oid byteSize isBinary isTruncated text }} }}"
+            )
+        declarations = "".join(f", $e{i}: String!" for i in range(len(batch)))
+        query = (
+            f"query($owner: String!, $name: String!{declarations}) {{ "
+            f"repository(owner: $owner, name: $name) {{ {' '.join(fields)} }} }}"
+        )
+
+        try:
+            data = await graphql_query(query, variables, token)
+        except Exception as e:
+            logger.warning(f"GraphQL blob batch failed, falling back to REST: {e}")
+            return {}
+
+        blobs = {}
+        for i, path in enumerate(batch):
+            blob = (data.get("repository") or {}).get(f"f{i}") or {}
+            if (
+                blob.get("text") is None
+                or blob.get("isBinary")
+                or blob.get("isTruncated")
+            ):
+                continue
+            blobs[path] = {
+                "oid": blob["oid"],
+                "size": blob["byteSize"],
+                "text": blob["text"],
+            }
+            blob_cache.put(blob["oid"], blob["text"].encode("utf-8"))
+        return blobs
+
+    logger.info(
+        f"Fetching {len(unique_paths)} blobs from {repo} at {ref or 'HEAD'} in {len(batches)} GraphQL queries"
+    )
+    results = await gather_for_user(token, (fetch_batch(b) for b in batches))
+
+    blobs = {}
+    for result in results:
+        blobs.update(result)
+    return blobs
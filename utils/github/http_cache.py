@@ -0,0 +1,116 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Optional
+import httpx
+from core.utils.config import config
+
+github_cache_config = config.get("GITHUB_CACHE", {})
+
+# Headers describing the wire encoding of the original body, the cached body
+# is already decoded
+SKIPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding"}
+
+
+class HttpCache:
+    """Conditional-request cache of GET responses keyed by token and URL."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def key(request: httpx.Request) -> str:
+        # Responses differ per user and per media type, never share them
+        parts = [
+            request.headers.get("authorization", ""),
+            request.headers.get("accept", ""),
+            str(request.url),
+        ]
+        return hashlib.sha256("\n".join(parts).encode()).hexdigest()
+
+    def add_validators(self, request: httpx.Request) -> Optional[dict]:
+        """
+        Add If-None-Match / If-Modified-Since to a GET request with a cached response.
+
+        Returns:
+        - Optional[dict]: The cached entry if the request was made conditional, kept
+          by the caller so a 304 is answered even if the entry is evicted meanwhile.
+        """
+        if request.method != "GET":
+            return None
+        if "if-none-match" in request.headers or "if-modified-since" in request.headers:
+            return None
+
+        key = self.key(request)
+        with self.lock:
+            entry = self.entries.get(key)
+        if entry is None:
+            return None
+
+        if entry["etag"]:
+            request.headers["If-None-Match"] = entry["etag"]
+        if entry["last_modified"]:
+            request.headers["If-Modified-Since"] = entry["last_modified"]
+        return entry
+
+    def cached_response(self, entry: dict, request: httpx.Request) -> httpx.Response:
+        """Rebuild the cached response after GitHub answered 304 Not Modified."""
+        key = self.key(request)
+        with self.lock:
+            if self.entries.get(key) is entry:
+                self.entries.move_to_end(key)
+
+        return httpx.Response(
+            status_code=entry["status_code"],
+            headers=entry["headers"],
+            content=entry["content"],
+            request=request,
+        )
+
+    def store(self, request: httpx.Request, response: httpx.Response):
+        """Keep a successful GET response that carries a validator."""
+        if request.method != "GET" or response.status_code != 200:
+            return
+
+        etag = response.headers.get("etag")
+        last_modified = response.headers.get("last-modified")
+        if not etag and not last_modified:
+            return
+
+        content = response.content
+        if len(content) > self.max_bytes:
+            return
+
+        key = self.key(request)
+        entry = {
+            "etag": etag,
+            "last_modified": last_modified,
+            "status_code": response.status_code,
+            "headers": [
+                (name, value)
+                for name, value in response.headers.items()
+                if name.lower() not in SKIPPED_HEADERS
+            ],
+            "content": content,
+        }
+
+        with self.lock:
+            previous = self.entries.pop(key, None)
+            if previous is not None:
+                self.current_bytes -= len(previous["content"])
+
+            self.entries[key] = entry
+            self.current_bytes += len(content)
+
+            # Evict least recently used responses until we are within budget
+            while self.current_bytes > self.max_bytes:
+                _, evicted = self.entries.popitem(last=False)
+                self.current_bytes -= len(evicted["content"])
+
+
+http_cache = HttpCache(
+    max_bytes=github_cache_config.get("http_cache_max_bytes", 32 * 1024 * 1024)
+)
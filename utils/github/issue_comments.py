@@ -0,0 +1,89 @@
+import math
+from collections import OrderedDict
+from typing import Dict, List, Optional
+import httpx
+from core.utils.config import config
+from core.utils.logger import logger
+from app.utils.github import client as github
+from app.utils.github.concurrency import gather_for_user
+
+github_cache_config = config.get("GITHUB_CACHE", {})
+
+PER_PAGE = 100
+
+# (token, comments_url) -> (issue updated_at, comments), scoped by token like the ref cache
+_comments_cache = OrderedDict()
+
+
+async def _fetch_comments_page(
+    comments_url: str, page: int, token: str
+) -> Optional[List[dict]]:
+    try:
+        response = await github.get(
+            comments_url,
+            headers={"Authorization": f"token {token}"},
+            params={"per_page": PER_PAGE, "page": page},
+        )
+        response.raise_for_status()
+        return response.json()
+    except httpx.HTTPError as e:
+        logger.error(f"Failed to fetch comments page {page} from {comments_url}: {e}")
+        return None
+
+
+async def get_issues_comments(issues: List[dict], token: str) -> Dict[str, List[dict]]:
+    """
+    Return every comment of a list of issues, fetching all their pages concurrently.
+
+    The number of pages is known from each issue's "comments" count, so all
+    pages of all issues are requested at once, max_concurrency_per_user at a
+    time. Comments are cached until the issue's "updated_at" changes.
+
+    Args:
+    - issues (List[dict]): Issues from the GitHub API, with "comments_url", "comments" and "updated_at".
+    - token (str): GitHub access token.
+
+    Returns:
+    - Dict[str, List[dict]]: The comments by comments_url. Issues whose comments failed to load are left out.
+    """
+    comments = {}
+    pages = []
+    for issue in issues:
+        comments_url = issue["comments_url"]
+        if not issue.get("comments"):
+            comments[comments_url] = []
+            continue
+
+        cached = _comments_cache.get((token, comments_url))
+        if cached and cached[0] == issue["updated_at"]:
+            _comments_cache.move_to_end((token, comments_url))
+            comments[comments_url] = cached[1]
+            continue
+
+        for page in range(1, math.ceil(issue["comments"] / PER_PAGE) + 1):
+            pages.append((issue, page))
+
+    logger.info(f"Fetching {len(pages)} comment pages concurrently")
+    results = await gather_for_user(
+        token, (_fetch_comments_page(i["comments_url"], p, token) for i, p in pages)
+    )
+
+    fetched = {}
+    for (issue, _), result in zip(pages, results):
+        entry = fetched.setdefault(issue["comments_url"], (issue, []))
+        if result is None or entry[1] is None:
+            fetched[issue["comments_url"]] = (issue, None)
+            continue
+        entry[1].extend(result)
+
+    max_entries = github_cache_config.get("comments_cache_max_entries", 512)
+    for comments_url, (issue, issue_comments) in fetched.items():
+        if issue_comments is None:
+            continue
+        comments[comments_url] = issue_comments
+        _comments_cache[(token, comments_url)] = (issue["updated_at"], issue_comments)
+        _comments_cache.move_to_end((token, comments_url))
+        while len(_comments_cache) > max_entries:
+            _comments_cache.popitem(last=False)
+
+    return comments
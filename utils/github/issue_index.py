@@ -0,0 +1,518 @@
+import asyncio
+import json
+import sqlite3
+import time
+from typing import Dict, List, Optional
+import httpx
+from core.utils.config import config
+from core.utils.env import EnvConfig
+from core.utils.logger import logger
+from app.middleware.github.database import ConnectionPool
+from app.utils.github import client as github
+from app.utils.github.branches import get_default_branch
+from app.utils.github.pagination import paginate
+from app.utils.github.rate_limit import bulk_priority
+
+issue_index_config = config.get("GITHUB_ISSUE_INDEX", {})
+database_config = config.get("DATABASE", {})
+
+ISSUE_INDEX_PATH = EnvConfig.get("ISSUE_INDEX_PATH")
+
+SORT_COLUMNS = {
+    "created": "created_at",
+    "updated": "updated_at",
+    "comments": "comments",
+}
+
+SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS issues (
+        repo TEXT NOT NULL,
+        number INTEGER NOT NULL,
+        id INTEGER NOT NULL,
+        title TEXT NOT NULL,
+        body TEXT NOT NULL,
+        state TEXT NOT NULL,
+        is_pull_request INTEGER NOT NULL,
+        labels TEXT NOT NULL,
+        assignees TEXT NOT NULL,
+        milestone TEXT,
+        author TEXT,
+        comments INTEGER NOT NULL,
+        html_url TEXT NOT NULL,
+        created_at TEXT NOT NULL,
+        updated_at TEXT NOT NULL,
+        UNIQUE (repo, number)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS comments (
+        id INTEGER PRIMARY KEY,
+        repo TEXT NOT NULL,
+        issue_number INTEGER NOT NULL,
+        body TEXT NOT NULL,
+        author TEXT,
+        html_url TEXT NOT NULL,
+        created_at TEXT NOT NULL,
+        updated_at TEXT NOT NULL
+    )
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_comments_issue
+    ON comments (repo, issue_number)
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS sync_state (
+        repo TEXT PRIMARY KEY,
+        issues_since TEXT,
+        comments_since TEXT
+    )
+    """,
+    # The full-text tables index the rows above, kept in step by triggers
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS issues_fts
+    USING fts5(title, body, content='issues', content_rowid='rowid')
+    """,
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS comments_fts
+    USING fts5(body, content='comments', content_rowid='id')
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS issues_ai AFTER INSERT ON issues BEGIN
+        INSERT INTO issues_fts (rowid, title, body) VALUES (new.rowid, new.title, new.body);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS issues_au AFTER UPDATE ON issues BEGIN
+        INSERT INTO issues_fts (issues_fts, rowid, title, body)
+        VALUES ('delete', old.rowid, old.title, old.body);
+        INSERT INTO issues_fts (rowid, title, body) VALUES (new.rowid, new.title, new.body);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS comments_ai AFTER INSERT ON comments BEGIN
+        INSERT INTO comments_fts (rowid, body) VALUES (new.id, new.body);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS comments_au AFTER UPDATE ON comments BEGIN
+        INSERT INTO comments_fts (comments_fts, rowid, body) VALUES ('delete', old.id, old.body);
+        INSERT INTO comments_fts (rowid, body) VALUES (new.id, new.body);
+    END
+    """,
+]
+
+
+def fts_query(query: str) -> str:
+    """Quote each word of a query, so FTS5 operators in user input are matched literally."""
+    return " ".join('"' + word.replace('"', '""') + '"' for word in query.split())
+
+
+def _issue_row(repo: str, issue: dict) -> tuple:
+    milestone = issue.get("milestone") or {}
+    return (
+        repo,
+        issue["number"],
+        issue["id"],
+        issue.get("title") or "",
+        issue.get("body") or "",
+        issue["state"],
+        int("pull_request" in issue),
+        json.dumps([label["name"] for label in issue.get("labels", [])]),
+        json.dumps([user["login"] for user in issue.get("assignees") or []]),
+        milestone.get("title"),
+        (issue.get("user") or {}).get("login"),
+        issue.get("comments", 0),
+        issue["html_url"],
+        issue["created_at"],
+        issue["updated_at"],
+    )
+
+
+def _comment_row(repo: str, comment: dict) -> tuple:
+    return (
+        comment["id"],
+        repo,
+        int(comment["issue_url"].rsplit("/", 1)[1]),
+        comment.get("body") or "",
+        (comment.get("user") or {}).get("login"),
+        comment["html_url"],
+        comment["created_at"],
+        comment["updated_at"],
+    )
+
+
+def _filters(
+    state: Optional[str],
+    labels: Optional[str],
+    assignee: Optional[str],
+    milestone: Optional[str],
+) -> tuple:
+    # Same meaning as the search qualifiers: any of the comma separated labels
+    clauses, params = ["repo = ?"], []
+    if state and state != "all":
+        clauses.append("state = ?")
+        params.append(state)
+    if labels:
+        clauses.append(
+            "EXISTS (SELECT 1 FROM json_each(issues.labels) WHERE value IN (SELECT value FROM json_each(?)))"
+        )
+        params.append(json.dumps([label.strip() for label in labels.split(",")]))
+    if assignee:
+        clauses.append(
+            "EXISTS (SELECT 1 FROM json_each(issues.assignees) WHERE value = ?)"
+        )
+        params.append(assignee)
+    if milestone:
+        clauses.append("milestone = ?")
+        params.append(milestone)
+    return " AND ".join(clauses), params
+
+
+class IssueIndex:
+    """
+    SQLite FTS5 index of the issues, pull requests and comments of repositories.
+
+    A repository is read in full once, then only the issues and comments
+    updated since the previous sync are listed, using the since parameter of
+    the list endpoints. Issues and comments deleted on GitHub stay indexed.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self.pool = ConnectionPool(
+            db_path,
+            size=database_config.get("pool_size", 5),
+            mmap_size=database_config.get("mmap_size", 64 * 1024 * 1024),
+            busy_timeout=database_config.get("busy_timeout", 5000),
+        )
+        self.locks: Dict[str, asyncio.Lock] = {}
+        self.synced_at: Dict[str, float] = {}
+        self._execute(self._create_schema)
+        logger.info(f"Issue index enabled at: {self.db_path}")
+
+    def _execute(self, operation, *args):
+        with self.pool.connection() as conn:
+            return operation(conn, *args)
+
+    async def _run(self, operation, *args):
+        # SQLite calls block, run them on a worker thread
+        return await asyncio.to_thread(self._execute, operation, *args)
+
+    @staticmethod
+    def _create_schema(conn: sqlite3.Connection):
+        for statement in SCHEMA:
+            conn.execute(statement)
+        conn.commit()
+
+    @staticmethod
+    def _read_state(conn: sqlite3.Connection, repo: str) -> tuple:
+        row = conn.execute(
+            "SELECT issues_since, comments_since FROM sync_state WHERE repo = ?",
+            (repo,),
+        ).fetchone()
+        return (row["issues_since"], row["comments_since"]) if row else (None, None)
+
+    @staticmethod
+    def _write_issues(conn: sqlite3.Connection, repo: str, rows: list, since: str):
+        conn.executemany(
+            """
+            INSERT INTO issues (repo, number, id, title, body, state, is_pull_request, labels,
+                assignees, milestone, author, comments, html_url, created_at, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (repo, number) DO UPDATE SET
+                id = excluded.id, title = excluded.title, body = excluded.body,
+                state = excluded.state, is_pull_request = excluded.is_pull_request,
+                labels = excluded.labels, assignees = excluded.assignees,
+                milestone = excluded.milestone, author = excluded.author,
+                comments = excluded.comments, html_url = excluded.html_url,
+                created_at = excluded.created_at, updated_at = excluded.updated_at
+            """,
+            rows,
+        )
+        conn.execute(
+            """
+            INSERT INTO sync_state (repo, issues_since) VALUES (?, ?)
+            ON CONFLICT (repo) DO UPDATE SET issues_since = excluded.issues_since
+            """,
+            (repo, since),
+        )
+        conn.commit()
+
+    @staticmethod
+    def _write_comments(conn: sqlite3.Connection, repo: str, rows: list, since: str):
+        conn.executemany(
+            """
+            INSERT INTO comments (id, repo, issue_number, body, author, html_url, created_at, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (id) DO UPDATE SET
+                body = excluded.body, author = excluded.author, html_url = excluded.html_url,
+                updated_at = excluded.updated_at
+            """,
+            rows,
+        )
+        conn.execute(
+            """
+            INSERT INTO sync_state (repo, comments_since) VALUES (?, ?)
+            ON CONFLICT (repo) DO UPDATE SET comments_since = excluded.comments_since
+            """,
+            (repo, since),
+        )
+        conn.commit()
+
+    async def _sync_list(
+        self,
+        repo: str,
+        url: str,
+        params: dict,
+        since: Optional[str],
+        token: str,
+        write,
+        to_row,
+    ) -> int:
+        # Oldest updates first, so the progress is saved after every batch
+        params = {**params, "sort": "updated", "direction": "asc", "per_page": 100}
+        if since:
+            params["since"] = since
+
+        batch_size = issue_index_config.get("batch_size", 500)
+        rows, synced = [], 0
+        async for item in paginate(url, token, params):
+            rows.append(to_row(repo, item))
+            since = max(since or "", item["updated_at"])
+            if len(rows) >= batch_size:
+                await self._run(write, repo, rows, since)
+                synced += len(rows)
+                rows = []
+        if rows:
+            await self._run(write, repo, rows, since)
+            synced += len(rows)
+        return synced
+
+    async def sync(self, repo: str, token: str, force: bool = False):
+        """
+        Bring the index of a repository up to date, at most every sync_interval seconds.
+
+        Raises:
+        - httpx.HTTPError: If the issues or comments can't be listed.
+        """
+        lock = self.locks.setdefault(repo, asyncio.Lock())
+        async with lock:
+            interval = issue_index_config.get("sync_interval", 60)
+            if (
+                not force
+                and time.monotonic() - self.synced_at.get(repo, -interval) < interval
+            ):
+                return
+
+            issues_since, comments_since = await self._run(self._read_state, repo)
+            started = time.monotonic()
+            base_url = f"{github.GITHUB_API_URL}/repos/{repo}/issues"
+            with bulk_priority():
+                issues, comments = await asyncio.gather(
+                    self._sync_list(
+                        repo,
+                        base_url,
+                        {"state": "all"},
+                        issues_since,
+                        token,
+                        self._write_issues,
+                        _issue_row,
+                    ),
+                    self._sync_list(
+                        repo,
+                        f"{base_url}/comments",
+                        {},
+                        comments_since,
+                        token,
+                        self._write_comments,
+                        _comment_row,
+                    ),
+                )
+
+            self.synced_at[repo] = time.monotonic()
+            logger.info(
+                f"Synced issue index of {repo}: {issues} issues and {comments} comments in {self.synced_at[repo] - started:.2f}s"
+            )
+
+    def _search(
+        self,
+        conn: sqlite3.Connection,
+        repo: str,
+        query: Optional[str],
+        filters: tuple,
+        with_comments: bool,
+        sort: Optional[str],
+        order: Optional[str],
+        offset: int,
+        limit: int,
+    ) -> List[dict]:
+        where, params = filters
+        descending = (order or "desc").lower() != "asc"
+
+        if not query:
+            column = SORT_COLUMNS.get(sort, "created_at")
+            rows = conn.execute(
+                f"""
+                SELECT * FROM issues WHERE {where}
+                ORDER BY {column} {'DESC' if descending else 'ASC'}, number DESC
+                LIMIT ? OFFSET ?
+                """,
+                (repo, *params, limit, offset),
+            ).fetchall()
+            return [dict(row) for row in rows]
+
+        match = fts_query(query)
+
+        # bm25 scores are negative, lower is a better match; titles weigh more
+        hits = {}
+        for row in conn.execute(
+            """
+            SELECT issues.number, bm25(issues_fts, 10.0, 1.0) AS rank,
+                snippet(issues_fts, -1, '**', '**', '...', 16) AS snippet
+            FROM issues_fts JOIN issues ON issues.rowid = issues_fts.rowid
+            WHERE issues_fts MATCH ? AND issues.repo = ?
+            """,
+            (match, repo),
+        ):
+            hits[row["number"]] = {"rank": row["rank"], "snippet": row["snippet"]}
+
+        comment_hits = {}
+        for row in conn.execute(
+            """
+            SELECT comments.id, comments.issue_number, comments.body, comments.html_url,
+                bm25(comments_fts) AS rank,
+                snippet(comments_fts, 0, '**', '**', '...', 16) AS snippet
+            FROM comments_fts JOIN comments ON comments.id = comments_fts.rowid
+            WHERE comments_fts MATCH ? AND comments.repo = ?
+            ORDER BY rank
+            """,
+            (match, repo),
+        ):
+            comment_hits.setdefault(row["issue_number"], []).append(dict(row))
+
+        # Issues match on their title, body or comments, like GitHub issue search
+        numbers = hits.keys() | comment_hits.keys()
+        issues = [
+            dict(row)
+            for row in conn.execute(
+                f"""
+                SELECT * FROM issues
+                WHERE {where} AND number IN (SELECT value FROM json_each(?))
+                """,
+                (repo, *params, json.dumps(list(numbers))),
+            )
+        ]
+
+        for issue in issues:
+            hit = hits.get(issue["number"], {})
+            comments = comment_hits.get(issue["number"], [])
+            ranks = ([hit["rank"]] if hit else []) + [c["rank"] for c in comments[:1]]
+            issue["rank"] = min(ranks)
+            issue["snippet"] = hit.get("snippet")
+            if with_comments:
+                issue["matching_comments"] = comments
+
+        if sort in SORT_COLUMNS:
+            issues.sort(key=lambda i: i[SORT_COLUMNS[sort]], reverse=descending)
+        else:
+            issues.sort(key=lambda i: i["rank"])
+        return issues[offset : offset + limit]
+
+    async def search(
+        self,
+        repo: str,
+        query: Optional[str] = None,
+        state: Optional[str] = None,
+        labels: Optional[str] = None,
+        assignee: Optional[str] = None,
+        milestone: Optional[str] = None,
+        with_comments: bool = False,
+        sort: Optional[str] = None,
+        order: Optional[str] = None,
+        offset: int = 0,
+        limit: int = 30,
+    ) -> List[dict]:
+        """
+        Return the indexed issues of a repository, ranked by relevance when there is a query.
+
+        Args:
+        - repo (str): The GitHub repository in the format 'owner/repo'.
+        - query (Optional[str]): Words the title, body or a comment must all contain.
+        - state, labels, assignee, milestone: Filters with the meaning of the search qualifiers.
+        - with_comments (bool): Return the matching comments of each issue as "matching_comments".
+        - sort (Optional[str]): 'created', 'updated' or 'comments', relevance or creation by default.
+        - order (Optional[str]): 'asc' or 'desc' (default).
+        - offset (int): Results to skip.
+        - limit (int): Maximum results to return.
+
+        Returns:
+        - List[dict]: Issue rows, with "rank" and "snippet" when there is a query.
+        """
+        return await self._run(
+            self._search,
+            repo,
+            query,
+            _filters(state, labels, assignee, milestone),
+            with_comments,
+            sort,
+            order,
+            offset,
+            limit,
+        )
+
+
+def format_issue(issue: dict) -> dict:
+    """Return an indexed issue with the fields the issue tools return."""
+    issue_data = {
+        "id": issue["id"],
+        "title": issue["title"],
+        "url": issue["html_url"],
+        "state": issue["state"],
+        "created_at": issue["created_at"],
+        "updated_at": issue["updated_at"],
+        "comments": issue["comments"],
+    }
+    if issue.get("snippet"):
+        issue_data["snippet"] = issue["snippet"]
+    return issue_data
+
+
+issue_index = IssueIndex(ISSUE_INDEX_PATH) if ISSUE_INDEX_PATH else None
+
+
+async def get_issue_index(repo: str, token: str) -> Optional[IssueIndex]:
+    """
+    Return the synced issue index of a repository, or None to use the GitHub API.
+
+    Only repositories listed in GITHUB_ISSUE_INDEX["repos"] are indexed, and
+    only when ISSUE_INDEX_PATH is set. The caller's access to the repository
+    is checked with the cached default branch lookup before the index is used.
+
+    Args:
+    - repo (str): The GitHub repository in the format 'owner/repo'.
+    - token (str): GitHub access token.
+
+    Returns:
+    - Optional[IssueIndex]: The index, or None if the repository isn't indexed or was never synced.
+    """
+    if issue_index is None or repo not in issue_index_config.get("repos", []):
+        return None
+
+    try:
+        await get_default_branch(repo, token)
+    except httpx.HTTPError as e:
+        logger.warning(
+            f"Not using the issue index of {repo}, repository not readable: {e}"
+        )
+        return None
+
+    try:
+        await issue_index.sync(repo, token)
+    except (httpx.HTTPError, sqlite3.Error) as e:
+        logger.warning(f"Failed to sync the issue index of {repo}: {e}")
+        # Serve from the previous sync if there was one
+        if repo not in issue_index.synced_at:
+            return None
+
+    return issue_index
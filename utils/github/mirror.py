@@ -0,0 +1,377 @@
+import asyncio
+import base64
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+import httpx
+from core.utils.config import config
+from core.utils.env import EnvConfig
+from core.utils.logger import logger
+from app.utils.github.branches import get_default_branch
+
+github_mirror_config = config.get("GITHUB_MIRROR", {})
+github_cache_config = config.get("GITHUB_CACHE", {})
+
+MIRROR_PATH = EnvConfig.get("MIRROR_PATH")
+
+# Sha of the empty tree, the base of root commits
+EMPTY_TREE_SHA = "4b825dc642cb6eb9a060e54bf8d69288fbee4904"
+
+STATUSES = {
+    "A": "added",
+    "M": "modified",
+    "D": "removed",
+    "R": "renamed",
+    "C": "copied",
+    "T": "changed",
+}
+
+
+class MirrorError(Exception):
+    """Raised when a git command on a local mirror fails."""
+
+
+async def _git(*args: str, input: Optional[bytes] = None, env: dict = None) -> bytes:
+    process = await asyncio.create_subprocess_exec(
+        "git",
+        *args,
+        stdin=asyncio.subprocess.PIPE if input is not None else None,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        env={**os.environ, "GIT_TERMINAL_PROMPT": "0", **(env or {})},
+    )
+    try:
+        stdout, stderr = await asyncio.wait_for(
+            process.communicate(input),
+            timeout=github_mirror_config.get("git_timeout", 300),
+        )
+    except asyncio.TimeoutError:
+        process.kill()
+        raise MirrorError(f"git {' '.join(args)} timed out")
+
+    if process.returncode != 0:
+        raise MirrorError(stderr.decode("utf-8", "replace").strip())
+    return stdout
+
+
+class GitMirror:
+    """
+    A local bare mirror of a GitHub repository, refreshed with git fetch.
+
+    Only branches and tags are mirrored. Reads go to the local object storage
+    and never use the GitHub API rate budget.
+    """
+
+    def __init__(self, repo: str, path: str):
+        self.repo = repo
+        self.path = path
+        self.last_fetch = 0.0  # When the latest successful fetch started
+        self.last_write = 0.0  # When it was last written to through this server
+        self.lock = asyncio.Lock()
+        self.trees = OrderedDict()
+
+    def _run(self, *args: str, **kwargs):
+        return _git("--git-dir", self.path, *args, **kwargs)
+
+    @staticmethod
+    def _auth_env(token: Optional[str]) -> dict:
+        if not token:
+            return {}
+        # Passed through the environment so the token never shows in the process list
+        credentials = base64.b64encode(f"x-access-token:{token}".encode()).decode()
+        return {
+            "GIT_CONFIG_COUNT": "1",
+            "GIT_CONFIG_KEY_0": "http.extraHeader",
+            "GIT_CONFIG_VALUE_0": f"Authorization: Basic {credentials}",
+        }
+
+    def is_stale(self) -> bool:
+        if self.last_write >= self.last_fetch:
+            return True  # Written to since the latest fetch started
+        return time.monotonic() - self.last_fetch > github_mirror_config.get(
+            "refresh_interval", 300
+        )
+
+    def mark_stale(self):
+        """Fetch again before the next read, the repository was written to."""
+        self.last_write = time.monotonic()
+
+    async def refresh(self, token: Optional[str], default_branch: Optional[str]):
+        """Create the mirror if needed and fetch the latest branches and tags."""
+        async with self.lock:
+            # Another call refreshed the mirror while we waited for the lock
+            if not self.is_stale():
+                return
+
+            if not os.path.exists(os.path.join(self.path, "HEAD")):
+                remote_url = github_mirror_config.get(
+                    "remote_url", "https://github.com/{repo}.git"
+                ).format(repo=self.repo)
+                logger.info(f"Creating mirror of {self.repo} at {self.path}")
+                await _git("init", "--bare", "--quiet", self.path)
+                await self._run("remote", "add", "origin", remote_url)
+                await self._run(
+                    "config", "remote.origin.fetch", "+refs/heads/*:refs/heads/*"
+                )
+                await self._run(
+                    "config", "--add", "remote.origin.fetch", "+refs/tags/*:refs/tags/*"
+                )
+
+            started = time.monotonic()
+            await self._run(
+                "fetch", "--prune", "--quiet", "origin", env=self._auth_env(token)
+            )
+            if default_branch:
+                await self._run("symbolic-ref", "HEAD", f"refs/heads/{default_branch}")
+
+            # A write made while fetching may be missing, so it still marks the mirror stale
+            self.last_fetch = started
+            logger.info(
+                f"Fetched mirror of {self.repo} in {time.monotonic() - started:.2f}s"
+            )
+
+    async def resolve(self, ref: Optional[str]) -> Optional[str]:
+        """Return the commit SHA of a branch, tag or commit, or None if unknown."""
+        try:
+            output = await self._run(
+                "rev-parse", "--verify", "--quiet", f"{ref or 'HEAD'}^{{commit}}"
+            )
+        except MirrorError:
+            return None
+        return output.decode().strip() or None
+
+    async def get_tree(self, commit: str) -> dict:
+        """
+        Return the recursive tree of a commit in the format of trees.get_tree.
+
+        Local trees are never truncated.
+        """
+        tree_sha = (await self._run("rev-parse", f"{commit}^{{tree}}")).decode().strip()
+        if tree_sha in self.trees:
+            self.trees.move_to_end(tree_sha)
+            return self.trees[tree_sha]
+
+        output = await self._run("ls-tree", "-r", "-t", "-l", "-z", tree_sha)
+        entries = {}
+        for line in output.decode("utf-8", "replace").split("\0"):
+            if not line:
+                continue
+            info, path = line.split("\t", 1)
+            mode, entry_type, sha, size = info.split()
+            entries[path] = {
+                "path": path,
+                "mode": mode,
+                "type": entry_type,
+                "sha": sha,
+                **({"size": int(size)} if size != "-" else {}),
+            }
+
+        tree = {"sha": tree_sha, "truncated": False, "entries": entries}
+        self.trees[tree_sha] = tree
+        while len(self.trees) > github_cache_config.get("tree_cache_max_entries", 32):
+            self.trees.popitem(last=False)
+        return tree
+
+    async def _cat_file(self, specs: List[str]) -> List[Optional[tuple]]:
+        # One (type, content) per spec, or None for objects that don't exist
+        if not specs:
+            return []
+
+        output = await self._run(
+            "cat-file", "--batch", input="".join(f"{spec}\n" for spec in specs).encode()
+        )
+
+        objects = []
+        offset = 0
+        for _ in specs:
+            header_end = output.index(b"\n", offset)
+            header = output[offset:header_end].decode("utf-8", "replace")
+            offset = header_end + 1
+            # "<spec> missing" or "<spec> ambiguous", the spec can contain spaces
+            if header.endswith((" missing", " ambiguous")):
+                objects.append(None)
+                continue
+
+            _, object_type, size = header.split(" ")
+            objects.append((object_type, output[offset : offset + int(size)]))
+            offset += int(size) + 1  # Content is followed by a newline
+        return objects
+
+    async def read_blobs(self, commit: str, paths: List[str]) -> Dict[str, bytes]:
+        """Return the content of files at a commit, files that don't exist are left out."""
+        objects = await self._cat_file(
+            [f"{commit}:{path.strip('/')}" for path in paths]
+        )
+        return {
+            path: obj[1]
+            for path, obj in zip(paths, objects)
+            if obj is not None and obj[0] == "blob"
+        }
+
+    async def read_objects(self, shas: List[str]) -> Dict[str, bytes]:
+        """Return the content of blobs by SHA, unknown SHAs are left out."""
+        objects = await self._cat_file(shas)
+        return {
+            sha: obj[1]
+            for sha, obj in zip(shas, objects)
+            if obj is not None and obj[0] == "blob"
+        }
+
+    async def get_commit(self, sha: str) -> Optional[dict]:
+        """
+        Return a commit with its changed files, in the shape of the REST commit API.
+
+        Returns:
+        - Optional[dict]: "sha", "parents", "commit" (message, author, committer) and "files", or None if unknown.
+        """
+        commit = await self.resolve(sha)
+        if commit is None:
+            return None
+
+        output = await self._run(
+            "show",
+            "-s",
+            "--format=%H%x00%P%x00%an%x00%ae%x00%aI%x00%cn%x00%ce%x00%cI%x00%B",
+            commit,
+        )
+        full_sha, parents, an, ae, ad, cn, ce, cd, message = output.decode(
+            "utf-8", "replace"
+        ).split("\0", 8)
+        parents = parents.split()
+
+        # Compare with the first parent like GitHub does, root commits with the empty tree
+        diff_args = [parents[0], full_sha] if parents else ["--root", full_sha]
+        statuses = await self._run(
+            "diff-tree", "-r", "-M", "-z", "--no-commit-id", "--name-status", *diff_args
+        )
+        numstat = await self._run(
+            "diff-tree", "-r", "-M", "-z", "--no-commit-id", "--numstat", *diff_args
+        )
+
+        files = []
+        fields = statuses.decode("utf-8", "replace").split("\0")
+        i = 0
+        while i < len(fields) - 1:
+            status = fields[i]
+            if status[0] in "RC":
+                previous, filename = fields[i + 1], fields[i + 2]
+                i += 3
+            else:
+                previous, filename = None, fields[i + 1]
+                i += 2
+            files.append(
+                {
+                    "filename": filename,
+                    "status": STATUSES.get(status[0], "modified"),
+                    **({"previous_filename": previous} if previous else {}),
+                }
+            )
+
+        counts = _parse_numstat(numstat)
+        for file in files:
+            additions, deletions = counts.get(file["filename"], (0, 0))
+            file.update(
+                additions=additions, deletions=deletions, changes=additions + deletions
+            )
+
+        return {
+            "sha": full_sha,
+            "parents": [{"sha": parent} for parent in parents],
+            "html_url": f"https://github.com/{self.repo}/commit/{full_sha}",
+            "commit": {
+                "message": message.rstrip("\n"),
+                "author": {"name": an, "email": ae, "date": ad},
+                "committer": {"name": cn, "email": ce, "date": cd},
+            },
+            "files": files,
+        }
+
+    async def get_patch(
+        self,
+        sha: str,
+        parent: Optional[str],
+        filename: str,
+        previous_filename: Optional[str] = None,
+    ) -> str:
+        """Return the diff hunks of a file in a commit, like the REST "patch" field."""
+        diff_args = [parent, sha] if parent else [EMPTY_TREE_SHA, sha]
+        # A rename is only paired with its source when both paths are in the pathspec
+        paths = [previous_filename, filename] if previous_filename else [filename]
+        output = await self._run("diff", "--no-color", "-M", *diff_args, "--", *paths)
+        text = output.decode("utf-8", "replace")
+        # GitHub leaves out the diff header, the patch starts at the first hunk
+        hunk_start = text.find("\n@@")
+        return text[hunk_start + 1 :].rstrip("\n") if hunk_start != -1 else ""
+
+
+def _parse_numstat(output: bytes) -> Dict[str, tuple]:
+    # "<added>\t<deleted>\t<path>\0", renames have an empty path then "<old>\0<new>\0"
+    counts = {}
+    fields = output.decode("utf-8", "replace").split("\0")
+    i = 0
+    while i < len(fields) - 1:
+        added, deleted, path = fields[i].split("\t", 2)
+        if path:
+            i += 1
+        else:
+            path = fields[i + 2]
+            i += 3
+        # Binary files are reported as "-"
+        counts[path] = (
+            int(added) if added.isdigit() else 0,
+            int(deleted) if deleted.isdigit() else 0,
+        )
+    return counts
+
+
+# Keyed by the mirror path, which changes with MIRROR_PATH
+_mirrors: Dict[str, GitMirror] = {}
+
+
+def mark_stale(repo: str):
+    """Have the mirrors of a repository fetched again before their next read."""
+    for mirror in _mirrors.values():
+        if mirror.repo == repo:
+            mirror.mark_stale()
+
+
+async def get_mirror(repo: str, token: str) -> Optional[GitMirror]:
+    """
+    Return the up to date local mirror of a repository, or None to use the GitHub API.
+
+    Only repositories listed in GITHUB_MIRROR["repos"] are mirrored, and only
+    when MIRROR_PATH is set. The caller's access to the repository is checked
+    with the cached default branch lookup before the shared mirror is used.
+
+    Args:
+    - repo (str): The GitHub repository in the format 'owner/repo'.
+    - token (str): GitHub access token.
+
+    Returns:
+    - Optional[GitMirror]: The mirror, or None if the repository isn't mirrored or can't be fetched.
+    """
+    if not MIRROR_PATH or repo not in github_mirror_config.get("repos", []):
+        return None
+
+    try:
+        default_branch = await get_default_branch(repo, token)
+    except httpx.HTTPError as e:
+        logger.warning(f"Not using the mirror of {repo}, repository not readable: {e}")
+        return None
+
+    path = os.path.join(MIRROR_PATH, *repo.split("/")) + ".git"
+    mirror = _mirrors.get(path)
+    if mirror is None:
+        mirror = _mirrors[path] = GitMirror(repo, path)
+
+    if mirror.is_stale():
+        try:
+            await mirror.refresh(token, default_branch)
+        except (MirrorError, OSError) as e:
+            logger.warning(f"Failed to refresh the mirror of {repo}: {e}")
+            # Serve from the previous fetch if there was one and nothing was written since
+            if mirror.last_write >= mirror.last_fetch:
+                return None
+
+    return mirror
@@ -0,0 +1,166 @@
+import math
+import re
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+import httpx
+from core.utils.config import config
+from core.utils.logger import logger
+from app.utils.github import client as github
+from app.utils.github.concurrency import gather_for_user
+from app.utils.github.rate_limit import bulk_priority
+
+github_api_config = config.get("GITHUB_API", {})
+
+LINK_PATTERN = re.compile(r'<([^>]+)>\s*;\s*rel="([^"]+)"')
+
+
+def parse_link_header(link_header: Optional[str]) -> Dict[str, str]:
+    """Return the URLs of a GitHub Link header keyed by rel ("next", "last", ...)."""
+    if not link_header:
+        return {}
+    return {rel: url for url, rel in LINK_PATTERN.findall(link_header)}
+
+
+def _page_number(url: Optional[str]) -> Optional[int]:
+    if not url:
+        return None
+    page = httpx.URL(url).params.get("page")
+    return int(page) if page and page.isdigit() else None
+
+
+async def _fetch_page(
+    url: str, headers: dict, params: Optional[dict], items_key: Optional[str]
+) -> Tuple[List, Dict[str, str]]:
+    logger.info(f"Fetching page from GitHub API with URL: {url} and params: {params}")
+    response = await github.get(url, headers=headers, params=params)
+    response.raise_for_status()  # Raise an error for bad responses (4xx or 5xx)
+
+    data = response.json()
+    items = data.get(items_key, []) if items_key else data
+    return items, parse_link_header(response.headers.get("link"))
+
+
+async def paginate(
+    url: str,
+    token: Optional[str],
+    params: Optional[dict] = None,
+    items_key: Optional[str] = None,
+    max_items: Optional[int] = None,
+    max_pages: Optional[int] = None,
+) -> AsyncIterator:
+    """
+    Iterate over the items of a paginated GitHub list endpoint.
+
+    Pages are requested lazily by following the Link rel="next" URL. Once
+    GitHub reports the last page number, the following pages are requested
+    concurrently in windows of max_concurrency_per_user pages, as bulk calls.
+
+    Args:
+    - url (str): The list endpoint URL.
+    - token (Optional[str]): GitHub access token.
+    - params (Optional[dict]): Query parameters of the first page.
+    - items_key (Optional[str]): Key holding the items when the response is an object (e.g. 'items' for search).
+    - max_items (Optional[int]): Stop after yielding this many items.
+    - max_pages (Optional[int]): Stop after fetching this many pages.
+
+    Yields:
+    - The items, in the order GitHub returns them.
+
+    Raises:
+    - httpx.HTTPError: If a page can't be fetched.
+    """
+    if max_items is not None and max_items < 1:
+        return
+
+    headers = {"Authorization": f"token {token}"} if token else {}
+    window_size = github_api_config.get("max_concurrency_per_user", 8)
+
+    items, links = await _fetch_page(url, headers, params, items_key)
+    page_size = len(items)
+    pages_fetched = 1
+    items_yielded = 0
+
+    while True:
+        for item in items:
+            yield item
+            items_yielded += 1
+            if max_items is not None and items_yielded >= max_items:
+                return
+
+        next_url = links.get("next")
+        if not next_url or not items:
+            return
+        if max_pages is not None and pages_fetched >= max_pages:
+            return
+
+        next_page = _page_number(next_url)
+        last_page = _page_number(links.get("last"))
+
+        if next_page is None or last_page is None:
+            # Page numbers unknown (e.g. cursor based), follow the links one by one
+            items, links = await _fetch_page(next_url, headers, None, items_key)
+            pages_fetched += 1
+            continue
+
+        # Only request the pages needed to reach the caps
+        pages_left = last_page - next_page + 1
+        if max_pages is not None:
+            pages_left = min(pages_left, max_pages - pages_fetched)
+        if max_items is not None and page_size:
+            pages_left = min(
+                pages_left, math.ceil((max_items - items_yielded) / page_size)
+            )
+        window = min(pages_left, window_size)
+
+        page_urls = [
+            str(httpx.URL(next_url).copy_set_param("page", page))
+            for page in range(next_page, next_page + window)
+        ]
+        # Page windows yield to interactive calls when the rate limit runs low
+        with bulk_priority():
+            pages = await gather_for_user(
+                token,
+                (
+                    _fetch_page(page_url, headers, None, items_key)
+                    for page_url in page_urls
+                ),
+            )
+        pages_fetched += len(pages)
+
+        items = [item for page_items, _ in pages for item in page_items]
+        links = pages[-1][1]
+
+
+async def collect_pages(
+    url: str,
+    token: Optional[str],
+    params: Optional[dict] = None,
+    items_key: Optional[str] = None,
+    max_items: Optional[int] = None,
+) -> List:
+    """
+    Collect the items of a paginated GitHub list endpoint into a list.
+
+    Without max_items only the requested page is fetched, like a plain GET,
+    with it pages are followed until max_items items are collected.
+
+    Args:
+    - url (str): The list endpoint URL.
+    - token (Optional[str]): GitHub access token.
+    - params (Optional[dict]): Query parameters of the first page.
+    - items_key (Optional[str]): Key holding the items when the response is an object (e.g. 'items' for search).
+    - max_items (Optional[int]): Maximum number of items to collect across pages.
+
+    Returns:
+    - List: The collected items.
+    """
+    return [
+        item
+        async for item in paginate(
+            url,
+            token,
+            params=params,
+            items_key=items_key,
+            max_items=max_items,
+            max_pages=None if max_items is not None else 1,
+        )
+    ]
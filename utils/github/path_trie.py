@@ -0,0 +1,152 @@
+from fnmatch import fnmatchcase
+from typing import Dict, Iterator, List, Optional
+
+
+class TrieNode:
+    """A path segment with its git tree entry and its children by name."""
+
+    __slots__ = ("children", "entry")
+
+    def __init__(self):
+        self.children: Dict[str, "TrieNode"] = {}
+        self.entry: Optional[dict] = None
+
+
+class PathTrie:
+    """
+    Index of a git tree by path segment.
+
+    Looking up a folder, listing its children to a given depth or matching a
+    glob only visits the nodes under the matching paths, never the whole tree.
+    """
+
+    def __init__(self, entries: Optional[List[dict]] = None):
+        self.root = TrieNode()
+        for entry in entries or []:
+            self.insert(entry)
+
+    @staticmethod
+    def _segments(path: str) -> List[str]:
+        return [segment for segment in path.strip("/").split("/") if segment]
+
+    def insert(self, entry: dict):
+        """Add a tree entry (with "path", "type", "size", ...) to the trie."""
+        node = self.root
+        for segment in self._segments(entry["path"]):
+            child = node.children.get(segment)
+            if child is None:
+                child = node.children[segment] = TrieNode()
+            node = child
+        node.entry = entry
+
+    def node(self, path: str) -> Optional[TrieNode]:
+        """Return the node of a path, or None if the path isn't in the tree."""
+        node = self.root
+        for segment in self._segments(path):
+            node = node.children.get(segment)
+            if node is None:
+                return None
+        return node
+
+    def walk(self, path: str = "", max_depth: Optional[int] = None) -> Iterator[dict]:
+        """
+        Yield the entries below a folder, parents before their children.
+
+        Args:
+        - path (str): The folder to list, the repository root by default.
+        - max_depth (Optional[int]): Levels to descend, 1 lists direct children only. None is unlimited.
+        """
+        start = self.node(path)
+        if start is None:
+            return
+
+        stack = [(start, 0)]
+        while stack:
+            node, depth = stack.pop()
+            if node is not start and node.entry is not None:
+                yield node.entry
+            if max_depth is not None and depth >= max_depth:
+                continue
+            # Pushed in reverse so children come out in name order
+            for name in sorted(node.children, reverse=True):
+                stack.append((node.children[name], depth + 1))
+
+    def glob(
+        self, pattern: str, path: str = "", max_depth: Optional[int] = None
+    ) -> Iterator[dict]:
+        """
+        Yield the entries below a folder whose relative path matches a glob.
+
+        Segments are matched with fnmatch, "**" matches any number of folders.
+        Literal segments are plain dictionary lookups.
+
+        Args:
+        - pattern (str): The glob, relative to the folder (e.g. 'src/**/*.py').
+        - path (str): The folder the pattern is relative to, the repository root by default.
+        - max_depth (Optional[int]): Maximum levels below the folder. None is unlimited.
+        """
+        start = self.node(path)
+        if start is None:
+            return
+
+        seen = set()
+        for entry in self._match(start, self._segments(pattern), 0, max_depth):
+            # "**" can reach the same entry through several routes
+            if entry["path"] not in seen:
+                seen.add(entry["path"])
+                yield entry
+
+    def _match(
+        self,
+        node: TrieNode,
+        segments: List[str],
+        depth: int,
+        max_depth: Optional[int],
+    ) -> Iterator[dict]:
+        if not segments:
+            if node.entry is not None and depth > 0:
+                yield node.entry
+            return
+
+        segment, rest = segments[0], segments[1:]
+        if segment == "**":
+            # Match zero folders, then one more level with the same pattern
+            yield from self._match(node, rest, depth, max_depth)
+            if max_depth is not None and depth >= max_depth:
+                return
+            for name in sorted(node.children):
+                yield from self._match(
+                    node.children[name], segments, depth + 1, max_depth
+                )
+            return
+
+        if max_depth is not None and depth >= max_depth:
+            return
+        if any(char in segment for char in "*?["):
+            for name in sorted(node.children):
+                if fnmatchcase(name, segment):
+                    yield from self._match(
+                        node.children[name], rest, depth + 1, max_depth
+                    )
+        else:
+            child = node.children.get(segment)
+            if child is not None:
+                yield from self._match(child, rest, depth + 1, max_depth)
+
+
+def glob_match(pattern: str, path: str) -> bool:
+    """Return whether a relative path matches a glob with the PathTrie.glob rules."""
+    pattern_segments = PathTrie._segments(pattern)
+    path_segments = PathTrie._segments(path)
+
+    def match(i: int, j: int) -> bool:
+        if i == len(pattern_segments):
+            return j == len(path_segments)
+        if pattern_segments[i] == "**":
+            # Match zero folders, or consume one and try again
+            return match(i + 1, j) or (j < len(path_segments) and match(i, j + 1))
+        return j < len(path_segments) and (
+            fnmatchcase(path_segments[j], pattern_segments[i]) and match(i + 1, j + 1)
+        )
+
+    return match(0, 0)
@@ -0,0 +1,224 @@
+import asyncio
+import contextvars
+import email.utils
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+import httpx
+from core.utils.config import config
+from core.utils.logger import logger
+
+rate_limit_config = config.get("GITHUB_RATE_LIMIT", {})
+
+INTERACTIVE = "interactive"
+BULK = "bulk"
+
+# Priority of the calls made in the current task, inherited by the tasks it starts
+request_priority = contextvars.ContextVar("request_priority", default=INTERACTIVE)
+
+
+@contextmanager
+def bulk_priority():
+    """Mark the GitHub calls made in this block as bulk, yielding to interactive calls."""
+    token = request_priority.set(BULK)
+    try:
+        yield
+    finally:
+        request_priority.reset(token)
+
+
+def resource_of(request: httpx.Request) -> str:
+    """Return the rate limit resource a request is counted against."""
+    path = request.url.path
+    if path.startswith("/search/"):
+        return "search"
+    if path == "/graphql":
+        return "graphql"
+    return "core"
+
+
+def _retry_after(response: httpx.Response) -> Optional[float]:
+    value = response.headers.get("retry-after")
+    if value is None:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        # Retry-After can also be an HTTP date
+        parsed = email.utils.parsedate_to_datetime(value)
+        return max(parsed.timestamp() - time.time(), 0.0) if parsed else None
+
+
+class RateLimitBucket:
+    """Rate limit budget of one token for one resource, as last reported by GitHub."""
+
+    def __init__(self):
+        self.limit: Optional[int] = None
+        self.remaining: Optional[int] = None
+        self.reset = 0.0  # Epoch seconds when the budget is restored
+        self.blocked_until = 0.0  # Set by Retry-After and secondary limits
+        self.secondary_backoff = 0.0
+        self.in_flight = 0
+        self.next_slot = 0.0
+        self.interactive_waiting = 0
+
+    def delay(self, priority: str, now: float) -> float:
+        """Return how long a call must wait before it can be sent, 0 if it can go now."""
+        if self.blocked_until > now:
+            return self.blocked_until - now
+        if self.remaining is None or self.reset <= now:
+            return 0.0  # Budget unknown or already restored
+
+        available = self.remaining - self.in_flight
+        if available <= 0:
+            return self.reset - now
+
+        if priority == BULK:
+            # Bulk calls leave a reserve to interactive calls and let them go first
+            reserve = (self.limit or 0) * rate_limit_config.get("bulk_reserve", 0.1)
+            if available <= reserve:
+                return self.reset - now
+            if self.interactive_waiting:
+                return rate_limit_config.get("poll_interval", 0.05)
+
+        # Spread the last part of the budget evenly until the reset
+        if self._pacing(available):
+            return max(self.next_slot - now, 0.0)
+        return 0.0
+
+    def _pacing(self, available: int) -> bool:
+        return available <= (self.limit or 0) * rate_limit_config.get("pace_below", 0.1)
+
+    def reserve(self, now: float):
+        self.in_flight += 1
+        if self.remaining is None or self.reset <= now:
+            return
+        available = self.remaining - self.in_flight
+        if self._pacing(available):
+            interval = (self.reset - now) / max(available, 1)
+            self.next_slot = max(self.next_slot, now) + interval
+
+    def update(self, response: httpx.Response, now: float):
+        headers = response.headers
+        try:
+            if "x-ratelimit-remaining" in headers:
+                self.remaining = int(headers["x-ratelimit-remaining"])
+                self.limit = int(headers.get("x-ratelimit-limit", self.limit or 0))
+                self.reset = float(headers.get("x-ratelimit-reset", self.reset))
+        except ValueError:
+            pass
+
+        if response.status_code not in (403, 429):
+            self.secondary_backoff = 0.0
+            return
+
+        retry_after = _retry_after(response)
+        if retry_after is not None:
+            self.blocked_until = max(self.blocked_until, now + retry_after)
+        elif self.remaining == 0 and self.reset > now:
+            self.blocked_until = max(self.blocked_until, self.reset)
+        elif response.status_code == 429 or "secondary rate limit" in response.text:
+            # No hint from GitHub, wait at least a minute and double on repeats
+            self.secondary_backoff = min(
+                max(
+                    self.secondary_backoff * 2,
+                    rate_limit_config.get("secondary_backoff", 60),
+                ),
+                rate_limit_config.get("max_secondary_backoff", 900),
+            )
+            self.blocked_until = max(self.blocked_until, now + self.secondary_backoff)
+        else:
+            return  # A permission error, not a rate limit
+
+        logger.warning(
+            f"GitHub rate limit hit ({response.status_code}), calls paused for {self.blocked_until - now:.0f}s"
+        )
+
+
+class RateLimitGovernor:
+    """
+    Paces the GitHub calls of each token per rate limit resource (core, search, graphql).
+
+    The budget is read from the X-RateLimit headers of every response. Calls
+    wait while the budget is spent or a Retry-After or secondary limit is in
+    effect, and are spread evenly over the time left once the budget runs low.
+    Bulk calls keep a reserve for interactive calls and let them go first.
+    """
+
+    def __init__(self):
+        self.buckets: Dict[tuple, RateLimitBucket] = {}
+
+    def bucket(self, request: httpx.Request) -> RateLimitBucket:
+        key = (request.headers.get("authorization", ""), resource_of(request))
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            bucket = self.buckets[key] = RateLimitBucket()
+        return bucket
+
+    async def acquire(self, request: httpx.Request) -> Optional[httpx.Response]:
+        """
+        Wait until a request can be sent within the rate limit, and reserve its call.
+
+        Returns:
+        - Optional[httpx.Response]: None once the request can be sent, or a 429 response
+          if it would have to wait longer than max_wait seconds.
+        """
+        if not rate_limit_config.get("enabled", True):
+            return None
+
+        bucket = self.bucket(request)
+        priority = request_priority.get()
+        max_wait = rate_limit_config.get("max_wait", 60)
+        waited = 0.0
+
+        if priority == INTERACTIVE:
+            bucket.interactive_waiting += 1
+        try:
+            while True:
+                now = time.time()
+                delay = bucket.delay(priority, now)
+                if delay <= 0:
+                    bucket.reserve(now)
+                    return None
+
+                if waited + delay > max_wait:
+                    return self._limited_response(request, delay)
+
+                if not waited:
+                    logger.info(
+                        f"Pacing {priority} GitHub call to {request.url.path} for up to {delay:.2f}s"
+                    )
+                step = min(delay, rate_limit_config.get("max_sleep", 1.0))
+                await asyncio.sleep(step)
+                waited += step
+        finally:
+            if priority == INTERACTIVE:
+                bucket.interactive_waiting -= 1
+
+    def release(self, request: httpx.Request, response: Optional[httpx.Response]):
+        """Record the rate limit headers of a response and free the reserved call."""
+        if not rate_limit_config.get("enabled", True):
+            return
+
+        bucket = self.bucket(request)
+        bucket.in_flight = max(bucket.in_flight - 1, 0)
+        if response is not None:
+            bucket.update(response, time.time())
+
+    @staticmethod
+    def _limited_response(request: httpx.Request, delay: float) -> httpx.Response:
+        resource = resource_of(request)
+        logger.warning(
+            f"GitHub {resource} rate limit exhausted, not sending {request.url.path}"
+        )
+        return httpx.Response(
+            429,
+            headers={"Retry-After": str(int(delay) + 1)},
+            json={
+                "message": f"GitHub API {resource} rate limit exceeded, retry in {int(delay) + 1} seconds."
+            },
+            request=request,
+        )
+
+
+rate_limiter = RateLimitGovernor()
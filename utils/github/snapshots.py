@@ -0,0 +1,402 @@
+import asyncio
+import hashlib
+import json
+import os
+import re
+import tarfile
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+import httpx
+from core.utils.config import config
+from core.utils.env import EnvConfig
+from core.utils.logger import logger
+from app.utils.github import client as github
+from app.utils.github.branches import get_default_branch
+
+snapshot_config = config.get("GITHUB_SNAPSHOT", {})
+
+SNAPSHOT_PATH = EnvConfig.get("SNAPSHOT_PATH")
+
+COMMIT_SHA_PATTERN = re.compile(r"^[0-9a-f]{40}$")
+
+
+class SnapshotError(Exception):
+    """Raised when a repository snapshot can't be downloaded."""
+
+
+class SnapshotStore:
+    """
+    Disk store of repository snapshots, downloaded once per commit as a tarball.
+
+    Files are stored content-addressed by their git blob SHA, so commits
+    sharing files share their storage, and each snapshot keeps a manifest of
+    its paths. Least recently used snapshots are evicted, with the blobs no
+    other snapshot uses, once the store is over max_bytes.
+    """
+
+    def __init__(self, path: str, max_bytes: int):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.manifests = OrderedDict()  # (repo, commit) -> {path: entry}
+        self.blob_sizes: Dict[str, int] = {}
+        self.blob_refs: Dict[str, int] = {}
+        # Holds on the blobs of snapshots being extracted, which are never evicted
+        self.pending: Dict[str, int] = {}
+        # Guards the blob bookkeeping and files, blobs are stored from worker threads
+        self.blob_lock = threading.Lock()
+        self.locks: Dict[tuple, asyncio.Lock] = {}
+
+        os.makedirs(os.path.join(self.path, "blobs"), exist_ok=True)
+        self._load_manifests()
+        logger.info(
+            f"Snapshot store enabled at: {self.path} with {len(self.manifests)} snapshots, {self.current_bytes} bytes"
+        )
+
+    def _blob_file(self, sha: str) -> str:
+        return os.path.join(self.path, "blobs", sha[:2], sha)
+
+    def _manifest_file(self, repo: str, commit: str) -> str:
+        return os.path.join(self.path, "manifests", *repo.split("/"), f"{commit}.json")
+
+    def _load_manifests(self):
+        # Rebuild the index of the snapshots kept from a previous run, oldest first
+        files = []
+        for folder, _, names in os.walk(os.path.join(self.path, "manifests")):
+            files.extend(
+                os.path.join(folder, name) for name in names if name.endswith(".json")
+            )
+
+        for manifest_file in sorted(files, key=os.path.getmtime):
+            try:
+                with open(manifest_file) as f:
+                    data = json.load(f)
+                self._register(data["repo"], data["commit"], data["entries"])
+            except (OSError, ValueError, KeyError) as e:
+                logger.warning(f"Ignoring unreadable snapshot {manifest_file}: {e}")
+
+    def _register(self, repo: str, commit: str, entries: Dict[str, dict]):
+        with self.blob_lock:
+            for entry in entries.values():
+                sha = entry["sha"]
+                if sha not in self.blob_refs:
+                    self.blob_sizes[sha] = entry["size"]
+                    self.current_bytes += entry["size"]
+                self.blob_refs[sha] = self.blob_refs.get(sha, 0) + 1
+            self.manifests[(repo, commit)] = entries
+
+    def _evict(self):
+        # The most recent snapshot is always kept, even over budget
+        with self.blob_lock:
+            while self.current_bytes > self.max_bytes and len(self.manifests) > 1:
+                (repo, commit), entries = self.manifests.popitem(last=False)
+                logger.info(f"Evicting snapshot of {repo}@{commit}")
+                try:
+                    os.remove(self._manifest_file(repo, commit))
+                except OSError:
+                    pass
+
+                for entry in entries.values():
+                    sha = entry["sha"]
+                    self.blob_refs[sha] -= 1
+                    if self.blob_refs[sha] or sha in self.pending:
+                        continue
+                    del self.blob_refs[sha]
+                    self.current_bytes -= self.blob_sizes.pop(sha)
+                    try:
+                        os.remove(self._blob_file(sha))
+                    except OSError:
+                        pass
+
+    def _release(self, shas: set):
+        """Drop the hold of a finished extraction, deleting the blobs no snapshot uses."""
+        with self.blob_lock:
+            for sha in shas:
+                self.pending[sha] -= 1
+                if self.pending[sha]:
+                    continue
+                del self.pending[sha]
+                if self.blob_refs.get(sha):
+                    continue
+                # Unused, either never registered or evicted while it was held
+                if sha in self.blob_refs:
+                    del self.blob_refs[sha]
+                    self.current_bytes -= self.blob_sizes.pop(sha)
+                try:
+                    os.remove(self._blob_file(sha))
+                except OSError:
+                    pass
+
+    def _store_blob(self, fileobj, size: int, stored: set) -> str:
+        # Hash while copying to a temp file, the archive is never held in memory
+        chunk_size = snapshot_config.get("chunk_size", 1024 * 1024)
+        digest = hashlib.sha1(f"blob {size}\0".encode())
+        fd, tmp_file = tempfile.mkstemp(dir=os.path.join(self.path, "blobs"))
+        try:
+            with os.fdopen(fd, "wb") as f:
+                while True:
+                    chunk = fileobj.read(chunk_size)
+                    if not chunk:
+                        break
+                    digest.update(chunk)
+                    f.write(chunk)
+
+            sha = digest.hexdigest()
+            blob_file = self._blob_file(sha)
+            # Held before it is stored, so the loop can't evict or release it meanwhile
+            with self.blob_lock:
+                if sha not in stored:
+                    stored.add(sha)
+                    self.pending[sha] = self.pending.get(sha, 0) + 1
+                if os.path.exists(blob_file):
+                    os.remove(tmp_file)
+                else:
+                    os.makedirs(os.path.dirname(blob_file), exist_ok=True)
+                    os.replace(tmp_file, blob_file)
+            return sha
+        except BaseException:
+            if os.path.exists(tmp_file):
+                os.remove(tmp_file)
+            raise
+
+    def _extract(self, archive: str, stored: set) -> Dict[str, dict]:
+        """
+        Stream the members of a tarball into the blob store, returning the manifest.
+
+        The stored blob SHAs are added to stored and held as pending until released.
+        """
+        entries = {}
+        with tarfile.open(archive, mode="r|gz") as tar:
+            for member in tar:
+                # Members are prefixed with a "<owner>-<repo>-<sha>/" folder
+                path = member.name.partition("/")[2]
+                if not path:
+                    continue
+
+                if member.isfile():
+                    mode = "100755" if member.mode & 0o111 else "100644"
+                    sha = self._store_blob(tar.extractfile(member), member.size, stored)
+                    size = member.size
+                elif member.issym():
+                    # Git stores symbolic links as blobs holding their target
+                    mode = "120000"
+                    target = member.linkname.encode()
+                    sha = self._store_blob(_BytesReader(target), len(target), stored)
+                    size = len(target)
+                else:
+                    continue
+
+                entries[path] = {
+                    "path": path,
+                    "mode": mode,
+                    "type": "blob",
+                    "sha": sha,
+                    "size": size,
+                }
+        return entries
+
+    async def _download(
+        self, repo: str, commit: str, token: str, stored: set
+    ) -> Dict[str, dict]:
+        url = f"{github.GITHUB_API_URL}/repos/{repo}/tarball/{commit}"
+        logger.info(f"Downloading snapshot of {repo}@{commit} from URL: {url}")
+
+        # The archive is spooled to disk, then extracted member by member
+        fd, archive = tempfile.mkstemp(dir=self.path, suffix=".tar.gz")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                async with github.stream(
+                    "GET", url, headers={"Authorization": f"token {token}"}
+                ) as response:
+                    response.raise_for_status()
+                    async for chunk in response.aiter_bytes(
+                        snapshot_config.get("chunk_size", 1024 * 1024)
+                    ):
+                        f.write(chunk)
+
+            extraction = asyncio.ensure_future(
+                asyncio.to_thread(self._extract, archive, stored)
+            )
+            try:
+                return await asyncio.shield(extraction)
+            except asyncio.CancelledError:
+                # The worker can't be stopped, its blobs are released once it is done
+                await asyncio.wait([extraction])
+                raise
+        finally:
+            os.remove(archive)
+
+    async def get(self, repo: str, commit: str, token: str) -> Dict[str, dict]:
+        """
+        Return the manifest of a commit, downloading its tarball on first use.
+
+        Args:
+        - repo (str): The GitHub repository in the format 'owner/repo'.
+        - commit (str): The commit SHA.
+        - token (str): GitHub access token.
+
+        Returns:
+        - Dict[str, dict]: The files of the commit by path, with "mode", "sha" and "size".
+        """
+        key = (repo, commit)
+        lock = self.locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            if key in self.manifests:
+                self.locks.pop(key, None)
+                self.manifests.move_to_end(key)
+                return self.manifests[key]
+
+            # The lock is kept until the snapshot is registered, so callers
+            # arriving meanwhile wait for it instead of downloading it again
+            stored = set()
+            try:
+                try:
+                    entries = await self._download(repo, commit, token, stored)
+                except (httpx.HTTPError, tarfile.TarError, OSError) as e:
+                    raise SnapshotError(
+                        f"Failed to download snapshot of {repo}@{commit}: {e}"
+                    )
+
+                manifest_file = self._manifest_file(repo, commit)
+                os.makedirs(os.path.dirname(manifest_file), exist_ok=True)
+                with open(manifest_file, "w") as f:
+                    json.dump({"repo": repo, "commit": commit, "entries": entries}, f)
+
+                self._register(repo, commit, entries)
+            finally:
+                # Also after a failure, so its blobs don't stay pending for good
+                self._release(stored)
+                self.locks.pop(key, None)
+
+            self._evict()
+
+            logger.info(
+                f"Stored snapshot of {repo}@{commit} with {len(entries)} files, store is {self.current_bytes} bytes"
+            )
+            return entries
+
+    def read(self, sha: str) -> Optional[bytes]:
+        """Return the content of a stored blob, or None if it isn't stored."""
+        try:
+            with open(self._blob_file(sha), "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+
+class _BytesReader:
+    def __init__(self, content: bytes):
+        self.content = content
+
+    def read(self, size: int = -1) -> bytes:
+        chunk, self.content = self.content[:size], self.content[size:]
+        return chunk
+
+
+snapshot_store = (
+    SnapshotStore(SNAPSHOT_PATH, snapshot_config.get("max_bytes", 1024 * 1024 * 1024))
+    if SNAPSHOT_PATH
+    else None
+)
+
+
+async def resolve_commit(repo: str, ref: Optional[str], token: str) -> Optional[str]:
+    """
+    Return the commit SHA of a branch, tag or commit, or None if it doesn't exist.
+
+    Raises:
+    - SnapshotError: If the repository can't be read.
+    """
+    try:
+        ref = ref or await get_default_branch(repo, token)
+        if COMMIT_SHA_PATTERN.match(ref):
+            return ref
+
+        # The sha media type answers with the bare SHA, revalidated with its ETag
+        response = await github.get(
+            f"{github.GITHUB_API_URL}/repos/{repo}/commits/{ref}",
+            headers={
+                "Authorization": f"token {token}",
+                "Accept": "application/vnd.github.sha",
+            },
+        )
+        if response.status_code in (404, 422):
+            return None
+        response.raise_for_status()
+        return response.text.strip()
+    except httpx.HTTPError as e:
+        raise SnapshotError(f"Failed to resolve {repo}@{ref}: {e}")
+
+
+class Snapshot:
+    """The files of a repository at a commit, read from the snapshot store."""
+
+    def __init__(self, repo: str, commit: str, entries: Dict[str, dict]):
+        self.repo = repo
+        self.commit = commit
+        self.entries = entries
+
+    def read_files(self, paths: List[str]) -> Dict[str, bytes]:
+        """Return the content of files by path, files that aren't stored are left out."""
+        contents = {}
+        for path in paths:
+            entry = self.entries.get(path.strip("/"))
+            content = snapshot_store.read(entry["sha"]) if entry else None
+            if content is not None:
+                contents[path] = content
+        return contents
+
+
+async def get_snapshot(repo: str, ref: Optional[str], token: str) -> Optional[Snapshot]:
+    """
+    Return the snapshot of a repository at a ref, or None if snapshots are disabled or the ref doesn't exist.
+
+    Snapshots are enabled with SNAPSHOT_PATH and shared by commit SHA. The
+    caller's access to the repository is checked before a stored snapshot is served.
+
+    Args:
+    - repo (str): The GitHub repository in the format 'owner/repo'.
+    - ref (Optional[str]): Branch, tag or commit SHA. Defaults to the default branch.
+    - token (str): GitHub access token.
+
+    Raises:
+    - SnapshotError: If the repository can't be read or the tarball downloaded.
+    """
+    if snapshot_store is None:
+        return None
+
+    try:
+        await get_default_branch(repo, token)  # Cached per token
+    except httpx.HTTPError as e:
+        raise SnapshotError(f"Failed to read repository {repo}: {e}")
+
+    commit = await resolve_commit(repo, ref, token)
+    if commit is None:
+        return None
+
+    return Snapshot(repo, commit, await snapshot_store.get(repo, commit, token))
+
+
+class SnapshotSource:
+    """Snapshots of a repository as a CodeIndex source, like GitMirror."""
+
+    def __init__(self, repo: str, token: str):
+        self.repo = repo
+        self.token = token
+
+    async def resolve(self, ref: Optional[str]) -> Optional[str]:
+        return await resolve_commit(self.repo, ref, self.token)
+
+    async def get_tree(self, commit: str) -> dict:
+        entries = await snapshot_store.get(self.repo, commit, self.token)
+        return {"sha": commit, "truncated": False, "entries": entries}
+
+    async def read_objects(self, shas: List[str]) -> Dict[str, bytes]:
+        contents = await asyncio.to_thread(
+            lambda: {sha: snapshot_store.read(sha) for sha in shas}
+        )
+        return {
+            sha: content for sha, content in contents.items() if content is not None
+        }
@@ -0,0 +1,399 @@
+import re
+import time
+from collections import OrderedDict
+from typing import AsyncIterator, List, Optional
+from core.utils.config import config
+from core.utils.logger import logger
+from app.utils.github import client as github
+from app.utils.github.concurrency import gather_for_user
+from app.utils.github.mirror import MirrorError, get_mirror, mark_stale
+from app.utils.github.path_trie import PathTrie, glob_match
+from app.utils.github.rate_limit import bulk_priority
+
+github_api_config = config.get("GITHUB_API", {})
+github_cache_config = config.get("GITHUB_CACHE", {})
+
+COMMIT_SHA_PATTERN = re.compile(r"^[0-9a-f]{40}$")
+
+# (token, repo, ref) -> (tree_sha, expires_at), scoped by token so a cached
+# resolution never grants access to a repository the caller can't read
+_ref_cache = OrderedDict()
+
+# tree_sha -> tree, trees are immutable so they never expire
+_tree_cache = OrderedDict()
+
+# tree_sha -> direct entries of the tree, used to walk truncated trees
+_listing_cache = OrderedDict()
+
+
+class TreeError(Exception):
+    """Raised when GitHub doesn't return a tree for a ref."""
+
+
+def _remember(cache: OrderedDict, key, value, max_entries: int):
+    cache[key] = value
+    cache.move_to_end(key)
+    while len(cache) > max_entries:
+        cache.popitem(last=False)
+
+
+def _build_tree(tree_data: dict) -> dict:
+    return {
+        "sha": tree_data["sha"],
+        "truncated": tree_data.get("truncated", False),
+        "entries": {entry["path"]: entry for entry in tree_data.get("tree", [])},
+    }
+
+
+async def _fetch_tree(repo: str, tree_ish: str, token: str, recursive: bool) -> dict:
+    url = f"{github.GITHUB_API_URL}/repos/{repo}/git/trees/{tree_ish}"
+    logger.info(f"Fetching tree from URL: {url}, recursive: {recursive}")
+
+    response = await github.get(
+        url,
+        headers={"Authorization": f"token {token}"},
+        params={"recursive": 1} if recursive else None,
+    )
+    if response.status_code != 200:
+        try:
+            error_message = response.json().get("message", "Unknown error")
+        except ValueError:
+            error_message = response.text
+        raise TreeError(f"GitHub API error: {error_message}")
+
+    return response.json()
+
+
+def _cached_ref(token: str, repo: str, ref: str) -> Optional[str]:
+    cached = _ref_cache.get((token, repo, ref))
+    if cached and cached[1] > time.monotonic():
+        return cached[0]
+    return None
+
+
+def _remember_ref(token: str, repo: str, ref: str, tree_sha: str):
+    # Commit SHAs always point at the same tree, branch names move
+    ttl = (
+        float("inf")
+        if COMMIT_SHA_PATTERN.match(ref)
+        else github_cache_config.get("ref_ttl", 30)
+    )
+    _remember(
+        _ref_cache,
+        (token, repo, ref),
+        (tree_sha, time.monotonic() + ttl),
+        github_cache_config.get("ref_cache_max_entries", 1024),
+    )
+
+
+def invalidate_ref(repo: str, branch: str):
+    """
+    Forget which tree a branch points at after writing to it, for every token.
+
+    HEAD is forgotten too since the branch may be the default branch, and
+    the mirrors of the repository are fetched again before their next read.
+    The trees themselves stay cached, they never change.
+    """
+    refs = {branch, f"heads/{branch}", f"refs/heads/{branch}", "HEAD"}
+    for key in [key for key in _ref_cache if key[1] == repo and key[2] in refs]:
+        del _ref_cache[key]
+    mark_stale(repo)
+
+
+async def resolve_tree_sha(repo: str, ref: Optional[str], token: str) -> str:
+    """
+    Resolve a branch, tag or commit SHA to the SHA of its root tree.
+
+    Args:
+    - repo (str): The GitHub repository in the format 'owner/repo'.
+    - ref (Optional[str]): Branch, tag or commit SHA. Defaults to HEAD.
+    - token (str): GitHub access token.
+
+    Returns:
+    - str: The root tree SHA.
+    """
+    ref = ref or "HEAD"
+    tree_sha = _cached_ref(token, repo, ref)
+    if tree_sha:
+        return tree_sha
+
+    # The non recursive tree is small and carries the root tree SHA
+    tree_data = await _fetch_tree(repo, ref, token, recursive=False)
+    _remember_ref(token, repo, ref, tree_data["sha"])
+    _remember(
+        _listing_cache,
+        tree_data["sha"],
+        tree_data.get("tree", []),
+        github_cache_config.get("listing_cache_max_entries", 4096),
+    )
+    return tree_data["sha"]
+
+
+async def _mirror_tree(repo: str, ref: Optional[str], token: str) -> Optional[dict]:
+    """Return the tree of a ref from the local mirror, or None if it isn't mirrored."""
+    mirror = await get_mirror(repo, token)
+    if mirror is None:
+        return None
+
+    try:
+        commit = await mirror.resolve(ref)
+        return await mirror.get_tree(commit) if commit else None
+    except MirrorError as e:
+        logger.warning(f"Failed to read {repo}@{ref or 'HEAD'} from the mirror: {e}")
+        return None
+
+
+async def get_tree(repo: str, ref: Optional[str], token: str) -> dict:
+    """
+    Return the recursive tree of a ref, served from cache whenever possible.
+
+    Mirrored repositories are read from the local mirror, refs the mirror
+    doesn't know yet still go to the GitHub API.
+
+    Args:
+    - repo (str): The GitHub repository in the format 'owner/repo'.
+    - ref (Optional[str]): Branch, tag or commit SHA. Defaults to HEAD.
+    - token (str): GitHub access token.
+
+    Returns:
+    - dict: The tree "sha", the "truncated" flag and "entries" keyed by path.
+    """
+    tree = await _mirror_tree(repo, ref, token)
+    if tree is not None:
+        return tree
+
+    ref = ref or "HEAD"
+    max_trees = github_cache_config.get("tree_cache_max_entries", 32)
+
+    tree_sha = _cached_ref(token, repo, ref)
+    if tree_sha is None and (token, repo, ref) in _ref_cache:
+        # The ref was seen before, check cheaply whether it still points at a cached tree
+        tree_sha = await resolve_tree_sha(repo, ref, token)
+
+    if tree_sha and tree_sha in _tree_cache:
+        _tree_cache.move_to_end(tree_sha)
+        return _tree_cache[tree_sha]
+
+    # Nothing cached yet, a single recursive call resolves the ref too
+    tree = _build_tree(await _fetch_tree(repo, tree_sha or ref, token, recursive=True))
+    _remember_ref(token, repo, ref, tree["sha"])
+    _remember(_tree_cache, tree["sha"], tree, max_trees)
+
+    logger.info(
+        f"Cached tree {tree['sha']} for {repo}@{ref} with {len(tree['entries'])} entries"
+    )
+    return tree
+
+
+def get_path_trie(tree: dict) -> PathTrie:
+    """Return the path trie of a cached tree, indexing it on first use."""
+    trie = tree.get("trie")
+    if trie is None:
+        trie = tree["trie"] = PathTrie(tree["entries"].values())
+    return trie
+
+
+async def resolve_blob_sha(
+    repo: str, ref: Optional[str], path: str, token: str
+) -> Optional[str]:
+    """Return the blob SHA of a file at a ref, or None if it can't be resolved."""
+    try:
+        tree = await get_tree(repo, ref, token)
+    except Exception as e:
+        logger.warning(f"Failed to resolve {path} in {repo}@{ref or 'HEAD'}: {e}")
+        return None
+
+    entry = tree["entries"].get(path.strip("/"))
+    if entry and entry.get("type") == "blob":
+        return entry["sha"]
+    return None
+
+
+async def _get_subtree(repo: str, tree_sha: str, token: str) -> dict:
+    """Return the recursive tree of a tree SHA, with paths relative to it."""
+    if tree_sha in _tree_cache:
+        _tree_cache.move_to_end(tree_sha)
+        return _tree_cache[tree_sha]
+
+    tree = _build_tree(await _fetch_tree(repo, tree_sha, token, recursive=True))
+    _remember(
+        _tree_cache,
+        tree_sha,
+        tree,
+        github_cache_config.get("tree_cache_max_entries", 32),
+    )
+    return tree
+
+
+async def _list_tree(repo: str, tree_sha: str, token: str) -> List[dict]:
+    """Return the direct entries of a tree SHA, memoized since trees never change."""
+    if tree_sha in _listing_cache:
+        _listing_cache.move_to_end(tree_sha)
+        return _listing_cache[tree_sha]
+
+    entries = (await _fetch_tree(repo, tree_sha, token, recursive=False)).get(
+        "tree", []
+    )
+    _remember(
+        _listing_cache,
+        tree_sha,
+        entries,
+        github_cache_config.get("listing_cache_max_entries", 4096),
+    )
+    return entries
+
+
+async def _resolve_folder(
+    repo: str, tree_sha: str, path: str, token: str
+) -> Optional[str]:
+    """Return the tree SHA of a folder below a tree, or None if it doesn't exist."""
+    for segment in [segment for segment in path.strip("/").split("/") if segment]:
+        entry = next(
+            (
+                entry
+                for entry in await _list_tree(repo, tree_sha, token)
+                if entry["path"] == segment
+            ),
+            None,
+        )
+        if entry is None or entry["type"] != "tree":
+            return None
+        tree_sha = entry["sha"]
+    return tree_sha
+
+
+async def find_entry(repo: str, tree_sha: str, path: str, token: str) -> Optional[dict]:
+    """
+    Return the entry of a path below a tree, or None if it doesn't exist.
+
+    The path is looked up level by level with memoized single-level listings,
+    for trees GitHub truncated.
+
+    Raises:
+    - httpx.HTTPError: If a tree listing can't be requested.
+    - TreeError: If GitHub answers a tree listing with an error.
+    """
+    folder, _, name = path.strip("/").rpartition("/")
+    folder_sha = await _resolve_folder(repo, tree_sha, folder, token)
+    if folder_sha is None:
+        return None
+
+    for entry in await _list_tree(repo, folder_sha, token):
+        if entry["path"] == name:
+            return dict(entry, path=path.strip("/"))
+    return None
+
+
+def _walk_trie(
+    trie: PathTrie, prefix: str, max_depth: Optional[int], pattern: Optional[str]
+):
+    matches = trie.glob(pattern, "", max_depth) if pattern else trie.walk("", max_depth)
+    for entry in matches:
+        yield dict(entry, path=f"{prefix}{entry['path']}") if prefix else entry
+
+
+async def walk_tree(
+    repo: str,
+    ref: Optional[str],
+    token: str,
+    path: str = "",
+    max_depth: Optional[int] = None,
+    pattern: Optional[str] = None,
+) -> AsyncIterator[dict]:
+    """
+    Iterate over the entries below a folder of a ref, however large the repository is.
+
+    The folder is served from the local mirror or its cached recursive tree
+    when GitHub returned it whole. When the tree is truncated, its sub-trees are descended on demand,
+    max_concurrency_per_user at a time, trying a recursive fetch of each before
+    listing it level by level. Every tree is memoized by SHA and entries are
+    yielded as they arrive, so memory stays bounded by the walk frontier.
+
+    Args:
+    - repo (str): The GitHub repository in the format 'owner/repo'.
+    - ref (Optional[str]): Branch, tag or commit SHA. Defaults to HEAD.
+    - token (str): GitHub access token.
+    - path (str): The folder to list, the repository root by default.
+    - max_depth (Optional[int]): Levels to descend, 1 lists direct children only. None is unlimited.
+    - pattern (Optional[str]): Optional glob the paths relative to the folder must match.
+
+    Yields:
+    - dict: Tree entries with their full "path", parents before their children.
+    """
+    folder = path.strip("/")
+    prefix = f"{folder}/" if folder else ""
+
+    tree_sha = _cached_ref(token, repo, ref or "HEAD")
+    tree = await _mirror_tree(repo, ref, token)
+    if tree is None and (not folder or (tree_sha and tree_sha in _tree_cache)):
+        # The whole tree is wanted or already cached, a single call at most
+        tree = await get_tree(repo, ref, token)
+
+    if tree is not None:
+        if not tree["truncated"]:
+            trie = get_path_trie(tree)
+            matches = (
+                trie.glob(pattern, folder, max_depth)
+                if pattern
+                else trie.walk(folder, max_depth)
+            )
+            for entry in matches:
+                yield entry
+            return
+        tree_sha = tree["sha"]
+    else:
+        tree_sha = await resolve_tree_sha(repo, ref, token)
+
+    folder_sha = await _resolve_folder(repo, tree_sha, folder, token)
+    if folder_sha is None:
+        return
+
+    # Only the folder is needed, its own recursive tree is usually small enough
+    if folder and max_depth != 1:
+        subtree = await _get_subtree(repo, folder_sha, token)
+        if not subtree["truncated"]:
+            for entry in _walk_trie(get_path_trie(subtree), prefix, max_depth, pattern):
+                yield entry
+            return
+
+    logger.info(
+        f"Tree of {repo}@{ref or 'HEAD'} under '{folder}' is truncated, walking its sub-trees"
+    )
+    window_size = github_api_config.get("max_concurrency_per_user", 8)
+
+    # Folders still to list: (path prefix, tree SHA, depth below the folder)
+    frontier = [(prefix, folder_sha, 0)]
+
+    async def expand(tree_prefix: str, sha: str, depth: int):
+        # Deep walks first try the whole sub-tree in one call
+        if depth > 0 and (max_depth is None or max_depth - depth > 1):
+            subtree = await _get_subtree(repo, sha, token)
+            if not subtree["truncated"]:
+                return True, subtree
+        return False, await _list_tree(repo, sha, token)
+
+    while frontier:
+        window, frontier = frontier[:window_size], frontier[window_size:]
+        with bulk_priority():
+            results = await gather_for_user(token, (expand(*item) for item in window))
+
+        for (tree_prefix, _, depth), (complete, listing) in zip(window, results):
+            if complete:
+                remaining = None if max_depth is None else max_depth - depth
+                for entry in _walk_trie(
+                    get_path_trie(listing), tree_prefix, remaining, None
+                ):
+                    relative = entry["path"][len(prefix) :]
+                    if not pattern or glob_match(pattern, relative):
+                        yield entry
+                continue
+
+            for entry in listing:
+                full_entry = dict(entry, path=f"{tree_prefix}{entry['path']}")
+                relative = full_entry["path"][len(prefix) :]
+                if not pattern or glob_match(pattern, relative):
+                    yield full_entry
+                if entry["type"] == "tree" and (
+                    max_depth is None or depth + 1 < max_depth
+                ):
+                    frontier.append((f"{full_entry['path']}/", entry["sha"], depth + 1))